@@ -43,7 +43,8 @@ async def chat(request: MessageRequest = Body(...)):
             raise HTTPException(status_code=400, detail=result["error"])
         return MessageResponse(
             text=result["text"],
-            citation=result["citation"]
+            citation=result["citation"],
+            timings=result.get("timings")
         )
     except Exception as e:
         logger.error("Error in chat endpoint: %s", e)
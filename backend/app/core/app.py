@@ -7,6 +7,8 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .metrics import install_metrics
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +28,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and per-stage histograms on /metrics
+install_metrics(app)
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -0,0 +1,97 @@
+"""
+Prometheus metrics for the API.
+Records request latency per route and per-stage spans for chat processing,
+and serves them on /metrics.
+
+This backend is deployed on its own and cannot import src.core, so it
+keeps its own StageTimer; metric names and buckets match
+src/core/metrics.py and src/backend/metrics.py.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+STAGE_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Time spent in each RAG pipeline stage",
+    ["operation", "stage"],
+    buckets=STAGE_BUCKETS
+)
+
+
+class StageTimer:
+    """Collects per-stage timings for one request"""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Time the enclosed block as a stage.
+
+        Args:
+            stage: Stage label, e.g. "retrieve" or "generate"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds * 1000
+            STAGE_SECONDS.labels(self.operation, stage).observe(seconds)
+
+    def finish(self) -> Dict[str, float]:
+        """
+        Record the end-to-end time as the "total" stage.
+
+        Returns:
+            Dict[str, float]: Milliseconds per stage
+        """
+        seconds = time.perf_counter() - self._start
+        self.timings["total"] = seconds * 1000
+        STAGE_SECONDS.labels(self.operation, "total").observe(seconds)
+        return {stage: round(ms, 3) for stage, ms in self.timings.items()}
+
+
+def install_metrics(app: FastAPI):
+    """
+    Add request timing middleware and a /metrics endpoint to an app.
+
+    Args:
+        app: FastAPI application
+    """
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        # Label by route template so IDs in paths don't explode cardinality
+        route = request.scope.get("route")
+        REQUEST_SECONDS.labels(
+            request.method,
+            route.path if route else "unmatched",
+            str(response.status_code)
+        ).observe(time.perf_counter() - start)
+        return response
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics endpoint"""
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -7,9 +7,12 @@ from dotenv import load_dotenv
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .api.routes import chat, storage
 from .core.app import app
+from .core.supabase_client import close_supabase_clients, get_supabase_client
+from .core.warmup import Warmup
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +28,23 @@ load_dotenv()
 app.include_router(chat.router)
 app.include_router(storage.router)
 
+# The Supabase client is created in the background after startup; see /ready
+warmup = Warmup([("supabase", get_supabase_client)])
+
+
+@app.get("/health")
+def health_check():
+    """Liveness check; answers as soon as the server is up"""
+    return {"status": "healthy"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness check; 503 with warm-up progress until clients are created"""
+    report = warmup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
 # Add startup event handler
 @app.on_event("startup")
 async def startup_event():
@@ -40,6 +60,8 @@ async def startup_event():
     else:
         logger.info("Supabase credentials found")
     
+    warmup.start()
+    
     logger.info("Lexpert Case AI API started successfully")
 
 
@@ -48,6 +70,7 @@ async def startup_event():
 async def shutdown_event():
     """Perform shutdown tasks"""
     logger.info("Shutting down Lexpert Case AI API")
+    await close_supabase_clients()
 
 
 # Entry point for running the application
@@ -16,6 +16,7 @@ class MessageResponse(BaseModel):
     """Response model for chat messages"""
     text: str
     citation: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None  # Milliseconds per stage
 
 
 class BucketRequest(BaseModel):
@@ -6,6 +6,8 @@ import random
 import time
 from typing import Dict, Any, List, Optional
 
+from ..core.metrics import StageTimer
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,7 +35,7 @@ def process_message(text: str, bot_id: Optional[str] = None) -> Dict[str, Any]:
         bot_id: Optional bot ID for context-specific responses
         
     Returns:
-        Dict[str, Any]: Response with text and citation
+        Dict[str, Any]: Response with text, citation and stage timings
     """
     if not text:
         logger.error("Empty message text received")
@@ -44,10 +46,12 @@ def process_message(text: str, bot_id: Optional[str] = None) -> Dict[str, Any]:
         }
 
     logger.info(f"Processing message for bot {bot_id}: {text[:50]}...")
+    timer = StageTimer("chat")
     
     # Simulate processing time (3-5s)
-    processing_time = random.uniform(3, 5)
-    time.sleep(processing_time)
+    with timer.stage("generate"):
+        processing_time = random.uniform(3, 5)
+        time.sleep(processing_time)
 
     # Generate a response based on message content
     response_text = f"Here's information related to your query about '{text}'."
@@ -71,7 +75,8 @@ def process_message(text: str, bot_id: Optional[str] = None) -> Dict[str, Any]:
     
     return {
         "text": response_text,
-        "citation": citation
+        "citation": citation,
+        "timings": timer.finish()
     }
 
 
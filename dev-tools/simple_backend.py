@@ -7,9 +7,10 @@ from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import importlib.util
 import os
+from pathlib import Path
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 # Load environment variables from frontend .env file
 load_dotenv(dotenv_path='../src/frontend/.env')
@@ -28,7 +29,18 @@ print(f"Supabase Key: {supabase_key[:10]}... (truncated)")
 if not supabase_url or not supabase_key:
     raise ValueError("Supabase credentials not found in environment variables")
 
-supabase = create_client(supabase_url, supabase_key)
+# Use the API server's client factory, so this server gets the same pooled
+# client: SUPABASE_* pool and timeout settings, HTTP/2, and pooling on older
+# supabase-py releases. dev-tools is not a package, so it is loaded by path
+os.environ["SUPABASE_URL"] = supabase_url
+os.environ["SUPABASE_SERVICE_KEY"] = supabase_key
+_spec = importlib.util.spec_from_file_location(
+    "supabase_client",
+    Path(__file__).resolve().parent.parent / "src" / "backend" / "supabase_client.py"
+)
+supabase_client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(supabase_client)
+supabase = supabase_client.get_supabase_client()
 
 app = FastAPI(title="Lexpert Case AI Simple Backend")
 
@@ -9,9 +9,12 @@ setup(
         "langchain-community>=0.0.16",
         "openai>=1.12.0",
         "supabase>=2.0.0",
+        "httpx[http2]>=0.25.0",
         "spacy>=3.7.2",
         "streamlit>=1.32.0",
         "redis>=5.0.1",
+        "orjson>=3.9.0",
+        "prometheus-client>=0.19.0",
         "python-dotenv>=1.0.0",
         "anthropic>=0.8.0",
         "pydantic>=2.5.0",
@@ -4,11 +4,16 @@ from typing import Dict
 import io
 import tempfile
 
-from src.core.rag_pipeline import RAGPipeline
-from src.core.auto_tagger import DocumentTagger
-from src.core.prompt_coach import PromptCoach
+import streamlit as st
+
+# The pipeline and tagger are heavy; they are built by the background
+# warm-up (or on first use) rather than imported here
+from src.core.warmup import get_document_tagger, get_rag_pipeline, get_warmup
+from src.core.prompt_coach import get_prompt_coach
+from src.core.extraction import extract_document
 from src.ui.components import setup_theme, chat_interface, file_uploader
-from src.config.settings import SAMPLE_DOCS_DIR
+from src.core.metrics import start_metrics_server
+from src.config.settings import METRICS_PORT, SAMPLE_DOCS_DIR
 
 def process_upload(
     file_content: bytes,
@@ -25,66 +30,50 @@ def process_upload(
             f.write(file_content)
         
         # Extract text content based on file type
-        content = ""
-        file_ext = Path(filename).suffix.lower()
-        
-        if file_ext == ".pdf":
-            # Handle PDF files
-            import PyPDF2
-            with open(file_path, "rb") as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page_num in range(len(pdf_reader.pages)):
-                    content += pdf_reader.pages[page_num].extract_text() + "\n"
-        
-        elif file_ext in [".doc", ".docx"]:
-            # For Word documents, we'd need additional libraries
-            # This is a placeholder - you might want to use python-docx
-            content = f"Document content from {filename}"
-        
-        else:
-            # For text files, read as text
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            except UnicodeDecodeError:
-                # If UTF-8 fails, try another encoding
-                with open(file_path, "r", encoding="latin-1") as f:
-                    content = f.read()
+        extracted = extract_document(str(file_path))
+        content = extracted["text"]
         
         # Auto-tag and process document
-        tagger = DocumentTagger()
-        tag, confidence = tagger.tag_document(content)
+        tag, confidence = get_document_tagger().tag_document(content)
         
         # Use provided doc_type if confidence is low
         if confidence < 0.85:
             tag = doc_type
         
         # Process document with RAG pipeline
-        pipeline = RAGPipeline()
-        pipeline.process_document(
+        get_rag_pipeline().process_document(
             content=content,
             metadata={
                 "type": tag,
                 "filename": filename,
                 "title": Path(filename).stem
-            }
+            },
+            pages=extracted["pages"]
         )
     except Exception as e:
         print(f"Error processing document: {e}")
         raise
 
-def handle_chat(prompt: str) -> Dict:
-    """Handle chat messages."""
-    pipeline = RAGPipeline()
-    return pipeline.query(prompt)
+def handle_chat(prompt: str, conversation_id: str) -> Dict:
+    """Handle chat messages, continuing the session's conversation."""
+    return get_rag_pipeline().query(prompt, user_id=conversation_id)
 
 def main():
     """Main application entry point."""
     # Setup UI theme
     setup_theme()
     
+    # Stage and cache metrics for Prometheus; started once per process
+    start_metrics_server(METRICS_PORT)
+    
+    # Load the pipeline and tagger in the background while the UI renders
+    warmup = get_warmup()
+    if not warmup.ready:
+        report = warmup.report()
+        st.sidebar.info(f"Warming up ({report['progress']:.0%})...")
+    
     # Initialize components
-    prompt_coach = PromptCoach()
+    prompt_coach = get_prompt_coach()
     
     # Render UI
     file_uploader(process_upload)
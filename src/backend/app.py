@@ -2,22 +2,35 @@ from fastapi import (
     FastAPI, HTTPException, UploadFile, File, Form, 
     Request, Depends
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import os
 import json
-import time
 import uuid
 import asyncio
+import hashlib
 
 # Import RAG components
 from rag.pipeline import (
-    process_query, process_document, auto_tag, get_prompt_coach
+    process_query, replace_document_group, auto_tag, get_prompt_coach,
+    get_prompt_coach_ahead
 )
 
 # Import auth middleware
-from auth import verify_supabase_jwt
+from auth import get_redis, verify_supabase_jwt
+from supabase_client import close_supabase_clients, get_supabase_client
+
+# Clients are created in the background after startup; see /ready
+from warmup import Warmup
+
+# Import background ingestion queue
+from jobs import JobQueue, parse_concurrency
+
+# Import Prometheus instrumentation
+from metrics import StageTimer, install_metrics, timed_stage
 
 # Import storage management utilities
 from storage import (
@@ -37,6 +50,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and per-stage histograms on /metrics
+install_metrics(app)
+
 
 # Models
 class QueryRequest(BaseModel):
@@ -49,6 +65,8 @@ class QueryResponse(BaseModel):
     response: str
     sources: List[str] = []
     processing_time: float
+    # Milliseconds per stage, returned when options["timings"] is true
+    timings: Optional[Dict[str, float]] = None
 
 
 class AutoTagRequest(BaseModel):
@@ -68,6 +86,53 @@ class PromptCoachResponse(BaseModel):
     tooltip: Optional[str] = None
 
 
+class PromptCoachAheadRequest(BaseModel):
+    prompt: str
+    limit: int = Field(8, ge=1, le=32)
+
+
+class PromptCoachContinuation(BaseModel):
+    text: str
+    tooltip: Optional[str] = None
+
+
+class PromptCoachAheadResponse(BaseModel):
+    tooltip: Optional[str] = None
+    # Tooltips for likely continuations of the prompt; the client applies
+    # them locally while the typed text follows one
+    ahead: List[PromptCoachContinuation] = []
+
+
+class UploadResponse(BaseModel):
+    success: bool
+    job_id: str
+    status: str
+    filename: str
+    message: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    bot_id: str
+    filename: str
+    status: str
+    stage: Optional[str] = None
+    progress: float
+    attempts: int
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class JobProgressResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    completed_stages: List[str] = []
+    progress: float
+
+
 # Storage management models
 class BucketRequest(BaseModel):
     bucketName: str
@@ -79,6 +144,118 @@ class BucketResponse(BaseModel):
     error: Optional[str] = None
 
 
+# Ingestion stages run by the background workers
+UPLOAD_DIR = os.environ.get("INGEST_UPLOAD_DIR", "temp")
+
+
+def write_spool_file(path: str, content: bytes):
+    """Write an upload where the ingestion workers will read it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as buffer:
+        buffer.write(content)
+
+
+@timed_stage("ingest", "tag")
+def tag_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Auto-tag the uploaded document unless tags were supplied."""
+    if job["metadata"].get("tags"):
+        return {}
+    with open(job["file_path"], "r", encoding="utf-8", errors="ignore") as f:
+        tags, confidence = auto_tag(f.read())
+    return {"tags": tags, "tag_confidence": confidence}
+
+
+# Namespace of the document IDs derived from ingestion job IDs
+INGEST_DOCUMENT_NAMESPACE = uuid.UUID("3f6c1d52-8a4e-4b7f-9c0d-5e2a7b1f4c68")
+
+
+@timed_stage("ingest", "index")
+def index_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Chunk, embed and store the document, then remove the spooled file."""
+    metadata = dict(job["metadata"])
+    if "tags" in job["outputs"]:
+        metadata.setdefault("tags", job["outputs"]["tags"])
+    metadata["ingest_job_id"] = job["id"]
+
+    # The document ID is derived from the job, and storing replaces what is
+    # already there, so a retry after a crash mid-index (or after indexing
+    # but before the stage was recorded) does not duplicate the document
+    document_id = replace_document_group(
+        job["bot_id"],
+        str(uuid.uuid5(INGEST_DOCUMENT_NAMESPACE, job["id"])),
+        job["file_path"],
+        job["filename"],
+        metadata
+    )
+
+    if os.path.exists(job["file_path"]):
+        os.remove(job["file_path"])
+    return {"document_id": document_id}
+
+
+job_queue = JobQueue(
+    db_path=os.environ.get(
+        "INGEST_DB_PATH", os.path.join(UPLOAD_DIR, "ingest_jobs.sqlite3")
+    ),
+    stages=[("tag", tag_stage), ("index", index_stage)],
+    concurrency=parse_concurrency(os.environ.get("INGEST_STAGE_CONCURRENCY")),
+    workers=int(os.environ.get("INGEST_WORKERS", 4)),
+    max_attempts=int(os.environ.get("INGEST_MAX_ATTEMPTS", 3))
+)
+
+
+warmup = Warmup([
+    ("supabase", get_supabase_client),
+    ("redis", get_redis)
+])
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    job_queue.start()
+
+
+@app.on_event("startup")
+async def start_warmup():
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    job_queue.stop()
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await close_supabase_clients()
+
+
+async def get_job_or_404(job_id: str, user: dict) -> Dict[str, Any]:
+    job = await run_in_threadpool(job_queue.get, job_id)
+    # Other users' jobs are reported as missing; admins see every job
+    if job is None or (
+        user["role"] != "admin" and job["user_id"] != user["user_id"]
+    ):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def to_job_status(job: Dict[str, Any]) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job["id"],
+        bot_id=job["bot_id"],
+        filename=job["filename"],
+        status=job["status"],
+        stage=job["stage"],
+        progress=job["progress"],
+        attempts=job["attempts"],
+        document_id=job["outputs"].get("document_id"),
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+
 # Authentication dependency
 async def get_current_user(request: Request):
     auth_header = request.headers.get("Authorization")
@@ -98,32 +275,42 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    # Liveness: answers as soon as the server is up
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    # Readiness: 503 with warm-up progress until every client is created
+    report = warmup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
 # Protected routes
 @app.post("/api/rag", response_model=QueryResponse)
 async def query_rag(
     request: QueryRequest, user: dict = Depends(get_current_user)
 ):
-    start_time = time.time()
+    timer = StageTimer("query")
     
     # In a real implementation, this would call the RAG pipeline
     # For now, we'll use our mock implementation
-    response, sources = process_query(
-        request.bot_id, request.prompt, request.options
-    )
+    with timer.stage("rag"):
+        response, sources = process_query(
+            request.bot_id, request.prompt, request.options
+        )
     
-    processing_time = time.time() - start_time
+    timings = timer.finish()
     
     return QueryResponse(
         response=response,
         sources=sources,
-        processing_time=processing_time
+        processing_time=timings["total"] / 1000,
+        timings=timings if (request.options or {}).get("timings") else None
     )
 
 
-@app.post("/api/upload")
+@app.post("/api/upload", response_model=UploadResponse, status_code=202)
 async def upload_document(
     file: UploadFile = File(...),
     bot_id: str = Form(...),
@@ -133,39 +320,86 @@ async def upload_document(
     try:
         # Parse metadata
         metadata_dict = json.loads(metadata)
+        content = await file.read()
+        
+        # Identical uploads by the same user map to the same job, so client
+        # retries are safe
+        idempotency_key = hashlib.sha256(
+            user["user_id"].encode()
+            + b"\0" + bot_id.encode()
+            + b"\0" + content
+            + json.dumps(metadata_dict, sort_keys=True).encode()
+        ).hexdigest()
         
         # Generate a unique filename
         file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        
-        # Save file to temporary location
-        temp_file_path = f"temp/{unique_filename}"
-        os.makedirs("temp", exist_ok=True)
+        unique_filename = f"{idempotency_key}{file_extension}"
         
-        with open(temp_file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Process the document
-        document_id = process_document(
-            bot_id, temp_file_path, file.filename, metadata_dict
-        )
-        
-        # Clean up temporary file
-        os.remove(temp_file_path)
+        # A retry returns the existing job without touching its spooled
+        # file, which a worker may be reading
+        job = await run_in_threadpool(job_queue.find, idempotency_key)
+        created = False
+        if job is None:
+            # Spool file for the background workers. Concurrent first
+            # uploads each write their own copy; only the one that creates
+            # the job keeps it
+            temp_file_path = os.path.join(
+                UPLOAD_DIR, f"{idempotency_key}-{uuid.uuid4().hex}{file_extension}"
+            )
+            await run_in_threadpool(write_spool_file, temp_file_path, content)
+            job, created = await run_in_threadpool(
+                job_queue.enqueue,
+                bot_id, temp_file_path, file.filename, metadata_dict,
+                idempotency_key=idempotency_key,
+                user_id=user["user_id"]
+            )
+            if not created:
+                os.remove(temp_file_path)
         
-        return {
-            "success": True,
-            "document_id": document_id,
-            "filename": unique_filename,
-            "message": (
-                f"Document {file.filename} uploaded and processed successfully"
+        return UploadResponse(
+            success=True,
+            job_id=job["id"],
+            status=job["status"],
+            filename=unique_filename,
+            message=(
+                f"Document {file.filename} queued for processing"
+                if created else
+                f"Document {file.filename} is already {job['status']}"
             )
-        }
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str, user: dict = Depends(get_current_user)):
+    return to_job_status(await get_job_or_404(job_id, user))
+
+
+@app.get("/api/jobs/{job_id}/progress", response_model=JobProgressResponse)
+async def get_job_progress(
+    job_id: str, user: dict = Depends(get_current_user)
+):
+    job = await get_job_or_404(job_id, user)
+    return JobProgressResponse(
+        job_id=job["id"],
+        status=job["status"],
+        stage=job["stage"],
+        completed_stages=job["completed_stages"],
+        progress=job["progress"]
+    )
+
+
+@app.post("/api/jobs/{job_id}/retry", response_model=JobStatusResponse)
+async def retry_job(job_id: str, user: dict = Depends(get_current_user)):
+    job = await get_job_or_404(job_id, user)
+    if job["status"] != "failed":
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job['status']}, not failed"
+        )
+    return to_job_status(await run_in_threadpool(job_queue.retry, job_id))
+
+
 @app.post("/api/auto-tag", response_model=AutoTagResponse)
 async def get_auto_tags(
     request: AutoTagRequest, user: dict = Depends(get_current_user)
@@ -186,6 +420,16 @@ async def prompt_coach(
     return PromptCoachResponse(tooltip=tooltip)
 
 
+@app.post("/api/prompt-coach/ahead", response_model=PromptCoachAheadResponse)
+async def prompt_coach_ahead(
+    request: PromptCoachAheadRequest, user: dict = Depends(get_current_user)
+):
+    # One request covers the next few keystrokes
+    return PromptCoachAheadResponse(
+        **get_prompt_coach_ahead(request.prompt, limit=request.limit)
+    )
+
+
 # Storage management routes
 @app.post("/api/check-bucket-exists")
 async def check_bucket_exists_endpoint(request: BucketRequest):
@@ -1,6 +1,5 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
-from supabase import create_client, Client
 import jwt
 from datetime import datetime
 from typing import Optional
@@ -11,49 +10,58 @@ from dotenv import load_dotenv
 
 load_dotenv()  # Load variables from .env
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_SERVICE_KEY")  # Use service role key
-
-if not supabase_url or not supabase_key:
-    logging.error("Missing Supabase credentials in environment variables")
-    raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment variables")
-
-supabase: Client = create_client(supabase_url, supabase_key)
-
-# Make Redis optional
-redis_client = None
-try:
-    import redis
-    redis_host = os.environ.get("REDIS_HOST", "localhost")
-    redis_port = int(os.environ.get("REDIS_PORT", 6379))
-    redis_db = int(os.environ.get("REDIS_DB", 0))
-    redis_client = redis.Redis(
-        host=redis_host, 
-        port=redis_port, 
-        db=redis_db, 
-        decode_responses=True,
-        socket_connect_timeout=2  # Short timeout to fail fast
-    )
-    # Test connection
-    redis_client.ping()
-    redis_available = True
-except Exception as e:
-    print(f"Redis connection failed: {str(e)}. Continuing without caching.")
-    redis_available = False
-    redis_client = None
+from cache_codec import CacheCodec
+from supabase_client import get_supabase_client
+
+# Verified users cached by token; a few small fields, so never compressed
+USER_CACHE_TTL = 3600
+_user_codec = CacheCodec("auth_user", version=1, compress_threshold=-1)
+
+# Redis is optional; connected on first use so a missing server does not
+# delay startup
+_redis_client = None
+_redis_checked = False
+
+
+def get_redis():
+    """Return the Redis client, or None if Redis is unavailable."""
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    try:
+        import redis
+        redis_host = os.environ.get("REDIS_HOST", "localhost")
+        redis_port = int(os.environ.get("REDIS_PORT", 6379))
+        redis_db = int(os.environ.get("REDIS_DB", 0))
+        client = redis.Redis(
+            host=redis_host, 
+            port=redis_port, 
+            db=redis_db, 
+            decode_responses=False,  # Cached values are binary (cache_codec)
+            socket_connect_timeout=2  # Short timeout to fail fast
+        )
+        # Test connection
+        client.ping()
+        _redis_client = client
+    except Exception as e:
+        print(f"Redis connection failed: {str(e)}. Continuing without caching.")
+        _redis_client = None
+    _redis_checked = True
+    return _redis_client
 
 app = FastAPI()
 
 # Middleware to verify Supabase JWT
 async def verify_supabase_jwt(token: str) -> Optional[dict]:
     try:
+        redis_client = get_redis()
+
         # Check Redis cache first (TTL: 1 hour) if Redis is available
-        if redis_available:
+        if redis_client is not None:
             try:
-                cached_user = redis_client.get(f"user:{token}")
-                if cached_user:
-                    return eval(cached_user)  # Safely parse cached user data
+                cached_user = _user_codec.decode(redis_client.get(f"user:{token}"))
+                if cached_user is not None:
+                    return cached_user
             except Exception as e:
                 print(f"Redis cache retrieval error: {str(e)}")
                 # Continue without caching
@@ -63,7 +71,7 @@ async def verify_supabase_jwt(token: str) -> Optional[dict]:
         user_id = decoded.get("sub")
 
         # Fetch user from Supabase to verify and get role
-        response = supabase.auth.get_user(token)
+        response = get_supabase_client().auth.get_user(token)
         if response.user is None:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
 
@@ -74,9 +82,9 @@ async def verify_supabase_jwt(token: str) -> Optional[dict]:
             "email": response.user.email
         }
         
-        if redis_available:
+        if redis_client is not None:
             try:
-                redis_client.setex(f"user:{token}", 3600, str(user_data))  # Cache for 1 hour
+                redis_client.setex(f"user:{token}", USER_CACHE_TTL, _user_codec.encode(user_data))
             except Exception as e:
                 print(f"Redis cache storage error: {str(e)}")
                 # Continue without caching
@@ -91,7 +99,7 @@ async def verify_supabase_jwt(token: str) -> Optional[dict]:
 # Authentication middleware
 @app.middleware("http")
 async def auth_middleware(request: Request, call_next):
-    if request.url.path in ["/", "/health", "/docs"]:  # Public routes
+    if request.url.path in ["/", "/health", "/ready", "/docs"]:  # Public routes
         response = await call_next(request)
         return response
 
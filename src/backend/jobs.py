@@ -0,0 +1,340 @@
+"""
+Background ingestion job queue for Lexpert Case AI.
+
+This module implements a durable, SQLite-backed job queue with a local
+worker pool. Uploads are enqueued and return a job ID immediately; workers
+run each job through an ordered list of stages (e.g. extract -> tag -> index)
+and record status and progress so clients can poll for completion.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A stage handler receives the job (including the outputs of earlier stages)
+# and returns a dict of outputs to persist for later stages.
+StageHandler = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    user_id TEXT,
+    bot_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    stage TEXT,
+    completed_stages TEXT NOT NULL DEFAULT '[]',
+    outputs TEXT NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    error TEXT,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_available
+    ON jobs(status, available_at);
+"""
+
+
+class JobQueue:
+    """Durable ingestion queue with per-stage concurrency limits."""
+
+    def __init__(
+        self,
+        db_path: str,
+        stages: List[Tuple[str, StageHandler]],
+        concurrency: Optional[Dict[str, int]] = None,
+        workers: int = 4,
+        max_attempts: int = 3,
+        poll_interval: float = 0.5
+    ):
+        """
+        Initialize the job queue.
+
+        Args:
+            db_path: Path to the SQLite database file
+            stages: Ordered list of (stage_name, handler) pairs
+            concurrency: Optional max concurrent jobs per stage name
+            workers: Number of worker threads
+            max_attempts: Attempts before a job is marked failed
+            poll_interval: Seconds a worker sleeps when the queue is empty
+        """
+        self.db_path = db_path
+        self.stages = stages
+        self.stage_names = [name for name, _ in stages]
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        concurrency = concurrency or {}
+        self._stage_limits = {
+            name: threading.BoundedSemaphore(
+                max(1, concurrency.get(name, self.workers))
+            )
+            for name in self.stage_names
+        }
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Databases created before jobs recorded their owner
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "user_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN user_id TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; SQLite connections are not shared across threads."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a database row into a job dict."""
+        job = dict(row)
+        job["metadata"] = json.loads(job["metadata"])
+        job["completed_stages"] = json.loads(job["completed_stages"])
+        job["outputs"] = json.loads(job["outputs"])
+        job["progress"] = len(job["completed_stages"]) / len(self.stage_names)
+        return job
+
+    def enqueue(
+        self,
+        bot_id: str,
+        file_path: str,
+        filename: str,
+        metadata: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Add an ingestion job to the queue.
+
+        Args:
+            bot_id: The ID of the bot to associate the document with
+            file_path: Path to the spooled upload
+            filename: Original filename
+            metadata: Additional metadata for the document
+            idempotency_key: Optional key; re-submitting the same key
+                returns the existing job instead of creating a new one
+            user_id: Optional ID of the user who owns the job
+
+        Returns:
+            A tuple of (job, created) where created is False when an
+            existing job was returned for the idempotency key
+        """
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO jobs (id, idempotency_key, user_id, bot_id, "
+                    "filename, file_path, metadata, max_attempts, "
+                    "available_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job_id, idempotency_key, user_id, bot_id, filename,
+                        file_path, json.dumps(metadata), self.max_attempts,
+                        now, now, now
+                    )
+                )
+                created = True
+            except sqlite3.IntegrityError:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE idempotency_key = ?",
+                    (idempotency_key,)
+                ).fetchone()
+                job_id = row["id"]
+                created = False
+        return self.get(job_id), created
+
+    def find(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Return the job enqueued with an idempotency key, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE idempotency_key = ?",
+                (idempotency_key,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job by ID, or None if it does not exist."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def retry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Requeue a failed job.
+
+        Completed stages are kept, so a retry resumes at the stage that
+        failed instead of repeating work that already succeeded.
+
+        Returns:
+            The updated job, or None if it does not exist
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL, "
+                "available_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'failed'",
+                (time.time(), time.time(), job_id)
+            )
+        return self.get(job_id)
+
+    def recover(self) -> int:
+        """
+        Requeue jobs left running by a previous process.
+
+        Returns:
+            Number of jobs requeued
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, "
+                "updated_at = ? WHERE status = 'running'",
+                (time.time(), time.time())
+            )
+        return cursor.rowcount
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically claim the oldest available job."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' "
+                "AND available_at <= ? ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return self.get(row["id"])
+
+    def _update(self, job_id: str, **fields: Any):
+        """Persist changed job fields."""
+        for key in ("metadata", "completed_stages", "outputs"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def _run_job(self, job: Dict[str, Any]):
+        """Run the remaining stages of a claimed job."""
+        for name, handler in self.stages:
+            if name in job["completed_stages"]:
+                continue
+
+            self._update(job["id"], stage=name)
+            try:
+                with self._stage_limits[name]:
+                    outputs = handler(job) or {}
+            except Exception as e:
+                print(f"Ingestion job {job['id']} failed at {name}: {e}")
+                if job["attempts"] >= job["max_attempts"]:
+                    self._update(job["id"], status="failed", error=str(e))
+                else:
+                    # Exponential backoff before the next attempt
+                    self._update(
+                        job["id"],
+                        status="queued",
+                        error=str(e),
+                        available_at=time.time() + 2 ** job["attempts"]
+                    )
+                return
+
+            job["outputs"].update(outputs)
+            job["completed_stages"].append(name)
+            self._update(
+                job["id"],
+                outputs=job["outputs"],
+                completed_stages=job["completed_stages"]
+            )
+
+        self._update(job["id"], status="completed", stage=None, error=None)
+
+    def _worker(self):
+        """Worker loop: claim and run jobs until stopped."""
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.OperationalError as e:
+                print(f"Ingestion queue error: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self._run_job(job)
+
+    def start(self):
+        """Recover interrupted jobs and start the worker threads."""
+        if self._threads:
+            return
+        self._stop.clear()
+        self.recover()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"ingest-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Signal the workers to stop and wait for them to exit."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+def parse_concurrency(value: Optional[str]) -> Dict[str, int]:
+    """
+    Parse a per-stage concurrency setting.
+
+    Args:
+        value: Comma-separated ``stage=limit`` pairs, e.g. "extract=4,index=2"
+
+    Returns:
+        Dict of stage name to concurrency limit
+    """
+    limits = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        name, limit = item.split("=", 1)
+        limits[name.strip()] = int(limit)
+    return limits
@@ -5,6 +5,11 @@ This package implements the Retrieval-Augmented Generation functionality
 for the Lexpert Case AI application.
 """
 
-from .pipeline import process_query, process_document, auto_tag, get_prompt_coach
+from .pipeline import (
+    process_query, process_document, auto_tag, get_prompt_coach, get_prompt_coach_ahead
+)
 
-__all__ = ['process_query', 'process_document', 'auto_tag', 'get_prompt_coach'] 
\ No newline at end of file
+__all__ = [
+    'process_query', 'process_document', 'auto_tag', 'get_prompt_coach',
+    'get_prompt_coach_ahead'
+]
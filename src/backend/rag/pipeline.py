@@ -6,6 +6,7 @@ for processing legal documents and answering queries.
 """
 
 import os
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 from dotenv import load_dotenv
 import time
@@ -81,6 +82,37 @@ def process_document(bot_id: str, file_path: str, filename: str, metadata: Dict[
     
     return document_id
 
+def replace_document_group(
+    bot_id: str, group_id: str, file_path: str, filename: str, metadata: Dict[str, Any]
+) -> str:
+    """
+    Store a document under a fixed ID, replacing whatever is stored there.
+    
+    Unlike process_document, running this again for the same group_id
+    leaves one copy of the document, so interrupted ingestion can be
+    retried safely.
+    
+    Args:
+        bot_id: The ID of the bot to associate the document with
+        group_id: ID the document is stored under
+        file_path: Path to the uploaded file
+        filename: Original filename
+        metadata: Additional metadata for the document
+        
+    Returns:
+        The document ID (group_id)
+    """
+    print(f"Replacing document {group_id} ({filename}) for bot {bot_id}")
+    
+    # In a real implementation, this would extract and chunk the file and
+    # swap the group's chunks in one transaction, like
+    # RAGPipeline.replace_document_group in src/core/rag_pipeline.py
+    
+    # Simulate processing time
+    time.sleep(1)
+    
+    return group_id
+
 def auto_tag(content: str) -> Tuple[List[str], float]:
     """
     Automatically generate tags for document content.
@@ -118,6 +150,9 @@ def auto_tag(content: str) -> Tuple[List[str], float]:
     
     return tags, confidence
 
+# Words whose completion can change the coaching suggestion
+COACH_TRIGGERS = ("based", "cite", "document", "draft", "file", "report", "summarize", "using")
+
 def get_prompt_coach(prompt: str) -> Optional[str]:
     """
     Analyze a prompt and provide coaching suggestions.
@@ -128,11 +163,14 @@ def get_prompt_coach(prompt: str) -> Optional[str]:
     Returns:
         A coaching suggestion or None if no coaching is needed
     """
+    return _coach(prompt.lower())
+
+@lru_cache(maxsize=4096)
+def _coach(prompt_lower: str) -> Optional[str]:
+    """Coaching for a lowercased prompt, memoized as it is typed."""
     # In a real implementation, this would use NLP to analyze the prompt
     # and provide appropriate coaching
     
-    prompt_lower = prompt.lower()
-    
     if len(prompt_lower) < 10:
         return "Try to be more specific in your request."
     
@@ -142,4 +180,34 @@ def get_prompt_coach(prompt: str) -> Optional[str]:
     if "summarize" in prompt_lower and not any(word in prompt_lower for word in ["document", "file", "report"]):
         return "Specify which document to summarize, e.g., 'summarize the affidavit'"
     
-    return None 
\ No newline at end of file
+    return None
+
+def get_prompt_coach_ahead(prefix: str, limit: int = 8) -> Dict[str, Any]:
+    """
+    Coaching for a prompt prefix and for its likely next keystrokes.
+    
+    Continuations complete the last (partial) word to a trigger word, so
+    the chat page can show the right suggestion for the next few keys
+    without a request per keystroke.
+    
+    Args:
+        prefix: The prompt typed so far
+        limit: Maximum continuations returned
+        
+    Returns:
+        Dict with "tooltip" and "ahead", a list of {"text", "tooltip"} for
+        continuations that change the tooltip
+    """
+    tooltip = get_prompt_coach(prefix)
+    partial = "" if not prefix or prefix[-1].isspace() else prefix.split()[-1].lower()
+    ahead = []
+    for word in COACH_TRIGGERS:
+        if len(ahead) >= limit:
+            break
+        if not word.startswith(partial) or word == partial:
+            continue
+        text = word[len(partial):] + " "
+        next_tooltip = get_prompt_coach(prefix + text)
+        if next_tooltip != tooltip:
+            ahead.append({"text": text, "tooltip": next_tooltip})
+    return {"tooltip": tooltip, "ahead": ahead}
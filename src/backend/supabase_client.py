@@ -0,0 +1,212 @@
+"""
+Shared Supabase client for the API server (auth and storage).
+
+All requests share one pooled httpx connection pool (keep-alive, HTTP/2
+when h2 is installed, explicit timeouts), configured with the
+SUPABASE_MAX_CONNECTIONS, SUPABASE_MAX_KEEPALIVE, SUPABASE_KEEPALIVE_EXPIRY,
+SUPABASE_CONNECT_TIMEOUT, SUPABASE_TIMEOUT and SUPABASE_HTTP2 environment
+variables.
+"""
+import os
+from dotenv import load_dotenv
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Get Supabase credentials
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+
+# Connection pool settings
+MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 20))
+MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", 10))
+KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", 60))
+CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", 5))
+TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 30))
+HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+
+# Global client instances; supabase and httpx are imported on first use so
+# they stay out of server startup
+_supabase_client = None
+_async_supabase_client = None
+_http_transport = None
+_http_client = None
+_async_http_client = None
+
+
+def _use_http2() -> bool:
+    if not HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("h2 is not installed; Supabase requests use HTTP/1.1")
+        return False
+    return True
+
+
+def _pool_options() -> dict:
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        ),
+        "http2": _use_http2()
+    }
+
+
+def _client_options() -> dict:
+    import httpx
+
+    return {
+        "timeout": httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+        "follow_redirects": True
+    }
+
+
+def _get_http_transport():
+    """The shared sync connection pool behind get_http_client()."""
+    global _http_transport
+    if _http_transport is None:
+        import httpx
+
+        _http_transport = httpx.HTTPTransport(**_pool_options())
+    return _http_transport
+
+
+def get_http_client():
+    """Get the shared pooled HTTP client (httpx.Client)."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.Client(transport=_get_http_transport(), **_client_options())
+    return _http_client
+
+
+def get_async_http_client():
+    """Get the shared pooled async HTTP client (httpx.AsyncClient)."""
+    global _async_http_client
+    if _async_http_client is None:
+        import httpx
+
+        _async_http_client = httpx.AsyncClient(**_pool_options(), **_client_options())
+    return _async_http_client
+
+
+def _check_credentials():
+    # Log credentials status (masked for security)
+    url_debug = SUPABASE_URL[:10] + "..." if SUPABASE_URL else "None"
+    key_debug = "Present" if SUPABASE_KEY else "None"
+    logger.debug(f"Supabase credentials: URL={url_debug}, Key={key_debug}")
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        logger.error("Missing Supabase credentials")
+        raise ValueError("Missing Supabase credentials")
+
+
+def get_supabase_client():
+    """
+    Get or initialize the Supabase client with proper error handling.
+    
+    Returns:
+        Client: Initialized Supabase client
+        
+    Raises:
+        ValueError: If Supabase credentials are missing
+        Exception: If client initialization fails
+    """
+    global _supabase_client
+    
+    # Return existing client if already initialized
+    if _supabase_client is not None:
+        return _supabase_client
+    
+    try:
+        _check_credentials()
+
+        import httpx
+        from supabase import create_client
+        try:
+            from supabase.lib.client_options import SyncClientOptions as ClientOptions
+        except ImportError:
+            from supabase.lib.client_options import ClientOptions
+
+        if "httpx_client" in getattr(ClientOptions, "__dataclass_fields__", {}):
+            options = ClientOptions(httpx_client=get_http_client())
+            client = create_client(SUPABASE_URL, SUPABASE_KEY, options)
+        else:
+            # Older supabase-py: move the PostgREST session and auth
+            # requests onto the shared pool. PostgREST needs its own base
+            # URL and headers, so its session is a thin client over
+            # get_http_client()'s transport rather than the client itself
+            options = ClientOptions(
+                postgrest_client_timeout=TIMEOUT,
+                storage_client_timeout=int(TIMEOUT)
+            )
+            client = create_client(SUPABASE_URL, SUPABASE_KEY, options)
+            shared = get_http_client()
+            session = client.postgrest.session
+            client.postgrest.session = httpx.Client(
+                base_url=session.base_url,
+                headers=session.headers,
+                transport=_get_http_transport(),
+                **_client_options()
+            )
+            session.close()
+            # GoTrue sends full URLs and per-request headers, so it can
+            # use the shared client as is
+            if hasattr(client.auth, "_http_client"):
+                client.auth._http_client = shared
+
+        _supabase_client = client
+        logger.info("Supabase client initialized successfully")
+        return _supabase_client
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase client: {e}")
+        raise
+
+
+async def get_async_supabase_client():
+    """
+    Get or initialize the async Supabase client.
+
+    Raises:
+        ValueError: If Supabase credentials are missing
+        RuntimeError: If the installed supabase-py has no async client
+    """
+    global _async_supabase_client
+
+    if _async_supabase_client is not None:
+        return _async_supabase_client
+
+    try:
+        from supabase import AsyncClientOptions, acreate_client
+    except ImportError:
+        raise RuntimeError("Async Supabase clients need a newer supabase-py (acreate_client)")
+
+    _check_credentials()
+    options = AsyncClientOptions(httpx_client=get_async_http_client())
+    _async_supabase_client = await acreate_client(SUPABASE_URL, SUPABASE_KEY, options)
+    logger.info("Async Supabase client initialized successfully")
+    return _async_supabase_client
+
+
+async def close_supabase_clients():
+    """Close the pooled connections; called on shutdown."""
+    global _supabase_client, _async_supabase_client, _http_client, _async_http_client
+    global _http_transport
+    if _http_client is not None:
+        _http_client.close()
+    elif _http_transport is not None:
+        _http_transport.close()
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+    _supabase_client = _async_supabase_client = None
+    _http_client = _async_http_client = _http_transport = None
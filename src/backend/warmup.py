@@ -0,0 +1,78 @@
+"""
+Background warm-up with progress reporting for the readiness endpoint.
+
+Heavy clients are created on first use, so the server starts accepting
+connections (and answering /health) right away. At startup a Warmup
+creates them in a background thread; /ready reports its progress and
+only returns 200 once every step has finished.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    def __init__(self, steps: List[Tuple[str, Callable[[], object]]]):
+        """
+        Initialize the warm-up.
+
+        Args:
+            steps: (name, function) pairs run in order in the background
+        """
+        self.steps = steps
+        self.status: Dict[str, str] = {name: "pending" for name, _ in steps}
+        self.seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start warming up; later calls do nothing."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name, step in self.steps:
+            self.status[name] = "running"
+            start = time.perf_counter()
+            try:
+                step()
+                self.status[name] = "done"
+            except Exception as e:
+                logger.error(f"Warm-up step {name} failed: {e}")
+                self.errors[name] = str(e)
+                self.status[name] = "failed"
+            self.seconds[name] = round(time.perf_counter() - start, 3)
+
+    @property
+    def ready(self) -> bool:
+        return all(status == "done" for status in self.status.values())
+
+    def report(self) -> Dict:
+        """
+        Warm-up progress.
+
+        Returns:
+            Dict with ready, progress (fraction of steps done) and one
+            entry per step with its status, seconds and error
+        """
+        done = sum(1 for status in self.status.values() if status == "done")
+        return {
+            "ready": self.ready,
+            "progress": done / len(self.steps) if self.steps else 1.0,
+            "steps": [
+                {
+                    "name": name,
+                    "status": self.status[name],
+                    "seconds": self.seconds.get(name),
+                    "error": self.errors.get(name)
+                }
+                for name, _ in self.steps
+            ]
+        }
@@ -0,0 +1 @@
+"""End-to-end RAG benchmarks with local OpenAI and Supabase stand-ins."""
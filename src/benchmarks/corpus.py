@@ -0,0 +1,137 @@
+"""
+Synthetic legal corpus for the end-to-end benchmark.
+
+Generates statute excerpts, trademark office actions and family-law
+petitions that exercise the chunker's structural breaks and the citation
+index, plus questions that mix citation lookups with free-text queries.
+"""
+import random
+from typing import Dict, List, Tuple
+
+STATUTE_SECTION = """
+§ {chapter}.{section:03d}. {title}.
+(a) The court shall consider the best interest of the child in determining {topic}, including the child's physical and emotional needs now and in the future.
+(b) In this section:
+(1) "Parent" means a person who is the parent of the child under the laws of this state.
+(2) "Conservator" means a person appointed as a managing or possessory conservator of the child.
+(c) The court may not {restriction} if credible evidence is presented of a history or pattern of past or present child neglect, or physical or sexual abuse by one parent directed against the other parent, a spouse, or a child.
+"""
+
+OFFICE_ACTION = """OFFICE ACTION
+U.S. Serial No. {serial}
+Mark: {mark}
+
+SECTION 2(d) REFUSAL - LIKELIHOOD OF CONFUSION
+Registration of the applied-for mark is refused because of a likelihood of confusion with the mark in U.S. Registration No. {registration}. Trademark Act Section 2(d), 15 U.S.C. §1052(d); see TMEP §§1207.01 et seq. The marks are similar in {similarity} and the goods are {relatedness}.
+
+SECTION 2(e)(1) REFUSAL - MERELY DESCRIPTIVE
+Registration is refused because the applied-for mark merely describes {feature} of applicant's goods. Trademark Act Section 2(e)(1), 15 U.S.C. §1052(e)(1); see TMEP §§1209.01(b), 1209.03 et seq.
+
+RESPONSE GUIDELINES
+Applicant must respond within six months of the issue date. See In re {party} (2019) for the standard applied to composite marks.
+"""
+
+PETITION = """ORIGINAL PETITION IN SUIT AFFECTING THE PARENT-CHILD RELATIONSHIP
+
+1. Discovery Level
+Discovery in this case is intended to be conducted under Level {level} of Rule 190 of the Texas Rules of Civil Procedure.
+
+2. Parties
+Petitioner is {petitioner}. Respondent is {respondent}.
+
+3. Conservatorship
+Petitioner requests that the court appoint Petitioner as sole managing conservator under TFC §153.{section:03d}. The appointment of Respondent as conservator would not be in the best interest of the child because of {reason}. See {petitioner_last} v. {respondent_last} (2021).
+
+4. Child Support
+Petitioner requests that Respondent be ordered to pay child support under TFC §154.{support:03d} and medical support for the child.
+"""
+
+TOPICS = [
+    "the issues of conservatorship and possession of and access to the child",
+    "whether to appoint a sole or joint managing conservator",
+    "the terms of a standard possession order",
+    "the designation of the primary residence of the child",
+]
+RESTRICTIONS = [
+    "appoint joint managing conservators",
+    "render a possession order that allows unsupervised access",
+    "grant the exclusive right to designate the primary residence",
+]
+MARKS = ["BLUE HARBOR", "QUICKSILVER LABS", "NORTHSTAR COFFEE", "IRONLEAF", "SOLSTICE"]
+FEATURES = ["a feature", "the purpose", "a quality", "the intended users"]
+NAMES = ["Smith", "Jones", "Garcia", "Nguyen", "Patel", "Miller", "Okafor", "Chen"]
+REASONS = [
+    "a history of family violence",
+    "a pattern of neglect",
+    "repeated failure to exercise possession",
+]
+
+
+def build_corpus(size: int, seed: int = 0) -> List[Tuple[str, Dict]]:
+    """
+    Build a deterministic synthetic corpus.
+
+    Args:
+        size: Number of documents
+        seed: Random seed
+
+    Returns:
+        List of (content, metadata) pairs
+    """
+    rng = random.Random(seed)
+    documents = []
+    for i in range(size):
+        kind = i % 3
+        if kind == 0:
+            chapter = rng.choice([151, 153, 154])
+            content = "Texas Family Code - Synthetic Excerpt\n" + "".join(
+                STATUTE_SECTION.format(
+                    chapter=chapter,
+                    section=section,
+                    title=f"PROVISION {section}",
+                    topic=rng.choice(TOPICS),
+                    restriction=rng.choice(RESTRICTIONS)
+                )
+                for section in range(i % 50, i % 50 + rng.randint(3, 8))
+            )
+            metadata = {"document_type": "Statute", "file_name": f"tfc_{i}.txt"}
+        elif kind == 1:
+            content = OFFICE_ACTION.format(
+                serial=f"{90000000 + i}",
+                mark=rng.choice(MARKS),
+                registration=f"{5000000 + rng.randint(0, 999999)}",
+                similarity=rng.choice(["sound", "appearance", "commercial impression"]),
+                relatedness=rng.choice(["identical", "closely related", "complementary"]),
+                feature=rng.choice(FEATURES),
+                party=rng.choice(NAMES)
+            )
+            metadata = {"document_type": "Office Action", "file_name": f"oa_{i}.txt"}
+        else:
+            petitioner, respondent = rng.sample(NAMES, 2)
+            content = PETITION.format(
+                level=rng.randint(1, 3),
+                petitioner=f"Alex {petitioner}",
+                respondent=f"Sam {respondent}",
+                petitioner_last=petitioner,
+                respondent_last=respondent,
+                section=rng.randint(1, 49),
+                support=rng.randint(1, 30),
+                reason=rng.choice(REASONS)
+            )
+            metadata = {"document_type": "Petition", "file_name": f"petition_{i}.txt"}
+        documents.append((content, metadata))
+    return documents
+
+
+def build_questions(count: int, seed: int = 0) -> List[str]:
+    """Build a deterministic mix of citation and free-text questions."""
+    rng = random.Random(seed)
+    templates = [
+        lambda: f"What does TFC §153.{rng.randint(0, 49):03d} require?",
+        lambda: "When can the court refuse to appoint joint managing conservators?",
+        lambda: f"Why was {rng.choice(MARKS)} refused under Section 2(d)?",
+        lambda: "What is the deadline to respond to an office action?",
+        lambda: "Is the mark merely descriptive under 15 U.S.C. §1052(e)(1)?",
+        lambda: f"What did {rng.choice(NAMES)} request about child support?",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
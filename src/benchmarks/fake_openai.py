@@ -0,0 +1,145 @@
+"""
+Local stand-in for the OpenAI embeddings and chat completions endpoints.
+
+Embeddings are deterministic feature-hashed bag-of-words vectors, so texts
+that share terms are close in cosine space and retrieval behaves sensibly.
+Each endpoint sleeps for a configurable latency to model network and
+inference time.
+"""
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple, Union
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def fake_embedding(text: Union[str, List[int]], dimensions: int = 1536) -> np.ndarray:
+    """
+    Deterministic unit vector for a text (or a list of token IDs).
+
+    Like text-embedding-3, a shorter embedding is the normalized prefix of
+    the 1536-dimension one.
+    """
+    terms = [str(t) for t in text] if isinstance(text, list) else _WORD.findall(text.lower())
+    vector = np.zeros(1536, dtype=np.float32)
+    for term in terms:
+        digest = hashlib.blake2b(term.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % 1536
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    vector = vector[:dimensions]
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, body: dict, status: int = 200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.rstrip("/")
+
+        if path.endswith("/embeddings"):
+            self.server.count("embeddings")
+            time.sleep(self.server.embedding_latency)
+            inputs = request["input"]
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            dimensions = request.get("dimensions") or 1536
+            data = []
+            for i, text in enumerate(inputs):
+                vector = fake_embedding(text, dimensions)
+                if request.get("encoding_format") == "base64":
+                    embedding = base64.b64encode(vector.tobytes()).decode()
+                else:
+                    embedding = vector.tolist()
+                data.append({"object": "embedding", "index": i, "embedding": embedding})
+            tokens = sum(len(_WORD.findall(t)) if isinstance(t, str) else len(t) for t in inputs)
+            self._send_json({
+                "object": "list",
+                "data": data,
+                "model": request.get("model"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+            })
+        elif path.endswith("/chat/completions"):
+            self.server.count("chat")
+            time.sleep(self.server.chat_latency)
+            prompt = " ".join(
+                message["content"] for message in request["messages"]
+                if isinstance(message.get("content"), str)
+            )
+            prompt_tokens = len(_WORD.findall(prompt))
+            self._send_json({
+                "id": f"chatcmpl-{hashlib.md5(prompt.encode()).hexdigest()[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model"),
+                "choices": [{
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": f"Stand-in answer based on {prompt_tokens} prompt tokens."
+                    },
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": 8,
+                    "total_tokens": prompt_tokens + 8
+                }
+            })
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, 404)
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        embedding_latency: float = 0.05,
+        chat_latency: float = 1.0
+    ):
+        """
+        Args:
+            address: (host, port); port 0 picks a free port
+            embedding_latency: Seconds slept per embeddings request
+            chat_latency: Seconds slept per chat completion
+        """
+        super().__init__(address, FakeOpenAIHandler)
+        self.embedding_latency = embedding_latency
+        self.chat_latency = chat_latency
+        self.requests = {"embeddings": 0, "chat": 0}
+        self._lock = threading.Lock()
+
+    def count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
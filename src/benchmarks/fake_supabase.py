@@ -0,0 +1,233 @@
+"""
+Local stand-in for the Supabase PostgREST API with pgvector-style search.
+
+Implements the subset of PostgREST used by SupabaseVectorStore: select,
+insert, update and delete on in-memory tables with eq./in. filters and
+limit, plus the match_* RPC functions from src/db/migrations computed with
+NumPy. Each request sleeps for a configurable latency to model the network
+round trip to the database.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+_RESERVED_PARAMS = {"select", "limit", "order", "offset", "on_conflict", "columns"}
+
+
+def _parse_in(value: str) -> List[str]:
+    """Parse a PostgREST in.(a,b) list, with or without quoted values."""
+    inner = value[value.index("(") + 1:value.rindex(")")]
+    return [item.strip().strip('"') for item in inner.split(",") if item.strip()]
+
+
+def _matches(row: Dict, filters: List[Tuple[str, str]]) -> bool:
+    for column, expression in filters:
+        operator, _, value = expression.partition(".")
+        current = row.get(column)
+        if operator == "eq" and str(current) != value:
+            return False
+        if operator == "neq" and str(current) == value:
+            return False
+        if operator == "in" and str(current) not in _parse_in(expression):
+            return False
+        if operator == "is" and value == "null" and current is not None:
+            return False
+    return True
+
+
+def _contains(metadata: Dict, expected: Dict) -> bool:
+    """JSONB @> for flat objects."""
+    return all(metadata.get(key) == value for key, value in (expected or {}).items())
+
+
+class FakeSupabaseHandler(BaseHTTPRequestHandler):
+    server_version = "FakePostgREST/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, body, status: int = 200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _route(self) -> Tuple[str, List[Tuple[str, str]], Dict[str, str]]:
+        parts = urlsplit(self.path)
+        name = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        filters = [(k, v) for k, v in params if k not in _RESERVED_PARAMS]
+        options = {k: v for k, v in params if k in _RESERVED_PARAMS}
+        return name, filters, options
+
+    def _select(self, rows: List[Dict], options: Dict[str, str]) -> List[Dict]:
+        columns = options.get("select", "*")
+        if columns.strip() != "*":
+            names = [c.strip() for c in columns.split(",")]
+            rows = [{name: row.get(name) for name in names} for row in rows]
+        if "limit" in options:
+            rows = rows[:int(options["limit"])]
+        return rows
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        table, filters, options = self._route()
+        with self.server.lock:
+            rows = [
+                dict(row) for row in self.server.tables.setdefault(table, [])
+                if _matches(row, filters)
+            ]
+        self._send_json(self._select(rows, options))
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        name, _, _ = self._route()
+        body = self._read_body()
+        if "/rpc/" in self.path:
+            self._send_json(self.server.rpc(name, body or {}))
+            return
+
+        rows = body if isinstance(body, list) else [body]
+        inserted = []
+        with self.server.lock:
+            table = self.server.tables.setdefault(name, [])
+            for row in rows:
+                row = dict(row)
+                row.setdefault("id", str(uuid.uuid4()))
+                row.setdefault("created_at", time.time())
+                table.append(row)
+                inserted.append(dict(row))
+        self._send_json(inserted, 201)
+
+    def do_PATCH(self):
+        time.sleep(self.server.latency)
+        table, filters, _ = self._route()
+        changes = self._read_body() or {}
+        updated = []
+        with self.server.lock:
+            for row in self.server.tables.setdefault(table, []):
+                if _matches(row, filters):
+                    row.update(changes)
+                    updated.append(dict(row))
+        self._send_json(updated)
+
+    def do_DELETE(self):
+        time.sleep(self.server.latency)
+        table, filters, _ = self._route()
+        with self.server.lock:
+            rows = self.server.tables.setdefault(table, [])
+            deleted = [row for row in rows if _matches(row, filters)]
+            self.server.tables[table] = [row for row in rows if not _matches(row, filters)]
+        self._send_json(deleted)
+
+
+class FakeSupabaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.01,
+        dimension: int = 1536
+    ):
+        """
+        Args:
+            address: (host, port); port 0 picks a free port
+            latency: Seconds slept per request
+            dimension: Reported size of the embedding column
+        """
+        super().__init__(address, FakeSupabaseHandler)
+        self.latency = latency
+        self.dimension = dimension
+        self.lock = threading.Lock()
+        self.tables: Dict[str, List[Dict]] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self):
+        with self.lock:
+            self.tables = {}
+
+    def _ranked_chunks(self, params: Dict) -> List[Tuple[Dict, Dict, float]]:
+        """Rank chunk rows by cosine similarity to the query embedding."""
+        with self.lock:
+            vectors = [
+                row for row in self.tables.get("document_vectors", [])
+                if "bot" not in params or row.get("bot_id") == params["bot"]
+            ]
+            chunks = {row["id"]: row for row in self.tables.get("documents", [])}
+            parents = {row["id"]: row for row in self.tables.get("parent_documents", [])}
+        if not vectors:
+            return []
+
+        query = np.asarray(params["query_embedding"], dtype=np.float32)
+        matrix = np.asarray([row["embedding"] for row in vectors], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query / np.where(norms == 0, 1, norms)
+
+        ranked = []
+        for i in np.argsort(-scores):
+            vector_row = vectors[i]
+            chunk = chunks.get(vector_row["document_id"])
+            if chunk is None:
+                continue
+            parent = parents.get(chunk.get("parent_id"))
+            metadata = parent["metadata"] if parent else chunk.get("metadata") or {}
+            if not _contains(metadata, params.get("filter_metadata")):
+                continue
+            ranked.append((chunk, vector_row, float(scores[i])))
+            if len(ranked) >= params.get("match_count", 5):
+                break
+        return ranked
+
+    def rpc(self, name: str, params: Dict):
+        """Evaluate one of the SQL functions from src/db/migrations."""
+        if name == "vector_dimension":
+            return self.dimension
+        if name == "create_bot_partition":
+            return None
+        if name in ("match_document_chunks", "match_bot_chunks"):
+            return [
+                {
+                    "id": chunk["id"],
+                    "parent_id": chunk.get("parent_id"),
+                    "content": chunk["content"],
+                    "ordinal": chunk.get("ordinal"),
+                    "start_offset": chunk.get("start_offset"),
+                    "end_offset": chunk.get("end_offset"),
+                    "page_start": chunk.get("page_start"),
+                    "page_end": chunk.get("page_end"),
+                    "similarity": score
+                }
+                for chunk, _, score in self._ranked_chunks(params)
+            ]
+        # The binary-quantized variant is evaluated exactly here
+        if name in (
+            "match_document_candidates",
+            "match_document_candidates_bq",
+            "match_bot_candidates"
+        ):
+            return [
+                {"id": chunk["id"], "similarity": score, "embedding": vector["embedding"]}
+                for chunk, vector, score in self._ranked_chunks(params)
+            ]
+        return []
+
+    def start(self) -> "FakeSupabaseServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
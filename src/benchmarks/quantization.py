@@ -0,0 +1,137 @@
+"""
+Recall-vs-speed report for quantized vector search.
+
+Compares exact float32 search with int8 and binary first passes at several
+rescore depths, reporting recall@k against exact search, query latency and
+in-memory index size. Uses real embeddings from a .npy file if given,
+otherwise clustered synthetic unit vectors.
+
+Usage:
+    python -m src.benchmarks.quantization --rows 100000 --output quantization.json
+    python -m src.benchmarks.quantization --vectors embeddings.npy
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.benchmarks.run import summarize
+from src.core.quantization import QuantizedVectorIndex
+
+
+def synthetic_vectors(rows: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors, loosely shaped like document embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(rows // 200, 1), dimension)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), rows)]
+    vectors += 0.5 * rng.normal(size=(rows, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """Queries near random corpus vectors."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)].copy()
+    queries += 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def recall_at_k(found: List[List[str]], truth: List[List[str]]) -> float:
+    return float(np.mean([
+        len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)
+    ]))
+
+
+def run_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    rescore_factors: List[int]
+) -> Dict:
+    """Measure every mode and rescore depth against exact search."""
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [str(i) for i in range(len(vectors))]
+
+    latencies = []
+    truth = []
+    for query in queries:
+        start = time.perf_counter()
+        top = np.argpartition(-(vectors @ query), k)[:k]
+        latencies.append((time.perf_counter() - start) * 1000)
+        truth.append([ids[i] for i in top])
+    results = [{
+        "mode": "float32",
+        "rescore": None,
+        "recall": 1.0,
+        "memory_bytes": vectors.nbytes,
+        "latency": summarize(latencies)
+    }]
+
+    for mode in ("int8", "binary"):
+        index = QuantizedVectorIndex(mode=mode, dimension=vectors.shape[1])
+        index.add_many((i, None, vector) for i, vector in zip(ids, vectors))
+        memory = index.memory_bytes()["codes"]
+        for factor in [0] + rescore_factors:
+            found, latencies = [], []
+            for query in queries:
+                start = time.perf_counter()
+                hits, _ = index.search(query, k=k, rescore=factor * k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found.append([chunk_id for chunk_id, _, _ in hits])
+            results.append({
+                "mode": mode,
+                "rescore": factor * k,
+                "recall": round(recall_at_k(found, truth), 4),
+                "memory_bytes": memory,
+                "latency": summarize(latencies)
+            })
+    return {"rows": len(vectors), "dimension": vectors.shape[1], "k": k, "results": results}
+
+
+def print_report(report: Dict):
+    full = report["results"][0]["memory_bytes"]
+    print(f"{report['rows']} vectors x {report['dimension']} dims, recall@{report['k']}")
+    print(f"{'mode':>8} {'rescore':>8} {'recall':>7} {'memory':>10} {'ratio':>6} "
+          f"{'p50':>9} {'p95':>9}")
+    for result in report["results"]:
+        latency = result["latency"]
+        rescore = "-" if result["rescore"] is None else result["rescore"] or "none"
+        print(f"{result['mode']:>8} {rescore:>8} {result['recall']:>7.3f} "
+              f"{result['memory_bytes'] / 2**20:>8.1f}MB "
+              f"{full / result['memory_bytes']:>5.1f}x "
+              f"{latency['p50_ms']:>7.2f}ms {latency['p95_ms']:>7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vectors", help="Optional .npy file of embeddings (n, dim)")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic corpus size")
+    parser.add_argument("--dimension", type=int, default=1536, help="Synthetic dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to run")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument(
+        "--rescore-factors", type=int, nargs="+", default=[2, 4, 8, 16],
+        help="First-pass candidates per result to rescore"
+    )
+    parser.add_argument("--output", help="Optional path for the JSON report")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+    else:
+        vectors = synthetic_vectors(args.rows, args.dimension)
+    report = run_report(
+        vectors, make_queries(vectors, args.queries), args.k, args.rescore_factors
+    )
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+End-to-end RAG benchmark.
+
+Runs RAGPipeline ingestion and querying against local stand-ins for the
+OpenAI API and Supabase (PostgREST + pgvector), with configurable latency,
+over a synthetic legal corpus at several sizes. Reports throughput and
+p50/p95/p99 latency per stage and writes the results as JSON so runs can
+be compared across changes.
+
+Usage:
+    python -m src.benchmarks.run --sizes 50 200 1000 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.benchmarks.corpus import build_corpus, build_questions
+from src.benchmarks.fake_openai import FakeOpenAIServer
+from src.benchmarks.fake_supabase import FakeSupabaseServer
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Percentiles in milliseconds for a list of samples in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(samples),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+
+def configure_environment(openai_server, supabase_server, work_dir: str):
+    """Point the settings module at the stand-ins; must run before src imports."""
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-benchmark",
+        "OPENAI_BASE_URL": openai_server.base_url,
+        "SUPABASE_URL": supabase_server.url,
+        "SUPABASE_KEY": "benchmark-key",
+        "REDIS_URL": "",
+        "EMBEDDING_CACHE_DIR": os.path.join(work_dir, "embeddings"),
+        "LEXICAL_INDEX_PATH": os.path.join(work_dir, "lexical_index.pkl"),
+        "CITATION_INDEX_PATH": os.path.join(work_dir, "citation_index.json"),
+        "VECTOR_INDEX_PATH": os.path.join(work_dir, "vectors")
+    })
+
+
+def fresh_pipeline(work_dir: str):
+    """Build a RAGPipeline with empty indexes and caches."""
+    from src.config.settings import (
+        COMPLETION_CACHE_SIZE,
+        COMPLETION_CACHE_TTL,
+        QUERY_EMBEDDING_CACHE_SIZE
+    )
+    from src.core.completion_cache import CompletionCache
+    from src.core.embedding_cache import QueryEmbeddingCache
+    from src.core.rag_pipeline import RAGPipeline
+    from src.db import supabase as supabase_module
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    supabase_module._parent_cache.clear()
+
+    pipeline = RAGPipeline()
+    # The process-wide caches would carry hits over from the previous size
+    pipeline.query_embedding_cache = QueryEmbeddingCache(
+        pipeline.query_embedding_cache.model, max_size=QUERY_EMBEDDING_CACHE_SIZE
+    )
+    pipeline.completion_cache = CompletionCache(
+        max_size=COMPLETION_CACHE_SIZE, ttl=COMPLETION_CACHE_TTL
+    )
+    return pipeline
+
+
+def run_queries(pipeline, questions: List[str], bot_id: Optional[str] = None) -> Dict:
+    """Run each question once and collect end-to-end and per-stage timings."""
+    totals = []
+    stages: Dict[str, List[float]] = {}
+    cached = 0
+    start = time.perf_counter()
+    for question in questions:
+        query_start = time.perf_counter()
+        response = pipeline.query(question, bot_id=bot_id)
+        totals.append((time.perf_counter() - query_start) * 1000)
+        cached += bool(response.get("cached"))
+        for stage, ms in response.get("timings", {}).items():
+            stages.setdefault(stage, []).append(ms)
+    elapsed = time.perf_counter() - start
+    return {
+        "queries_per_second": round(len(questions) / elapsed, 3),
+        "completion_cache_hits": cached,
+        "latency": summarize(totals),
+        "stages": {stage: summarize(samples) for stage, samples in stages.items()}
+    }
+
+
+def run_size(
+    size: int,
+    questions: int,
+    openai_server: FakeOpenAIServer,
+    supabase_server: FakeSupabaseServer,
+    work_dir: str,
+    bots: int = 0
+) -> Dict:
+    """
+    Ingest a corpus of the given size, then query it cold and warm.
+
+    With bots > 0, documents are spread round-robin over that many bot
+    partitions and queries are scoped to the first bot.
+    """
+    supabase_server.reset()
+    openai_server.requests = {"embeddings": 0, "chat": 0}
+    pipeline = fresh_pipeline(work_dir)
+
+    documents = build_corpus(size, seed=size)
+    ingest = []
+    start = time.perf_counter()
+    for i, (content, metadata) in enumerate(documents):
+        doc_start = time.perf_counter()
+        pipeline.process_document(
+            content, metadata, bot_id=f"bot-{i % bots}" if bots else None
+        )
+        ingest.append((time.perf_counter() - doc_start) * 1000)
+    ingest_seconds = time.perf_counter() - start
+
+    question_set = build_questions(questions, seed=size)
+    bot_id = "bot-0" if bots else None
+    cold = run_queries(pipeline, question_set, bot_id)
+    warm = run_queries(pipeline, question_set, bot_id)
+
+    return {
+        "documents": size,
+        "bots": bots,
+        "chunks": len(supabase_server.tables.get("documents", [])),
+        "ingest": {
+            "documents_per_second": round(size / ingest_seconds, 3),
+            "latency": summarize(ingest)
+        },
+        "query_cold": cold,
+        "query_warm": warm,
+        "query_embedding_cache": dict(pipeline.query_embedding_cache.stats),
+        "completion_cache": dict(pipeline.completion_cache.stats),
+        "upstream_requests": dict(openai_server.requests)
+    }
+
+
+def print_summary(results: List[Dict]):
+    """Print one line per corpus size and stage."""
+    print(f"{'docs':>6} {'chunks':>7} {'stage':>11} {'per sec':>9} "
+          f"{'p50':>9} {'p95':>9} {'p99':>9}")
+    for result in results:
+        stages = [
+            ("ingest", result["ingest"]["documents_per_second"], result["ingest"]),
+            ("query_cold", result["query_cold"]["queries_per_second"], result["query_cold"]),
+            ("query_warm", result["query_warm"]["queries_per_second"], result["query_warm"]),
+        ]
+        for name, rate, stage in stages:
+            latency = stage["latency"]
+            print(f"{result['documents']:>6} {result['chunks']:>7} {name:>11} "
+                  f"{rate:>9.2f} {latency['p50_ms']:>7.1f}ms "
+                  f"{latency['p95_ms']:>7.1f}ms {latency['p99_ms']:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 200, 1000],
+        help="Corpus sizes (documents) to benchmark"
+    )
+    parser.add_argument(
+        "--questions", type=int, default=50,
+        help="Questions per pass"
+    )
+    parser.add_argument(
+        "--embedding-latency", type=float, default=0.05,
+        help="Seconds per stand-in embeddings request"
+    )
+    parser.add_argument(
+        "--chat-latency", type=float, default=0.5,
+        help="Seconds per stand-in chat completion"
+    )
+    parser.add_argument(
+        "--db-latency", type=float, default=0.005,
+        help="Seconds per stand-in PostgREST request"
+    )
+    parser.add_argument(
+        "--bots", type=int, default=0,
+        help="Spread documents over this many bot partitions (0 = unpartitioned)"
+    )
+    parser.add_argument(
+        "--output", default="benchmark_results.json",
+        help="Path for the JSON results"
+    )
+    args = parser.parse_args()
+
+    openai_server = FakeOpenAIServer(
+        embedding_latency=args.embedding_latency,
+        chat_latency=args.chat_latency
+    ).start()
+    supabase_server = FakeSupabaseServer(
+        latency=args.db_latency,
+        dimension=int(os.getenv("VECTOR_DIMENSION", 1536))
+    ).start()
+    work_dir = tempfile.mkdtemp(prefix="rag_benchmark_")
+    configure_environment(openai_server, supabase_server, work_dir)
+
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} documents...")
+            results.append(run_size(
+                size, args.questions, openai_server, supabase_server,
+                os.path.join(work_dir, str(size)), args.bots
+            ))
+    finally:
+        openai_server.shutdown()
+        supabase_server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_summary(results)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
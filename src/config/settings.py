@@ -13,21 +13,112 @@ SAMPLE_DOCS_DIR = DATA_DIR / "sample_docs"
 # Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Connection pool shared by every Supabase client in the process (src/db/client.py)
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 20))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", 10))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", 60))  # seconds
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", 5))  # seconds
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 30))  # Read/write/pool, seconds
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
 
 # Anthropic configuration
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 
 # OpenAI configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Optional, e.g. a local stand-in
 
 # Redis configuration (optional)
 REDIS_URL = os.getenv("REDIS_URL")
 REDIS_ENABLED = bool(REDIS_URL)
+# Cached values larger than this many bytes are zlib-compressed
+# (src/core/cache_codec.py); -1 disables compression
+REDIS_COMPRESS_THRESHOLD = int(os.getenv("REDIS_COMPRESS_THRESHOLD", 1024))
 
 # Vector database configuration
-VECTOR_DIMENSION = 1536  # OpenAI embeddings dimension
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_MODEL_DIMENSION = 1536  # Native output size of EMBEDDING_MODEL
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./cache/")
+# Size limit of EMBEDDING_CACHE_DIR and which entries go first: "lru" or "lfu"
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+EMBEDDING_CACHE_POLICY = os.getenv("EMBEDDING_CACHE_POLICY", "lru")
+# Stored and searched dimension, e.g. 256 or 512 (text-embedding-3 vectors
+# shorten well); must match public.document_vectors.embedding, see
+# migrations/005_vector_dimension.sql
+VECTOR_DIMENSION = int(os.getenv("VECTOR_DIMENSION", EMBEDDING_MODEL_DIMENSION))
+# Keep full-size vectors in the local vector index (VECTOR_QUANTIZATION)
+# and rescore shortened-vector candidates on them
+FULL_VECTOR_RESCORE = os.getenv("FULL_VECTOR_RESCORE", "false").lower() == "true"
 CHUNK_SIZE = 500  # Token size for text chunks
 CHUNK_OVERLAP = 50  # Token overlap between chunks
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 3000))  # Source tokens per prompt
+PARENT_CACHE_SIZE = 1024  # Parent document metadata entries cached per process
+
+# Text extraction configuration
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1))
+EXTRACTION_PAGES_PER_SHARD = 8  # Pages handed to a worker at a time
+EXTRACTION_PAGE_TIMEOUT = float(os.getenv("EXTRACTION_PAGE_TIMEOUT", 30))  # seconds
+
+# Bulk loading (python -m src.scripts.bulk_load)
+BULK_LOAD_WORKERS = int(os.getenv("BULK_LOAD_WORKERS", 4))
+BULK_LOAD_MANIFEST = os.getenv("BULK_LOAD_MANIFEST", "./index/bulk_load_manifest.jsonl")
+BULK_LOAD_CHECKPOINT_EVERY = 100  # Documents between index saves
+
+# Chat model configuration
+CHAT_MODEL = "gpt-4o"
+CHAT_MAX_TOKENS = 1000
+CHAT_TEMPERATURE = 0.1
+
+# Completion cache
+COMPLETION_CACHE_SIZE = int(os.getenv("COMPLETION_CACHE_SIZE", 512))
+COMPLETION_CACHE_TTL = 3600  # seconds
+
+# Conversation memory: recent turns kept verbatim, older ones summarized
+MEMORY_TURNS = int(os.getenv("MEMORY_TURNS", 4))
+MEMORY_MAX_CONVERSATIONS = 1024  # Conversations kept per process
+MEMORY_SUMMARY_MAX_TOKENS = 300
+# Tokens of older turns kept while summarization is failing; beyond this
+# the oldest are dropped
+MEMORY_PENDING_MAX_TOKENS = int(os.getenv("MEMORY_PENDING_MAX_TOKENS", 2000))
+
+# Compiled template (case bot) context
+TEMPLATE_CONTEXT_CACHE_SIZE = 256
+TEMPLATE_CONTEXT_REVALIDATE = float(os.getenv("TEMPLATE_CONTEXT_REVALIDATE", 30))  # seconds
+
+# Query embedding cache
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+QUERY_EMBEDDING_CACHE_TTL = 86400  # Shared (Redis) tier expiry, seconds
+
+# Retrieval configuration
+RETRIEVAL_TOP_K = 5  # Chunks returned per query
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "true").lower() == "true"
+RERANK_FETCH_K = 50  # Candidate IDs and vectors fetched before MMR
+MMR_LAMBDA = 0.7  # 1.0 = relevance only, 0.0 = diversity only
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+HYBRID_CANDIDATES = 10  # Candidates per retrieval leg before fusion
+RRF_K = 60  # Reciprocal rank fusion constant
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "./index/lexical_index.pkl")
+CITATION_INDEX_PATH = os.getenv("CITATION_INDEX_PATH", "./index/citation_index.json")
+# "prepend" puts cited chunks ahead of search results; "replace" skips
+# search entirely when a query's citations resolve to chunks
+CITATION_LOOKUP_MODE = os.getenv("CITATION_LOOKUP_MODE", "prepend")
+# First-pass vector search on quantized codes: "none", "int8" (4x smaller)
+# or "binary" (32x smaller); RESCORE_FACTOR first-pass candidates per
+# result are rescored at full precision (binary may need 8-16)
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "./index/vectors")
+RESCORE_FACTOR = int(os.getenv("RESCORE_FACTOR", 4))
+# Bot partitions of each local index kept open; the least recently used
+# is saved and closed beyond this
+INDEX_PARTITIONS_OPEN = int(os.getenv("INDEX_PARTITIONS_OPEN", 32))
+# Prebuilt base-layer corpus (python -m src.scripts.build_base_corpus),
+# memory-mapped at startup and searched alongside case documents
+BASE_CORPUS_ENABLED = os.getenv("BASE_CORPUS_ENABLED", "true").lower() == "true"
+BASE_CORPUS_PATH = os.getenv("BASE_CORPUS_PATH", "./index/base_corpus")
+BASE_CORPUS_SOURCE_DIR = DATA_DIR / "base_corpus"
+
+# Prompt coaching
+PROMPT_COACH_CACHE_SIZE = 4096  # Normalized prompts memoized per coach
 
 # Auto-tagging configuration
 CONFIDENCE_THRESHOLD = 0.85  # Minimum confidence for auto-tagging
@@ -41,6 +132,10 @@ UI_THEME = {
     "font_family": "Inter, Roboto, sans-serif"
 }
 
+# Port of the Prometheus metrics endpoint started by the Streamlit app
+# (src/core/metrics.py); 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))
+
 # Performance settings
 TARGET_RESPONSE_TIME = 5  # seconds
 CACHE_TTL = 3600  # 1 hour cache TTL
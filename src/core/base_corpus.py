@@ -0,0 +1,350 @@
+"""
+Prebuilt base-layer corpus, memory-mapped and searched locally.
+
+The base layer of general legal knowledge (Texas Family Code, Trademark
+Manual, ...) is the same for every deployment, so rather than being
+ingested into each database it is chunked and embedded once by
+src/scripts/build_base_corpus.py into a versioned artifact:
+
+    <root>/CURRENT              name of the active version
+    <root>/<version>/
+        manifest.json           format, embedding model and dimension, documents
+        vectors.f32             (rows, dimension) unit-length float32 vectors
+        text.bin, text.idx      UTF-8 chunk texts and (rows + 1) int64 offsets
+        chunks.i32              (rows, 6) document, ordinal, start, end,
+                                page_start, page_end (-1 when unknown)
+        citations.json          citation key -> [first, last) range of
+        citation_rows.i32,      the (row, score) postings
+        citation_scores.f32
+
+Everything except the manifest and the citation keys is memory-mapped,
+so opening the artifact at startup takes milliseconds and only the pages
+a query touches are read. Search is exact and makes no network calls.
+The version is a hash of the sources and the chunking and embedding
+settings; versions other than CURRENT can be deleted.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.citations import CitationIndex, extract_citations
+from src.core.dimensions import shorten
+
+FORMAT_VERSION = 1
+
+_CHUNK_COLUMNS = 6
+
+
+def corpus_version(source_digests: List[str], settings: Dict) -> str:
+    """
+    Version of an artifact built from these sources and settings.
+
+    Args:
+        source_digests: SHA-256 of each source file
+        settings: Chunking and embedding settings the build used
+
+    Returns:
+        16 hex characters, the same for the same inputs in any order
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {"format": FORMAT_VERSION, "settings": settings, "sources": sorted(source_digests)},
+        sort_keys=True
+    ).encode())
+    return digest.hexdigest()[:16]
+
+
+def _files(directory: str) -> Dict[str, str]:
+    return {
+        name: os.path.join(directory, name)
+        for name in (
+            "manifest.json", "vectors.f32", "text.bin", "text.idx", "chunks.i32",
+            "citations.json", "citation_rows.i32", "citation_scores.f32"
+        )
+    }
+
+
+def write_base_corpus(
+    root: str,
+    version: str,
+    documents: List[Dict],
+    chunks: List[Dict],
+    vectors: np.ndarray,
+    info: Dict,
+    dimension: Optional[int] = None
+) -> str:
+    """
+    Write an artifact version and make it current.
+
+    The version is written to a temporary directory and renamed into
+    place, then CURRENT is replaced, so readers never see a partial build.
+
+    Args:
+        root: Artifact root directory
+        version: Version name, from corpus_version()
+        documents: Document-level metadata, one dict per document
+        chunks: Chunks with document (index into documents), ordinal,
+            content, start, end, page_start and page_end
+        vectors: One embedding per chunk
+        info: Extra manifest fields, e.g. embedding_model and settings
+        dimension: Vector dimension; defaults to that of vectors, and is
+            required when there are no chunks and vectors is not 2-D
+
+    Returns:
+        Path of the version directory
+
+    Raises:
+        ValueError: If the dimension cannot be determined
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dimension is None:
+        if vectors.ndim != 2:
+            raise ValueError("dimension is required unless vectors is (rows, dimension)")
+        dimension = vectors.shape[-1]
+    dimension = int(dimension)
+    vectors = vectors.reshape(len(chunks), dimension)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+
+    directory = os.path.join(root, version)
+    tmp_directory = f"{directory}.tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+    files = _files(tmp_directory)
+
+    vectors.tofile(files["vectors.f32"])
+
+    texts = [chunk["content"].encode("utf-8") for chunk in chunks]
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(text) for text in texts])
+    with open(files["text.bin"], "wb") as f:
+        for text in texts:
+            f.write(text)
+    offsets.tofile(files["text.idx"])
+
+    def column(value: Optional[int]) -> int:
+        return -1 if value is None else value
+
+    np.array(
+        [
+            [
+                chunk["document"], chunk["ordinal"], column(chunk.get("start")),
+                column(chunk.get("end")), column(chunk.get("page_start")),
+                column(chunk.get("page_end"))
+            ]
+            for chunk in chunks
+        ],
+        dtype=np.int32
+    ).reshape(len(chunks), _CHUNK_COLUMNS).tofile(files["chunks.i32"])
+
+    # Same scoring as the case citation index, flattened into postings
+    citations = CitationIndex()
+    citations.add_many((str(row), chunk["content"]) for row, chunk in enumerate(chunks))
+    keys = {}
+    rows: List[int] = []
+    scores: List[float] = []
+    for key in sorted(citations.entries):
+        postings = citations.entries[key]
+        keys[key] = [len(rows), len(rows) + len(postings)]
+        for row, score in postings.items():
+            rows.append(int(row))
+            scores.append(score)
+    with open(files["citations.json"], "w", encoding="utf-8") as f:
+        json.dump(keys, f)
+    np.array(rows, dtype=np.int32).tofile(files["citation_rows.i32"])
+    np.array(scores, dtype=np.float32).tofile(files["citation_scores.f32"])
+
+    manifest = {
+        **info,
+        "format": FORMAT_VERSION,
+        "version": version,
+        "created_at": time.time(),
+        "rows": len(chunks),
+        "dimension": dimension,
+        "documents": documents
+    }
+    with open(files["manifest.json"], "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+
+    current = os.path.join(root, "CURRENT")
+    with open(f"{current}.tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(f"{current}.tmp", current)
+    return directory
+
+
+def current_version(root: str) -> Optional[str]:
+    """Name of the active version under root, or None if there is none."""
+    try:
+        with open(os.path.join(root, "CURRENT"), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _map(path: str, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+    """Memory-map a file read-only; empty files (mmap refuses them) become empty arrays."""
+    if not shape or 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class BaseCorpus:
+    def __init__(self, root: str, version: Optional[str] = None):
+        """
+        Open an artifact version, memory-mapping its arrays.
+
+        Args:
+            root: Artifact root directory
+            version: Version to open; defaults to CURRENT
+
+        Raises:
+            FileNotFoundError: If there is no such version
+            ValueError: If the artifact has an unknown format
+        """
+        version = version or current_version(root)
+        if version is None:
+            raise FileNotFoundError(f"No base corpus under {root}; run build_base_corpus")
+        self.path = os.path.join(root, version)
+        files = _files(self.path)
+        with open(files["manifest.json"], "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["format"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Base corpus {self.path} has format {self.manifest['format']}, "
+                f"expected {FORMAT_VERSION}; rebuild it"
+            )
+
+        self.version = version
+        self.embedding_model = self.manifest.get("embedding_model")
+        self.dimension = self.manifest["dimension"]
+        self.documents = self.manifest["documents"]
+        rows = self.manifest["rows"]
+
+        self._vectors = _map(files["vectors.f32"], np.float32, (rows, self.dimension))
+        self._offsets = _map(files["text.idx"], np.int64, (rows + 1,))
+        self._text = _map(files["text.bin"], np.uint8, (int(self._offsets[-1]) if rows else 0,))
+        self._chunks = _map(files["chunks.i32"], np.int32, (rows, _CHUNK_COLUMNS))
+
+        with open(files["citations.json"], "r", encoding="utf-8") as f:
+            self._citation_keys: Dict[str, List[int]] = json.load(f)
+        postings = max((end for _, end in self._citation_keys.values()), default=0)
+        self._citation_rows = _map(files["citation_rows.i32"], np.int32, (postings,))
+        self._citation_scores = _map(files["citation_scores.f32"], np.float32, (postings,))
+
+        # IDs are unique per version, so cached answers built on an older
+        # build are not reused
+        self._id_prefix = f"base:{version}:"
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def chunk_id(self, row: int) -> str:
+        return f"{self._id_prefix}{row}"
+
+    def owns(self, chunk_id: str) -> bool:
+        """Whether a chunk ID belongs to this corpus."""
+        return chunk_id.startswith(self._id_prefix)
+
+    def search(self, query_embedding: List[float], k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Exact cosine search.
+
+        Args:
+            query_embedding: Query vector, at the corpus dimension or
+                longer (it is shortened to match)
+            k: Number of results
+
+        Returns:
+            [(row, similarity)], best first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if len(query) < self.dimension:
+            raise ValueError(
+                f"Query dimension {len(query)} is smaller than the base corpus "
+                f"dimension {self.dimension}"
+            )
+        query = shorten(query, self.dimension)
+        if not len(self) or k <= 0:
+            return []
+        scores = self._vectors @ query
+        k = min(k, len(scores))
+        rows = np.argpartition(-scores, k - 1)[:k]
+        rows = rows[np.argsort(-scores[rows])]
+        return [(int(row), float(scores[row])) for row in rows]
+
+    def lookup_citations(self, query: str, limit: int = 5) -> List[int]:
+        """
+        Find rows for the citations in a query, scored like CitationIndex.lookup.
+
+        Returns:
+            Rows, best first
+        """
+        scores: Dict[int, float] = {}
+        for citation in extract_citations(query):
+            for depth, key in enumerate(citation["keys"]):
+                span = self._citation_keys.get(key)
+                if span is None:
+                    continue
+                weight = 0.5 ** depth
+                rows = self._citation_rows[span[0]:span[1]]
+                for row, score in zip(rows.tolist(), self._citation_scores[span[0]:span[1]].tolist()):
+                    scores[row] = max(scores.get(row, 0.0), score * weight)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [row for row, _ in ranked[:limit]]
+
+    def get(self, rows: List[int]) -> List[Dict]:
+        """
+        Build search results for rows, shaped like SupabaseVectorStore's.
+
+        Returns:
+            Dicts with content, metadata, id and parent_id
+        """
+        results = []
+        for row in rows:
+            document, ordinal, start, end, page_start, page_end = self._chunks[row].tolist()
+            text = self._text[self._offsets[row]:self._offsets[row + 1]].tobytes()
+            metadata = {
+                **self.documents[document]["metadata"],
+                "chunk_index": ordinal,
+                "start": start,
+                "end": end
+            }
+            if page_start >= 0:
+                metadata["page"] = page_start
+                metadata["page_end"] = page_end
+            results.append({
+                "content": text.decode("utf-8"),
+                "metadata": metadata,
+                "id": self.chunk_id(row),
+                "parent_id": f"{self._id_prefix}doc{document}"
+            })
+        return results
+
+
+_corpora: Dict[str, Optional[BaseCorpus]] = {}
+_corpora_lock = threading.Lock()
+
+
+def get_base_corpus(root: str) -> Optional[BaseCorpus]:
+    """
+    Return the process-wide base corpus under root, or None if none is built.
+
+    The artifact is opened once per process; restart to pick up a rebuild.
+    """
+    with _corpora_lock:
+        if root not in _corpora:
+            corpus = None
+            if current_version(root) is not None:
+                corpus = BaseCorpus(root)
+            _corpora[root] = corpus
+        return _corpora[root]
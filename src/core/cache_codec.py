@@ -0,0 +1,97 @@
+"""
+Versioned binary encoding for values cached in Redis.
+
+Values are serialized as JSON with orjson when it is installed (the
+standard library reads the same payloads, only slower) and zlib-compressed
+when they are larger than a threshold, which shrinks source-heavy search
+results and completions several times over. Every payload starts with a
+4-byte header holding the codec format, flags and the cache's schema
+version. A payload written by another schema version, by an older writer
+that stored plain text, or that is corrupt, decodes as a miss rather than
+as stale or foreign data.
+"""
+import json
+import struct
+import zlib
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# format, flags, schema version
+_HEADER = struct.Struct(">BBH")
+_FORMAT = 0xC1
+_COMPRESSED = 0x01
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CacheCodec:
+    def __init__(
+        self,
+        name: str,
+        version: int = 1,
+        compress_threshold: int = 1024,
+        compress_level: int = 1
+    ):
+        """
+        Initialize the codec for one cache.
+
+        Args:
+            name: Cache name, used in warnings
+            version: Schema version of the cached values; bump it when
+                their shape changes so old entries read as misses
+            compress_threshold: Serialized size in bytes above which
+                payloads are compressed; 0 compresses everything, a
+                negative value nothing
+            compress_level: zlib level; 1 is fastest
+        """
+        self.name = name
+        self.version = version
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize a JSON-compatible value with the header."""
+        data = _dumps(value)
+        flags = 0
+        if 0 <= self.compress_threshold <= len(data):
+            compressed = zlib.compress(data, self.compress_level)
+            if len(compressed) < len(data):
+                data = compressed
+                flags |= _COMPRESSED
+        return _HEADER.pack(_FORMAT, flags, self.version) + data
+
+    def decode(self, payload: Optional[bytes]) -> Optional[Any]:
+        """
+        Deserialize a payload written by encode().
+
+        Returns:
+            The value, or None for a missing, foreign-version or corrupt
+            payload
+        """
+        if not payload or len(payload) < _HEADER.size or isinstance(payload, str):
+            return None
+        fmt, flags, version = _HEADER.unpack_from(payload)
+        if fmt != _FORMAT or version != self.version:
+            return None
+        data = memoryview(payload)[_HEADER.size:]
+        try:
+            if flags & _COMPRESSED:
+                data = zlib.decompress(data)
+            return _loads(bytes(data))
+        except (zlib.error, ValueError) as e:
+            print(f"Warning: discarding corrupt {self.name} cache entry: {e}")
+            return None
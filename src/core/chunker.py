@@ -0,0 +1,205 @@
+"""
+Legal-structure-aware text chunker.
+
+The text is tokenized once. Chunk boundaries are then chosen from candidate
+break points found in a single regex pass, preferring statute sections (§),
+headings, numbered subsections and paragraph breaks within the token budget.
+Every chunk carries its character offsets and, when page offsets from the
+extraction layer are supplied, the pages it spans.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+import tiktoken
+
+# Break priorities, highest first
+SECTION, HEADING, SUBSECTION, PARAGRAPH, SENTENCE = 4, 3, 2, 1, 0
+
+# One combined pattern so candidate breaks are found in a single scan.
+# Line-start markers break before the marker; paragraph and sentence
+# breaks break after the matched separator.
+_BREAK_PATTERN = re.compile(
+    r"(?P<section>^[ \t]*(?:§|Sec\.|SECTION\s+\d|Section\s+\d|"
+    r"SUBCHAPTER\s|CHAPTER\s|Art\.\s|ARTICLE\s))"
+    r"|(?P<heading>^[ \t]*[A-Z][A-Z0-9 ,.'&()-]{3,}[ \t]*$)"
+    r"|(?P<subsection>^[ \t]*\((?:[a-z]{1,2}|\d{1,3}|[ivxl]{1,6})\)[ \t])"
+    r"|(?P<paragraph>\n[ \t]*\n)"
+    r"|(?P<sentence>[.;:](?=[ \t\n]))",
+    re.MULTILINE
+)
+
+_PRIORITIES = {
+    "section": SECTION,
+    "heading": HEADING,
+    "subsection": SUBSECTION,
+    "paragraph": PARAGRAPH,
+    "sentence": SENTENCE,
+}
+
+
+class LegalChunker:
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        encoding_name: str = "cl100k_base",
+        min_chunk_ratio: float = 0.25
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_size: Maximum tokens per chunk
+            chunk_overlap: Tokens repeated between chunks when a chunk has
+                to be cut inside a paragraph
+            encoding_name: tiktoken encoding used to count tokens
+            min_chunk_ratio: Structural breaks before this fraction of the
+                budget are ignored, to avoid tiny chunks
+        """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.min_chunk_tokens = int(chunk_size * min_chunk_ratio)
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def _find_breaks(self, text: str) -> Dict[int, int]:
+        """Return candidate break positions mapped to their priority."""
+        breaks: Dict[int, int] = {}
+        for match in _BREAK_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind in ("paragraph", "sentence"):
+                position = match.end()
+            else:
+                position = match.start()
+            priority = _PRIORITIES[kind]
+            if breaks.get(position, -1) < priority:
+                breaks[position] = priority
+        return breaks
+
+    def split(
+        self,
+        text: str,
+        pages: Optional[List[Dict]] = None
+    ) -> List[Dict]:
+        """
+        Split text into chunks with offsets.
+
+        Args:
+            text: Document text content
+            pages: Optional page offsets from the extraction layer
+
+        Returns:
+            List of dicts with "content", "start" and "end" character
+            offsets, "tokens", and "page_start"/"page_end" (None when no
+            page offsets were supplied)
+        """
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if not tokens:
+            return []
+        _, token_starts = self.encoding.decode_with_offsets(tokens)
+        n_tokens = len(tokens)
+
+        breaks = self._find_breaks(text)
+        break_positions = sorted(breaks)
+        break_tokens = [
+            bisect_left(token_starts, position)
+            for position in break_positions
+        ]
+        page_starts = [page["start"] for page in pages] if pages else None
+
+        chunks = []
+        start_tok = 0
+        start_char = 0
+        while start_tok < n_tokens:
+            limit_tok = start_tok + self.chunk_size
+            if limit_tok >= n_tokens:
+                end_char = next_char = len(text)
+                next_tok = n_tokens
+            else:
+                # Best break in the window: highest priority, then latest
+                lo = bisect_right(break_tokens, start_tok + self.min_chunk_tokens)
+                hi = bisect_right(break_tokens, limit_tok)
+                best = self._best_break(breaks, break_positions, lo, hi)
+
+                # A short chunk ending at a section beats a mid-paragraph cut
+                if best is None or breaks[break_positions[best]] < PARAGRAPH:
+                    early = self._best_break(
+                        breaks, break_positions,
+                        bisect_right(break_tokens, start_tok), lo
+                    )
+                    if early is not None and breaks[break_positions[early]] >= PARAGRAPH:
+                        best = early
+
+                if best is not None and breaks[break_positions[best]] >= PARAGRAPH:
+                    end_char = next_char = break_positions[best]
+                    next_tok = break_tokens[best]
+                else:
+                    # No structural break; cut at a sentence or the budget
+                    # and carry some overlap into the next chunk
+                    end_tok = break_tokens[best] if best is not None else limit_tok
+                    end_char = (
+                        break_positions[best] if best is not None
+                        else token_starts[end_tok]
+                    )
+                    next_tok = max(end_tok - self.chunk_overlap, start_tok + 1)
+                    next_char = token_starts[next_tok]
+
+            chunk = self._make_chunk(
+                text, start_char, end_char, pages, page_starts
+            )
+            if chunk:
+                chunk["tokens"] = min(next_tok, n_tokens) - start_tok
+                chunks.append(chunk)
+
+            start_tok = next_tok
+            start_char = next_char
+
+        return chunks
+
+    def _best_break(
+        self,
+        breaks: Dict[int, int],
+        break_positions: List[int],
+        lo: int,
+        hi: int
+    ) -> Optional[int]:
+        """Index of the highest-priority, latest break in [lo, hi)."""
+        best = None
+        for i in range(lo, hi):
+            priority = breaks[break_positions[i]]
+            if best is None or priority >= breaks[break_positions[best]]:
+                best = i
+        return best
+
+    def _make_chunk(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        pages: Optional[List[Dict]],
+        page_starts: Optional[List[int]]
+    ) -> Optional[Dict]:
+        """Build a chunk dict, trimming surrounding whitespace from the span."""
+        content = text[start:end]
+        stripped = content.strip()
+        if not stripped:
+            return None
+        start += len(content) - len(content.lstrip())
+        end = start + len(stripped)
+
+        page_start = page_end = None
+        if page_starts:
+            page_start = pages[max(bisect_right(page_starts, start) - 1, 0)]["page"]
+            page_end = pages[max(bisect_right(page_starts, end - 1) - 1, 0)]["page"]
+
+        return {
+            "content": stripped,
+            "start": start,
+            "end": end,
+            "page_start": page_start,
+            "page_end": page_end
+        }
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunk strings (TextSplitter-compatible)."""
+        return [chunk["content"] for chunk in self.split(text)]
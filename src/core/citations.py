@@ -0,0 +1,236 @@
+"""
+Legal citation extraction and the citation -> chunk index.
+
+Citations are normalized so different spellings of the same reference map
+to the same key: "Tex. Fam. Code § 153.002", "Texas Family Code §153.002"
+and "Texas §153.002" all become "TFC §153.002". Each citation is also
+indexed under broader keys (the bare section, the section without its
+subsection), so a query for "§153.134" finds chunks citing "§153.134(a)".
+Reporter citations ("347 U.S. 483", "123 S.W.3d 45") are keyed on volume,
+reporter and first page, ignoring spacing and periods in the reporter.
+"""
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_SECTION = r"§+\s*(\d+(?:\.\d+)*)((?:\([a-z0-9]{1,4}\))*)"
+
+_TEXAS_FAMILY_CODE = re.compile(
+    r"(?:Tex(?:as|\.)?\s+Fam(?:ily|\.)?\s+Code(?:\s+Ann\.)?|Texas|TFC)"
+    r"\s*(?:§+|Section|Sec\.)\s*(\d+(?:\.\d+)*)((?:\([a-z0-9]{1,4}\))*)",
+    re.IGNORECASE
+)
+_USC = re.compile(
+    r"(\d+)\s*U\.?\s?S\.?\s?C\.?(?:\s*A\.?)?\s*(?:§+|Sections?|Sec\.)?\s*"
+    r"(\d+[a-z]?)((?:\([a-z0-9]{1,4}\))*)",
+    re.IGNORECASE
+)
+_TMEP = re.compile(
+    r"(?:TMEP|Trademark\s+Manual\s+of\s+Examining\s+Procedure)\s*"
+    r"(?:§+|Section)?\s*(\d+(?:\.\d+)*)((?:\([a-z0-9]{1,4}\))*)",
+    re.IGNORECASE
+)
+_REPORTER = re.compile(
+    r"\b(\d{1,4})\s+("
+    r"U\.\s?S\.|S\.\s?Ct\.|L\.\s?Ed\.(?:\s?2d)?"
+    r"|F\.\s?Supp\.(?:\s?(?:2d|3d))?|F\.\s?App'x|F\.(?:\s?(?:2d|3d|4th))?"
+    r"|S\.\s?W\.(?:\s?(?:2d|3d))?|U\.?\s?S\.?\s?P\.?\s?Q\.?(?:\s?2d)?"
+    r")\s+(\d{1,5})\b"
+)
+_BARE_SECTION = re.compile(_SECTION, re.IGNORECASE)
+_PARTY = r"[A-Z][\w'&.-]*(?:\s+(?:of\s+|the\s+)?[A-Z][\w'&.-]*){0,3}"
+_CASE_NAME = re.compile(
+    r"\b(" + _PARTY + r")\s+v(?:s)?\.?\s+(" + _PARTY + r")"
+    r"(?:,?\s*\(?((?:19|20)\d{2})\)?)?"
+)
+
+# Words that start a sentence rather than a party name
+_CASE_PREFIXES = {"in", "see", "cf", "under", "per", "and", "but", "also"}
+# Articles dropped from party names, so "The State" and "State" match
+_ARTICLES = {"the", "a", "an"}
+
+
+def _section_keys(prefix: str, number: str, subsections: str) -> List[str]:
+    """Keys for a section cite, most specific first."""
+    keys = []
+    if subsections:
+        keys.append(f"{prefix}§{number}{subsections.lower()}")
+    keys.append(f"{prefix}§{number}")
+    return keys
+
+
+def _clean_party(party: str, prefixes: Iterable[str] = _CASE_PREFIXES) -> str:
+    """Drop leading sentence words (for the first party) and articles."""
+    skip = set(prefixes) | _ARTICLES
+    words = party.split()
+    while words and words[0].lower().strip(".") in skip:
+        words = words[1:]
+    return " ".join(words)
+
+
+def extract_citations(text: str) -> List[Dict]:
+    """
+    Find and normalize legal citations in text.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        List of dicts with "citation" (normalized), "keys" (lookup keys,
+        most specific first), "kind", "start" and "end"
+    """
+    citations = []
+    claimed: List[Tuple[int, int]] = []
+
+    def overlaps(start: int, end: int) -> bool:
+        return any(start < c_end and c_start < end for c_start, c_end in claimed)
+
+    def add(kind: str, match: re.Match, keys: List[str]):
+        claimed.append((match.start(), match.end()))
+        citations.append({
+            "citation": keys[0],
+            "keys": keys,
+            "kind": kind,
+            "start": match.start(),
+            "end": match.end()
+        })
+
+    for match in _TEXAS_FAMILY_CODE.finditer(text):
+        number, subsections = match.group(1), match.group(2)
+        keys = _section_keys("TFC ", number, subsections)
+        add("texas_family_code", match, keys + _section_keys("", number, subsections))
+
+    for match in _USC.finditer(text):
+        if overlaps(match.start(), match.end()):
+            continue
+        title, number, subsections = match.groups()
+        add("usc", match, _section_keys(f"{title} U.S.C. ", number, subsections))
+
+    for match in _TMEP.finditer(text):
+        if overlaps(match.start(), match.end()):
+            continue
+        number, subsections = match.groups()
+        add("tmep", match, _section_keys("TMEP ", number, subsections))
+
+    for match in _REPORTER.finditer(text):
+        if overlaps(match.start(), match.end()):
+            continue
+        volume, reporter, page = match.groups()
+        reporter = re.sub(r"[\s.]", "", reporter).lower()
+        add("reporter", match, [f"{volume} {reporter} {page}"])
+
+    for match in _BARE_SECTION.finditer(text):
+        if overlaps(match.start(), match.end()):
+            continue
+        number, subsections = match.groups()
+        add("section", match, _section_keys("", number, subsections))
+
+    for match in _CASE_NAME.finditer(text):
+        if overlaps(match.start(), match.end()):
+            continue
+        plaintiff = _clean_party(match.group(1))
+        defendant = _clean_party(match.group(2), prefixes=())
+        if not plaintiff or not defendant:
+            continue
+        name = f"{plaintiff} v. {defendant}".lower()
+        keys = [name]
+        if match.group(3):
+            keys.insert(0, f"{name} ({match.group(3)})")
+        add("case", match, keys)
+
+    citations.sort(key=lambda c: c["start"])
+    return citations
+
+
+class CitationIndex:
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the index, loading it from disk if it exists.
+
+        Args:
+            path: Optional JSON file to persist the index to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # citation key -> {chunk_id: score}
+        self.entries: Dict[str, Dict[str, float]] = {}
+
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, chunk_id: str, text: str) -> List[str]:
+        """
+        Index the citations found in a chunk.
+
+        A chunk that opens with a citation (the statute section itself,
+        rather than a passage citing it) scores higher for that citation.
+
+        Returns:
+            Normalized citations found in the chunk
+        """
+        citations = extract_citations(text)
+        with self._lock:
+            for citation in citations:
+                score = 5.0 if citation["start"] == 0 else 1.0
+                for key in citation["keys"]:
+                    chunks = self.entries.setdefault(key, {})
+                    chunks[chunk_id] = chunks.get(chunk_id, 0.0) + score
+        return list(dict.fromkeys(c["citation"] for c in citations))
+
+    def add_many(self, chunks: Iterable[Tuple[str, str]]):
+        """Index (chunk_id, text) pairs."""
+        for chunk_id, text in chunks:
+            self.add(chunk_id, text)
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Remove chunks from the index."""
+        chunk_ids = set(chunk_ids)
+        with self._lock:
+            for key in list(self.entries):
+                chunks = self.entries[key]
+                for chunk_id in chunk_ids.intersection(chunks):
+                    del chunks[chunk_id]
+                if not chunks:
+                    del self.entries[key]
+
+    def lookup(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Find chunks for the citations in a query.
+
+        Each query citation is looked up under all of its keys, with
+        broader keys weighted down, so "§153.134(a)" also finds chunks
+        for "§153.134" and the section itself outranks passages citing it.
+
+        Returns:
+            Chunk IDs, best first
+        """
+        scores: Dict[str, float] = {}
+        with self._lock:
+            for citation in extract_citations(query):
+                for depth, key in enumerate(citation["keys"]):
+                    weight = 0.5 ** depth
+                    for chunk_id, score in self.entries.get(key, {}).items():
+                        scores[chunk_id] = max(
+                            scores.get(chunk_id, 0.0), score * weight
+                        )
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [chunk_id for chunk_id, _ in ranked[:limit]]
+
+    def save(self):
+        """Write the index atomically to its path."""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,211 @@
+"""
+LLM completion cache.
+
+The same question against the same retrieved chunks (page refreshes,
+shared links) produces the same low-temperature answer, so completions are
+cached under a hash of the model, its parameters, the normalized question
+and the ordered source chunk IDs with a version derived from each chunk's
+content. A reverse index from chunk ID to cache keys lets callers drop
+every completion built on a chunk when that chunk changes or is deleted.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.cache_codec import CacheCodec
+from src.core.embedding_cache import normalize_query
+from src.core.metrics import record_cache
+
+# Bump when the prompt template changes so old answers are not reused
+PROMPT_VERSION = "1"
+
+
+def chunk_version(content: str) -> str:
+    """Short content hash used as a chunk's version."""
+    return hashlib.sha1(content.encode()).hexdigest()[:12]
+
+
+class CompletionCache:
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl: int = 3600,
+        redis_client=None,
+        compress_threshold: int = 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum entries in the in-memory tier
+            ttl: Seconds before an entry expires
+            redis_client: Optional Redis client for a shared tier
+            compress_threshold: Size in bytes above which completions are
+                compressed in the shared tier
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self.codec = CacheCodec(
+            "completion", version=1, compress_threshold=compress_threshold
+        )
+        # key -> (expires_at, completion, chunk_ids)
+        self._entries: "OrderedDict[str, Tuple[float, Dict, List[str]]]" = OrderedDict()
+        self._keys_by_chunk: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def make_key(
+        self,
+        model: str,
+        params: Dict,
+        question: str,
+        sources: List[Dict],
+        history: str = "",
+        context_version: str = ""
+    ) -> str:
+        """
+        Build a deterministic cache key.
+
+        Args:
+            model: Chat model name
+            params: Generation parameters (temperature, max_tokens, ...)
+            question: User question
+            sources: Assembled sources, in prompt order, each with
+                "chunk_ids" and "content"
+            history: Conversation memory included in the prompt
+            context_version: Version of the template context prefix
+        """
+        payload = json.dumps(
+            {
+                "prompt_version": PROMPT_VERSION,
+                "model": model,
+                "params": params,
+                "question": normalize_query(question),
+                "history": history,
+                "context_version": context_version,
+                "sources": [
+                    [source["chunk_ids"], chunk_version(source["content"])]
+                    for source in sources
+                ]
+            },
+            sort_keys=True
+        )
+        return "completion:" + hashlib.sha256(payload.encode()).hexdigest()
+
+    def _drop(self, key: str):
+        """Remove an entry and its reverse-index links (lock held)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for chunk_id in entry[2]:
+            keys = self._keys_by_chunk.get(chunk_id)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_chunk[chunk_id]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached completion, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    record_cache("completion", "memory_hit")
+                    return entry[1]
+                self._drop(key)
+
+        if self.redis_client:
+            try:
+                cached = self.codec.decode(self.redis_client.get(key))
+                if cached is not None:
+                    with self._lock:
+                        self.stats["hits"] += 1
+                    record_cache("completion", "shared_hit")
+                    return cached
+            except Exception as e:
+                print(f"Redis cache error: {e}")
+
+        with self._lock:
+            self.stats["misses"] += 1
+        record_cache("completion", "miss")
+        return None
+
+    def put(self, key: str, completion: Dict, chunk_ids: Iterable[str]):
+        """Store a completion and index it by the chunks it was built on."""
+        chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id]
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.time() + self.ttl, completion, chunk_ids)
+            for chunk_id in chunk_ids:
+                self._keys_by_chunk.setdefault(chunk_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.setex(key, self.ttl, self.codec.encode(completion))
+                for chunk_id in chunk_ids:
+                    pipe.sadd(f"completion_chunk:{chunk_id}", key)
+                    pipe.expire(f"completion_chunk:{chunk_id}", self.ttl)
+                pipe.execute()
+            except Exception as e:
+                print(f"Redis cache error: {e}")
+
+    def invalidate_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """
+        Drop every completion built on any of the given chunks.
+
+        Returns:
+            Number of in-memory entries removed
+        """
+        chunk_ids = list(chunk_ids)
+        removed = 0
+        with self._lock:
+            for chunk_id in chunk_ids:
+                for key in list(self._keys_by_chunk.get(chunk_id, ())):
+                    self._drop(key)
+                    removed += 1
+            self.stats["invalidations"] += removed
+
+        if self.redis_client and chunk_ids:
+            try:
+                for chunk_id in chunk_ids:
+                    index_key = f"completion_chunk:{chunk_id}"
+                    keys = self.redis_client.smembers(index_key)
+                    if keys:
+                        self.redis_client.delete(*keys)
+                    self.redis_client.delete(index_key)
+            except Exception as e:
+                print(f"Redis cache error: {e}")
+
+        return removed
+
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache(
+    max_size: int = 512,
+    ttl: int = 3600,
+    redis_client=None,
+    compress_threshold: int = 1024
+) -> CompletionCache:
+    """Return the process-wide completion cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache(
+                max_size=max_size,
+                ttl=ttl,
+                redis_client=redis_client,
+                compress_threshold=compress_threshold
+            )
+        return _cache
@@ -0,0 +1,144 @@
+"""
+Token-budgeted context assembly for RAG prompts.
+
+Retrieved chunks from the same parent document are merged when they overlap
+or sit next to each other, duplicate spans are dropped, and the merged
+passages are packed into a fixed token budget in order of relevance.
+"""
+from typing import Dict, List, Optional
+
+import tiktoken
+
+# Passages with less room than this are dropped rather than truncated
+MIN_TRUNCATED_TOKENS = 50
+
+
+class ContextAssembler:
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        encoding_name: str = "o200k_base",
+        max_gap: int = 2
+    ):
+        """
+        Initialize the context assembler.
+
+        Args:
+            token_budget: Maximum tokens of source text in the prompt
+            encoding_name: tiktoken encoding of the chat model
+            max_gap: Characters between two chunks of the same parent that
+                still count as adjacent (chunk text is whitespace-trimmed)
+        """
+        self.token_budget = token_budget
+        self.max_gap = max_gap
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def _merge_parent(self, chunks: List[Dict]) -> List[Dict]:
+        """Merge overlapping and adjacent chunks of one parent document."""
+        chunks = sorted(chunks, key=lambda c: c["metadata"]["start"])
+        passages = []
+        for chunk in chunks:
+            metadata = chunk["metadata"]
+            current = passages[-1] if passages else None
+            if current and metadata["start"] <= current["end"] + self.max_gap:
+                if metadata["end"] > current["end"]:
+                    if metadata["start"] < current["end"]:
+                        # Keep only the part not already in the passage
+                        overlap = current["end"] - metadata["start"]
+                        current["content"] += chunk["content"][overlap:]
+                    else:
+                        current["content"] += "\n" + chunk["content"]
+                    current["end"] = metadata["end"]
+                current["rank"] = min(current["rank"], chunk["rank"])
+                current["chunk_ids"].append(chunk["id"])
+                if metadata.get("page_end") is not None:
+                    current["page_end"] = max(
+                        current.get("page_end") or 0, metadata["page_end"]
+                    )
+            else:
+                passages.append({
+                    "content": chunk["content"],
+                    "metadata": metadata,
+                    "start": metadata["start"],
+                    "end": metadata["end"],
+                    "page_end": metadata.get("page_end"),
+                    "rank": chunk["rank"],
+                    "chunk_ids": [chunk["id"]]
+                })
+        return passages
+
+    def assemble(
+        self,
+        results: List[Dict],
+        token_budget: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Build prompt sources from ranked search results.
+
+        Args:
+            results: Search results, most relevant first, as returned by
+                SupabaseVectorStore.similarity_search
+            token_budget: Optional override of the configured budget
+
+        Returns:
+            List of source dicts with "content", "metadata", "chunk_ids"
+            and "tokens", most relevant first
+        """
+        budget = token_budget or self.token_budget
+
+        by_parent: Dict[str, List[Dict]] = {}
+        passages = []
+        seen_content = set()
+        for rank, doc in enumerate(results):
+            # Exact duplicates (e.g. the same chunk from two retrievers)
+            if doc["content"] in seen_content:
+                continue
+            seen_content.add(doc["content"])
+
+            chunk = {**doc, "rank": rank}
+            metadata = doc.get("metadata") or {}
+            if doc.get("parent_id") and metadata.get("start") is not None:
+                by_parent.setdefault(doc["parent_id"], []).append(chunk)
+            else:
+                passages.append({
+                    "content": doc["content"],
+                    "metadata": metadata,
+                    "rank": rank,
+                    "chunk_ids": [doc.get("id")]
+                })
+
+        for chunks in by_parent.values():
+            for passage in self._merge_parent(chunks):
+                passage["metadata"] = {
+                    **passage["metadata"],
+                    "start": passage.pop("start"),
+                    "end": passage.pop("end")
+                }
+                page_end = passage.pop("page_end")
+                if page_end is not None:
+                    passage["metadata"]["page_end"] = page_end
+                passages.append(passage)
+
+        passages.sort(key=lambda p: p["rank"])
+
+        sources = []
+        remaining = budget
+        for passage in passages:
+            if remaining <= 0:
+                break
+            tokens = self.encoding.encode(passage["content"], disallowed_special=())
+            if len(tokens) > remaining:
+                if remaining < MIN_TRUNCATED_TOKENS:
+                    continue
+                tokens = tokens[:remaining]
+                passage["content"] = self.encoding.decode(tokens)
+                passage["metadata"] = {**passage["metadata"], "truncated": True}
+            remaining -= len(tokens)
+            sources.append({
+                "content": passage["content"],
+                "metadata": passage["metadata"],
+                "chunk_ids": passage["chunk_ids"],
+                "tokens": len(tokens)
+            })
+
+        return sources
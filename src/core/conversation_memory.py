@@ -0,0 +1,184 @@
+"""
+Bounded conversation memory.
+
+Each conversation (bot, user) keeps its last few turns verbatim and a
+rolling summary of everything older. When a turn falls out of the window
+it is folded into the summary by a background task, so answering never
+waits on summarization and the prompt stays the same size however long
+the chat grows. If summarization keeps failing, turns waiting for it are
+capped at a token budget and the oldest are dropped.
+"""
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional, Tuple
+
+# (question, answer)
+Turn = Tuple[str, str]
+
+
+class Conversation:
+    """Recent turns and rolling summary of one conversation."""
+
+    def __init__(self):
+        self.turns: Deque[Turn] = deque()
+        self.summary = ""
+        # Turns evicted from the window but not yet in the summary; they
+        # stay in the prompt until it is updated
+        self.pending: List[Turn] = []
+        self.folding: List[Turn] = []
+        self.summarizing = False
+
+
+def format_turns(turns: List[Turn]) -> str:
+    """Render turns as a User/Assistant transcript."""
+    return "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+
+
+def approximate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+class ConversationMemory:
+    def __init__(
+        self,
+        summarize: Callable[[str, List[Turn]], str],
+        max_turns: int = 4,
+        max_conversations: int = 1024,
+        max_pending_tokens: int = 2000,
+        count_tokens: Callable[[str], int] = approximate_tokens
+    ):
+        """
+        Initialize the memory.
+
+        Args:
+            summarize: Folds turns into a summary: (summary, turns) -> summary
+            max_turns: Turns kept verbatim per conversation
+            max_conversations: Conversations kept; least recently used
+                ones are forgotten first
+            max_pending_tokens: Tokens of evicted turns kept while they
+                wait to be summarized; older ones are dropped beyond it
+            count_tokens: Token counter for turns
+        """
+        self.summarize = summarize
+        self.max_turns = max_turns
+        self.max_conversations = max_conversations
+        self.max_pending_tokens = max_pending_tokens
+        self.count_tokens = count_tokens
+        self._conversations: "OrderedDict[Tuple[str, str], Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+    def _conversation(self, bot_id: Optional[str], user_id: str) -> Conversation:
+        """Get or create a conversation (lock held)."""
+        key = (bot_id or "", user_id)
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = Conversation()
+            self._conversations[key] = conversation
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        self._conversations.move_to_end(key)
+        return conversation
+
+    def _trim_pending(self, conversation: Conversation):
+        """
+        Drop the oldest pending turns beyond the token budget (lock held).
+
+        Pending turns only pile up while summarization fails; without a cap
+        the prompt would grow by a turn per message.
+        """
+        tokens = [self.count_tokens(format_turns([turn])) for turn in conversation.pending]
+        dropped = 0
+        while dropped < len(tokens) and sum(tokens[dropped:]) > self.max_pending_tokens:
+            dropped += 1
+        if dropped:
+            print(f"Conversation memory: dropped {dropped} unsummarized turns over the token budget")
+            del conversation.pending[:dropped]
+
+    def context(self, bot_id: Optional[str], user_id: str) -> str:
+        """
+        Bounded history for the next prompt.
+
+        Returns:
+            The summary followed by the recent turns, or "" for a new chat
+        """
+        with self._lock:
+            conversation = self._conversation(bot_id, user_id)
+            summary = conversation.summary
+            turns = conversation.folding + conversation.pending + list(conversation.turns)
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}")
+        if turns:
+            parts.append(f"Recent conversation:\n{format_turns(turns)}")
+        return "\n\n".join(parts)
+
+    def record(self, bot_id: Optional[str], user_id: str, question: str, answer: str):
+        """Add a turn; turns leaving the window are summarized in the background."""
+        with self._lock:
+            conversation = self._conversation(bot_id, user_id)
+            conversation.turns.append((question, answer))
+            while len(conversation.turns) > self.max_turns:
+                conversation.pending.append(conversation.turns.popleft())
+            self._trim_pending(conversation)
+            if not conversation.pending or conversation.summarizing:
+                return
+            conversation.summarizing = True
+        self._pool.submit(self._fold, conversation)
+
+    def _fold(self, conversation: Conversation):
+        """Fold pending turns into the summary until none are left."""
+        while True:
+            with self._lock:
+                turns, conversation.pending = conversation.pending, []
+                conversation.folding = turns
+                summary = conversation.summary
+                if not turns:
+                    conversation.summarizing = False
+                    return
+            try:
+                summary = self.summarize(summary, turns)
+            except Exception as e:
+                print(f"Conversation summary failed: {e}")
+                with self._lock:
+                    # Retried with the next evicted turn
+                    conversation.pending[:0] = turns
+                    conversation.folding = []
+                    self._trim_pending(conversation)
+                    conversation.summarizing = False
+                return
+            with self._lock:
+                conversation.summary = summary
+                conversation.folding = []
+
+    def clear(self, bot_id: Optional[str], user_id: str):
+        """Forget a conversation."""
+        with self._lock:
+            self._conversations.pop((bot_id or "", user_id), None)
+
+
+_memory: Optional[ConversationMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_conversation_memory(
+    summarize: Callable[[str, List[Turn]], str],
+    max_turns: int = 4,
+    max_conversations: int = 1024,
+    max_pending_tokens: int = 2000,
+    count_tokens: Callable[[str], int] = approximate_tokens
+) -> ConversationMemory:
+    """Return the process-wide conversation memory."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = ConversationMemory(
+                summarize,
+                max_turns=max_turns,
+                max_conversations=max_conversations,
+                max_pending_tokens=max_pending_tokens,
+                count_tokens=count_tokens
+            )
+        return _memory
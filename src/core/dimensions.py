@@ -0,0 +1,54 @@
+"""
+Shortened embeddings.
+
+text-embedding-3 models are trained so that a prefix of an embedding is
+itself a good embedding: truncating to n dimensions and re-normalizing
+gives the same vector as requesting dimensions=n from the API. Vectors can
+therefore be stored and searched at 256 or 512 dimensions while the full
+vectors, when kept, rescore the shortlisted candidates.
+"""
+from typing import List, Union
+
+import numpy as np
+
+
+def validate_dimension(dimension: int, model_dimension: int):
+    """Raise ValueError unless dimension is a usable prefix length."""
+    if not 0 < dimension <= model_dimension:
+        raise ValueError(
+            f"VECTOR_DIMENSION must be between 1 and {model_dimension}, "
+            f"got {dimension}"
+        )
+
+
+def shorten(
+    vectors: Union[List[float], List[List[float]], np.ndarray],
+    dimension: int
+) -> np.ndarray:
+    """
+    Truncate embeddings to their first dimension values and re-normalize.
+
+    Args:
+        vectors: One vector or a batch of vectors
+        dimension: Target dimension
+
+    Returns:
+        float32 array with the same leading shape as vectors
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)[..., :dimension]
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def embedding_namespace(base: str, dimension: int, model_dimension: int) -> str:
+    """
+    Cache namespace for embeddings of a given dimension.
+
+    Full-size embeddings keep the bare namespace so existing caches stay
+    valid; shortened ones get their own, so vectors of different sizes
+    are never mixed. The suffix uses only characters valid in file-store
+    keys (see ManagedFileStore).
+    """
+    if dimension == model_dimension:
+        return base
+    return f"{base}_d{dimension}"
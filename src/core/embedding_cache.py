@@ -0,0 +1,145 @@
+"""
+Query embedding cache.
+
+CacheBackedEmbeddings only caches document embeddings, so every question
+costs an OpenAI round trip. This cache keys query embeddings by model and
+normalized query text, with an in-memory LRU tier and an optional shared
+Redis tier, and counts hits and misses per tier.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.core.metrics import record_cache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a key."""
+    query = unicodedata.normalize("NFKC", query)
+    return _WHITESPACE.sub(" ", query).strip().casefold()
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        model: str,
+        max_size: int = 1024,
+        redis_client=None,
+        ttl: int = 86400
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            model: Embedding model name, part of every key
+            max_size: Maximum entries in the in-memory tier
+            redis_client: Optional Redis client for the shared tier
+            ttl: Shared-tier expiry in seconds
+        """
+        self.model = model
+        self.max_size = max_size
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def _key(self, query: str) -> str:
+        digest = hashlib.sha256(
+            f"{self.model}\0{normalize_query(query)}".encode()
+        ).hexdigest()
+        return f"query_embedding:{digest}"
+
+    def _remember(self, key: str, embedding: List[float]):
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """Return a cached embedding, or None on a miss."""
+        key = self._key(query)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                record_cache("query_embedding", "memory_hit")
+                return embedding
+
+        if self.redis_client:
+            try:
+                cached = self.redis_client.get(key)
+                if cached:
+                    embedding = np.frombuffer(cached, dtype=np.float32).tolist()
+                    self._remember(key, embedding)
+                    with self._lock:
+                        self.stats["shared_hits"] += 1
+                    record_cache("query_embedding", "shared_hit")
+                    return embedding
+            except Exception as e:
+                print(f"Redis cache error: {e}")
+
+        with self._lock:
+            self.stats["misses"] += 1
+        record_cache("query_embedding", "miss")
+        return None
+
+    def put(self, query: str, embedding: List[float]):
+        """Store an embedding in both tiers."""
+        key = self._key(query)
+        self._remember(key, embedding)
+        if self.redis_client:
+            try:
+                self.redis_client.setex(
+                    key, self.ttl, np.asarray(embedding, dtype=np.float32).tobytes()
+                )
+            except Exception as e:
+                print(f"Redis cache error: {e}")
+
+    def get_or_embed(
+        self,
+        query: str,
+        embed: Callable[[str], List[float]]
+    ) -> List[float]:
+        """Return the cached embedding for a query, embedding it on a miss."""
+        embedding = self.get(query)
+        if embedding is None:
+            embedding = embed(query)
+            self.put(query, embedding)
+        return embedding
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from either tier."""
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["shared_hits"]
+            total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+# One cache per model, shared by every RAGPipeline in the process
+_caches: Dict[str, QueryEmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_embedding_cache(
+    model: str,
+    max_size: int = 1024,
+    redis_client=None,
+    ttl: int = 86400
+) -> QueryEmbeddingCache:
+    """Return the process-wide query embedding cache for a model."""
+    with _caches_lock:
+        if model not in _caches:
+            _caches[model] = QueryEmbeddingCache(
+                model, max_size=max_size, redis_client=redis_client, ttl=ttl
+            )
+        return _caches[model]
@@ -0,0 +1,281 @@
+"""
+Size-bounded file store for cached document embeddings.
+
+Drop-in replacement for LangChain's LocalFileStore behind
+CacheBackedEmbeddings: one file per entry, named by its key, in the same
+directory layout, so an existing cache is picked up as is. Size and access
+metadata (last access, hit count) are kept in a SQLite index next to the
+files. When the cache grows past its limit, the least recently used (or
+least frequently used) entries are evicted down to a low watermark, and
+gc() drops entries whose chunks no longer exist.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.metrics import record_cache
+
+INDEX_NAME = ".cache_index.sqlite"
+EVICTION_POLICIES = ("lru", "lfu")
+
+# Same key rule as LocalFileStore
+_VALID_KEY = re.compile(r"^[a-zA-Z0-9_.\-/]+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_hits ON entries(hits, last_access);
+"""
+
+
+class ManagedFileStore:
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 2 * 1024 ** 3,
+        policy: str = "lru",
+        low_watermark: float = 0.9
+    ):
+        """
+        Open (or create) a cache directory.
+
+        Args:
+            root: Cache directory
+            max_bytes: Size limit; 0 disables eviction
+            policy: "lru" evicts the least recently used entries first,
+                "lfu" the least often hit ones (oldest first among ties)
+            low_watermark: Fraction of max_bytes eviction brings the cache
+                down to, so it does not run on every write
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"policy must be one of {EVICTION_POLICIES}, got {policy!r}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.low_watermark = low_watermark
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.root / INDEX_NAME), timeout=30,
+            isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        if not self._conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone():
+            self._import_existing()
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _import_existing(self):
+        """Index files left by LocalFileStore, oldest access first."""
+        rows = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                rows.append((entry.name, stat.st_size, stat.st_atime, stat.st_mtime))
+        if rows:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, size, last_access, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def _path(self, key: str) -> Path:
+        if not _VALID_KEY.match(key) or ".." in key or key.startswith(INDEX_NAME):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return self.root / key
+
+    # ByteStore interface used by CacheBackedEmbeddings
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Read entries; hits update their access metadata."""
+        values = []
+        hits = []
+        for key in keys:
+            try:
+                values.append(self._path(key).read_bytes())
+                hits.append(key)
+            except FileNotFoundError:
+                values.append(None)
+        now = time.time()
+        with self._lock:
+            self.stats["hits"] += len(hits)
+            self.stats["misses"] += len(keys) - len(hits)
+            if hits:
+                self._conn.executemany(
+                    "UPDATE entries SET hits = hits + 1, last_access = ? WHERE key = ?",
+                    [(now, key) for key in hits]
+                )
+        for _ in hits:
+            record_cache("embedding_file", "hit")
+        for _ in range(len(keys) - len(hits)):
+            record_cache("embedding_file", "miss")
+        return values
+
+    def mset(self, key_value_pairs: Sequence[Tuple[str, bytes]]):
+        """Write entries, evicting old ones if the cache is over its limit."""
+        now = time.time()
+        rows = []
+        for key, value in key_value_pairs:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+            rows.append((key, len(value), now, now))
+        with self._lock:
+            previous = self._sizes([key for key, *_ in rows])
+            self._conn.executemany(
+                "INSERT INTO entries (key, size, last_access, created_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET size = excluded.size, "
+                "last_access = excluded.last_access",
+                rows
+            )
+            self._bytes += sum(size for _, size, *_ in rows) - sum(previous.values())
+            self.stats["writes"] += len(rows)
+            over = self.max_bytes and self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def mdelete(self, keys: Sequence[str]):
+        """Delete entries."""
+        keys = list(keys)
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            sizes = self._sizes(keys)
+            self._conn.executemany(
+                "DELETE FROM entries WHERE key = ?", [(key,) for key in sizes]
+            )
+            self._bytes -= sum(sizes.values())
+
+    def yield_keys(self, prefix: Optional[str] = None) -> Iterator[str]:
+        """Keys in the cache, optionally only those with a prefix."""
+        with self._lock:
+            if prefix:
+                rows = self._conn.execute(
+                    "SELECT key FROM entries WHERE substr(key, 1, ?) = ?",
+                    (len(prefix), prefix)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT key FROM entries").fetchall()
+        for (key,) in rows:
+            yield key
+
+    # Management
+
+    def _sizes(self, keys: List[str]) -> Dict[str, int]:
+        """Indexed sizes of the keys that are in the index (lock held)."""
+        sizes = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            sizes.update(self._conn.execute(
+                f"SELECT key, size FROM entries WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall())
+        return sizes
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evict entries until the cache is under the low watermark.
+
+        Args:
+            max_bytes: Limit to evict against; defaults to the store's
+
+        Returns:
+            Number of entries evicted
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        order = "last_access" if self.policy == "lru" else "hits, last_access"
+        with self._lock:
+            # Other processes may share the directory; go by the index
+            self._bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            excess = self._bytes - int(limit * self.low_watermark)
+            if excess <= 0:
+                return 0
+            victims, freed = [], 0
+            for key, size in self._conn.execute(f"SELECT key, size FROM entries ORDER BY {order}"):
+                if freed >= excess:
+                    break
+                victims.append(key)
+                freed += size
+            self.stats["evictions"] += len(victims)
+        self.mdelete(victims)
+        return len(victims)
+
+    def gc(self, live_keys: Iterable[str], prefix: str = "") -> int:
+        """
+        Drop entries that are not live.
+
+        Args:
+            live_keys: Keys of every chunk still in the vector store
+            prefix: Only entries with this prefix (e.g. the embedding
+                namespace) are considered
+
+        Returns:
+            Number of entries removed
+        """
+        live = set(live_keys)
+        dead = [key for key in self.yield_keys(prefix) if key not in live]
+        self.mdelete(dead)
+        # Files written without going through the index (crashed writes)
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(".") and entry.name.endswith(".tmp"):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+        return len(dead)
+
+    def summary(self) -> Dict:
+        """Cache size and hit-rate statistics."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            **stats
+        }
+
+
+# One store per directory, shared by every RAGPipeline in the process
+_stores: Dict[str, ManagedFileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_managed_file_store(
+    root: str,
+    max_bytes: int = 2 * 1024 ** 3,
+    policy: str = "lru"
+) -> ManagedFileStore:
+    """Return the process-wide store for a cache directory."""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ManagedFileStore(root, max_bytes=max_bytes, policy=policy)
+        return _stores[key]
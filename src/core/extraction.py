@@ -0,0 +1,215 @@
+"""
+Text extraction for uploaded documents.
+
+PDF pages are sharded into page ranges and extracted across a process pool,
+so extraction throughput scales with the number of cores. Text is
+reassembled in page order together with the character offsets of each page.
+"""
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.config.settings import (
+    EXTRACTION_WORKERS,
+    EXTRACTION_PAGES_PER_SHARD,
+    EXTRACTION_PAGE_TIMEOUT
+)
+
+# File types handled by extract_document
+SUPPORTED_EXTENSIONS = [".pdf", ".txt", ".md", ".doc", ".docx"]
+
+_executors: Dict[int, ProcessPoolExecutor] = {}
+
+
+class PageTimeout(Exception):
+    """Raised when a single page takes longer than the page timeout."""
+
+
+def _on_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Return a shared extraction process pool, creating it on first use."""
+    if workers not in _executors:
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _executors[workers]
+
+
+def _extract_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    page_timeout: float
+) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Extract text from pages [start, end) of a PDF.
+
+    Runs inside a pool worker. Each page gets its own timeout, so one
+    pathological page does not stall the rest of its shard.
+
+    Returns:
+        List of (page_number, text, error) tuples
+    """
+    import PyPDF2
+
+    # SIGALRM is only available on Unix, and only in the main thread; off
+    # it (e.g. inline extraction from a worker thread) pages are not timed
+    use_alarm = (
+        hasattr(signal, "setitimer")
+        and page_timeout > 0
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_page_timeout)
+
+    results = []
+    try:
+        with open(file_path, "rb") as f:
+            pdf_reader = PyPDF2.PdfReader(f)
+            for page_num in range(start, end):
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+                try:
+                    text = pdf_reader.pages[page_num].extract_text() or ""
+                    results.append((page_num, text, None))
+                except PageTimeout:
+                    results.append((page_num, "", "timeout"))
+                except Exception as e:
+                    results.append((page_num, "", str(e)))
+                finally:
+                    if use_alarm:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+
+    return results
+
+
+def _assemble(
+    page_results: List[Tuple[int, str, Optional[str]]]
+) -> Dict:
+    """Join page texts in page order and record each page's offsets."""
+    parts = []
+    pages = []
+    failed_pages = []
+    offset = 0
+    for page_num, text, error in sorted(page_results, key=lambda r: r[0]):
+        page_text = text + "\n"
+        parts.append(page_text)
+        pages.append({
+            "page": page_num + 1,
+            "start": offset,
+            "end": offset + len(page_text)
+        })
+        offset += len(page_text)
+        if error:
+            failed_pages.append({"page": page_num + 1, "error": error})
+
+    return {
+        "text": "".join(parts),
+        "pages": pages,
+        "failed_pages": failed_pages
+    }
+
+
+def extract_pdf(
+    file_path: str,
+    workers: Optional[int] = None,
+    pages_per_shard: int = EXTRACTION_PAGES_PER_SHARD,
+    page_timeout: float = EXTRACTION_PAGE_TIMEOUT
+) -> Dict:
+    """
+    Extract text from a PDF using a process pool.
+
+    Args:
+        file_path: Path to the PDF file
+        workers: Optional worker count; 1 extracts on the calling process
+        pages_per_shard: Number of pages handed to a worker at a time
+        page_timeout: Seconds allowed per page before it is skipped
+
+    Returns:
+        Dict with the page-ordered text, per-page character offsets
+        (1-based page numbers) and any pages that failed or timed out
+    """
+    import PyPDF2
+
+    with open(file_path, "rb") as f:
+        page_count = len(PyPDF2.PdfReader(f).pages)
+
+    shards = [
+        (start, min(start + pages_per_shard, page_count))
+        for start in range(0, page_count, pages_per_shard)
+    ]
+    workers = workers or EXTRACTION_WORKERS
+
+    # Small documents are not worth the inter-process overhead, unless the
+    # caller is a worker thread: only the pool can time pages out there
+    on_main_thread = threading.current_thread() is threading.main_thread()
+    if workers <= 1 or (len(shards) <= 1 and (on_main_thread or page_timeout <= 0)):
+        results = []
+        for start, end in shards:
+            results.extend(
+                _extract_page_range(file_path, start, end, page_timeout)
+            )
+        return _assemble(results)
+
+    executor = _get_executor(workers)
+    futures = [
+        executor.submit(
+            _extract_page_range, file_path, start, end, page_timeout
+        )
+        for start, end in shards
+    ]
+
+    results = []
+    for future, (start, end) in zip(futures, shards):
+        try:
+            results.extend(future.result())
+        except Exception as e:
+            # A crashed worker loses its whole shard; record every page
+            results.extend(
+                (page_num, "", str(e)) for page_num in range(start, end)
+            )
+    return _assemble(results)
+
+
+def extract_document(file_path: str) -> Dict:
+    """
+    Extract text content from a document based on its file type.
+
+    Args:
+        file_path: Path to the document
+
+    Returns:
+        Dict with "text", "pages" (character offsets per page; a single
+        page for non-paginated formats) and "failed_pages"
+    """
+    file_ext = Path(file_path).suffix.lower()
+
+    if file_ext == ".pdf":
+        return extract_pdf(str(file_path))
+
+    if file_ext in [".doc", ".docx"]:
+        # For Word documents, we'd need additional libraries
+        # This is a placeholder - you might want to use python-docx
+        text = f"Document content from {os.path.basename(file_path)}"
+    else:
+        # For text files, read as text
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except UnicodeDecodeError:
+            # If UTF-8 fails, try another encoding
+            with open(file_path, "r", encoding="latin-1") as f:
+                text = f.read()
+
+    return {
+        "text": text,
+        "pages": [{"page": 1, "start": 0, "end": len(text)}],
+        "failed_pages": []
+    }
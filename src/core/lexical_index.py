@@ -0,0 +1,248 @@
+"""
+BM25 lexical index for exact-token legal retrieval.
+
+Dense embeddings match citations such as "§153.131", "2(d)" or
+"TMEP §1207.01" poorly. This index is maintained alongside the vector store
+at ingestion time and keeps one compact posting list per term: chunk
+numbers in an unsigned-int array and term frequencies in an unsigned-short
+array, instead of Python lists of objects.
+"""
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import Counter
+from heapq import nlargest
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Citation-shaped tokens are matched before plain words so "§ 153.131" and
+# "2(d)" survive tokenization as single terms
+_TOKEN_PATTERN = re.compile(
+    r"§+\s*\d+(?:[.\-]\d+)*(?:\([a-z0-9]{1,4}\))*"
+    r"|\d+(?:[.\-]\d+)*(?:\([a-z0-9]{1,4}\))+"
+    r"|\w+(?:\.\d+)*",
+    re.IGNORECASE
+)
+
+_MAX_TF = 65535
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized index terms.
+
+    Section cites are indexed both with and without the section sign,
+    and subsection cites also under their base number, so "section 153.131"
+    matches "§ 153.131" and "2(d)" matches "Section 2".
+    """
+    terms = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        term = re.sub(r"\s+", "", match.group())
+        terms.append(term)
+        bare = term.lstrip("§")
+        if bare != term:
+            terms.append(bare)
+        base = bare.split("(", 1)[0]
+        if base != bare:
+            terms.append(base)
+    return terms
+
+
+class LexicalIndex:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Initialize the index, loading it from disk if it exists.
+
+        Args:
+            path: Optional file to persist the index to
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        self.chunk_ids: List[Optional[str]] = []
+        self.doc_lengths = array("I")
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self._positions: Dict[str, int] = {}
+        self._total_length = 0
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, chunk_id: str, text: str):
+        """Index a chunk, replacing any previous version of it."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            if chunk_id in self._positions:
+                self._remove(chunk_id)
+
+            position = len(self.chunk_ids)
+            self.chunk_ids.append(chunk_id)
+            self._positions[chunk_id] = position
+            length = sum(terms.values())
+            self.doc_lengths.append(length)
+            self._total_length += length
+
+            for term, tf in terms.items():
+                if term not in self.postings:
+                    self.postings[term] = (array("I"), array("H"))
+                positions, tfs = self.postings[term]
+                positions.append(position)
+                tfs.append(min(tf, _MAX_TF))
+
+    def add_many(self, chunks: Iterable[Tuple[str, str]]):
+        """Index (chunk_id, text) pairs."""
+        for chunk_id, text in chunks:
+            self.add(chunk_id, text)
+
+    def _remove(self, chunk_id: str):
+        """Tombstone a chunk; postings are dropped on the next compaction."""
+        position = self._positions.pop(chunk_id)
+        self.chunk_ids[position] = None
+        self._total_length -= self.doc_lengths[position]
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Remove chunks from the index."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                if chunk_id in self._positions:
+                    self._remove(chunk_id)
+
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Rank indexed chunks against a query with BM25.
+
+        Returns:
+            List of (chunk_id, score), best first
+        """
+        with self._lock:
+            live = len(self._positions)
+            if not live:
+                return []
+            avg_length = self._total_length / live
+
+            scores: Dict[int, float] = {}
+            for term in set(tokenize(query)):
+                if term not in self.postings:
+                    continue
+                positions, tfs = self.postings[term]
+                df = len(positions)
+                idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+                for position, tf in zip(positions, tfs):
+                    if self.chunk_ids[position] is None:
+                        continue
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self.doc_lengths[position] / avg_length
+                    )
+                    scores[position] = (
+                        scores.get(position, 0.0)
+                        + idf * tf * (self.k1 + 1) / (tf + norm)
+                    )
+
+            best = nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [(self.chunk_ids[position], score) for position, score in best]
+
+    def _compact(self):
+        """Rebuild postings without tombstoned chunks."""
+        remap = {}
+        chunk_ids = []
+        doc_lengths = array("I")
+        for position, chunk_id in enumerate(self.chunk_ids):
+            if chunk_id is not None:
+                remap[position] = len(chunk_ids)
+                chunk_ids.append(chunk_id)
+                doc_lengths.append(self.doc_lengths[position])
+
+        postings = {}
+        for term, (positions, tfs) in self.postings.items():
+            new_positions, new_tfs = array("I"), array("H")
+            for position, tf in zip(positions, tfs):
+                if position in remap:
+                    new_positions.append(remap[position])
+                    new_tfs.append(tf)
+            if new_positions:
+                postings[term] = (new_positions, new_tfs)
+
+        self.chunk_ids = chunk_ids
+        self.doc_lengths = doc_lengths
+        self.postings = postings
+        self._positions = {chunk_id: i for i, chunk_id in enumerate(chunk_ids)}
+
+    def save(self):
+        """Compact the index and write it atomically to its path."""
+        if not self.path:
+            return
+        with self._lock:
+            if len(self.chunk_ids) != len(self._positions):
+                self._compact()
+            state = {
+                "chunk_ids": self.chunk_ids,
+                "doc_lengths": self.doc_lengths.tobytes(),
+                "postings": {
+                    term: (positions.tobytes(), tfs.tobytes())
+                    for term, (positions, tfs) in self.postings.items()
+                }
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Load the index from its path."""
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+
+        def from_bytes(typecode: str, data: bytes) -> array:
+            values = array(typecode)
+            values.frombytes(data)
+            return values
+
+        with self._lock:
+            self.chunk_ids = state["chunk_ids"]
+            self.doc_lengths = from_bytes("I", state["doc_lengths"])
+            self.postings = {
+                term: (from_bytes("I", positions), from_bytes("H", tfs))
+                for term, (positions, tfs) in state["postings"].items()
+            }
+            self._positions = {
+                chunk_id: i for i, chunk_id in enumerate(self.chunk_ids)
+            }
+            self._total_length = sum(self.doc_lengths)
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists with reciprocal rank fusion.
+
+    Args:
+        rankings: Ranked lists of IDs, best first
+        k: RRF smoothing constant
+
+    Returns:
+        List of (id, fused_score), best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
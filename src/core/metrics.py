@@ -0,0 +1,112 @@
+"""
+Prometheus metrics for the RAG pipeline.
+
+Stage spans (embedding, vector search, chunk fetch, LLM, ...) are recorded
+in one histogram labelled by operation and stage, and cache lookups in one
+counter labelled by cache and result. Metrics live in the default
+prometheus_client registry. The Streamlit app has no HTTP routes of its
+own, so it serves them with start_metrics_server() on METRICS_PORT.
+
+src/backend/metrics.py and backend/app/core/metrics.py keep their own
+copies of StageTimer: each backend is deployed and run from its own
+directory and cannot import src.core. They use the same metric names and
+buckets, so one dashboard covers all three apps; keep them in step.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+# Stage latencies range from sub-millisecond lookups to multi-second LLM calls
+STAGE_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Time spent in each RAG pipeline stage",
+    ["operation", "stage"],
+    buckets=STAGE_BUCKETS
+)
+
+CACHE_LOOKUPS = Counter(
+    "rag_cache_lookups_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+
+
+_server_port = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int) -> bool:
+    """
+    Serve the default registry on http://0.0.0.0:<port>/metrics.
+
+    Safe to call on every Streamlit rerun; the server is started once per
+    process.
+
+    Args:
+        port: Port to listen on; 0 disables the server
+
+    Returns:
+        Whether the server is running
+    """
+    global _server_port
+    with _server_lock:
+        if _server_port is None and port:
+            try:
+                start_http_server(port)
+                _server_port = port
+            except OSError as e:
+                # Another process (e.g. a second Streamlit server) has the port
+                print(f"Warning: metrics server not started on port {port}: {e}")
+                _server_port = 0
+        return bool(_server_port)
+
+
+def record_cache(cache: str, result: str):
+    """Count a cache lookup, e.g. record_cache("completion", "hit")."""
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+class StageTimer:
+    def __init__(self, operation: str):
+        """
+        Collect per-stage timings for one pipeline call.
+
+        Args:
+            operation: Pipeline operation label, e.g. "query" or "ingest"
+        """
+        self.operation = operation
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    def record(self, stage: str, seconds: float):
+        """Record a stage duration measured elsewhere."""
+        # Stages that run more than once per call (e.g. chunk fetches) add up
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds * 1000
+        STAGE_SECONDS.labels(self.operation, stage).observe(seconds)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time the enclosed block as a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def finish(self) -> Dict[str, float]:
+        """
+        Record the end-to-end time as the "total" stage.
+
+        Returns:
+            Dict of stage name to milliseconds
+        """
+        self.record("total", time.perf_counter() - self._start)
+        return {stage: round(ms, 3) for stage, ms in self.timings.items()}
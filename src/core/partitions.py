@@ -0,0 +1,93 @@
+"""
+Per-bot (case) partitions of the local indexes.
+
+Each bot's chunks are kept in their own lexical, citation and quantized
+vector index files under <index dir>/bots/<bot>/, so a query scoped to a
+bot only touches that case's data. Chunks ingested without a bot ID stay
+in the shared indexes at the configured paths.
+
+Only the most recently used bots' indexes stay open; the least recently
+used one is saved and dropped when the limit is reached, so memory follows
+the active cases rather than every case the process has seen.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def partition_key(bot_id: str) -> str:
+    """Filesystem-safe directory name for a bot ID, unique per ID."""
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", bot_id)[:40]
+    digest = hashlib.sha1(bot_id.encode()).hexdigest()[:8]
+    return f"{slug}-{digest}"
+
+
+def partition_path(path: Optional[str], bot_id: Optional[str]) -> Optional[str]:
+    """
+    Path of a bot's copy of an index file or directory.
+
+    Args:
+        path: Path of the shared index
+        bot_id: Bot ID, or None for the shared index
+
+    Returns:
+        <dir of path>/bots/<partition key>/<name of path>
+    """
+    if path is None or bot_id is None:
+        return path
+    directory, name = os.path.split(os.path.normpath(path))
+    return os.path.join(directory, "bots", partition_key(bot_id), name)
+
+
+class PartitionedIndexes(Generic[T]):
+    def __init__(
+        self,
+        factory: Callable[[Optional[str]], T],
+        path: Optional[str],
+        max_open: int = 32
+    ):
+        """
+        Lazily opened per-bot indexes.
+
+        Args:
+            factory: Builds (and loads) an index from its path
+            path: Path of the shared index
+            max_open: Bot indexes kept open; the shared index and, without
+                a path (nothing to reload from), every index stay open
+        """
+        self.factory = factory
+        self.path = path
+        self.max_open = max_open
+        self._shared: Optional[T] = None
+        self._indexes: "OrderedDict[str, T]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of bot indexes open."""
+        return len(self._indexes)
+
+    def get(self, bot_id: Optional[str] = None) -> T:
+        """Index for a bot (None for the shared index), opened on first use."""
+        with self._lock:
+            if bot_id is None:
+                if self._shared is None:
+                    self._shared = self.factory(self.path)
+                return self._shared
+
+            index = self._indexes.get(bot_id)
+            if index is not None:
+                self._indexes.move_to_end(bot_id)
+                return index
+            index = self.factory(partition_path(self.path, bot_id))
+            self._indexes[bot_id] = index
+            # Saved under the lock, so a bot reopened right away loads
+            # what was just written
+            while self.path is not None and len(self._indexes) > self.max_open:
+                _, evicted = self._indexes.popitem(last=False)
+                evicted.save()
+            return index
@@ -1,10 +1,27 @@
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import re
 
+from src.config.settings import PROMPT_COACH_CACHE_SIZE
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase and collapse whitespace; the patterns match on this form."""
+    return " ".join(prompt.lower().split())
+
+
 class PromptCoach:
-    def __init__(self):
-        """Initialize prompt coaching patterns and suggestions."""
+    def __init__(self, cache_size: int = PROMPT_COACH_CACHE_SIZE):
+        """
+        Initialize prompt coaching patterns and suggestions.
+        
+        Args:
+            cache_size: Normalized prompts whose matches are memoized
+        """
         self._init_patterns()
+        self._compile()
+        self._match = lru_cache(maxsize=cache_size)(self._match_uncached)
+        self._tooltip = lru_cache(maxsize=64)(self._tooltip_uncached)
 
     def _init_patterns(self):
         """Initialize prompt patterns and templates."""
@@ -43,6 +60,32 @@ class PromptCoach:
             }
         }
 
+    def _compile(self):
+        """
+        Combine all patterns into one regex with a named group per category.
+        
+        Each alternative sits in a lookahead, so matches are zero-width and
+        one finditer pass reports every category even when their matches
+        overlap.
+        """
+        self._regex = re.compile("|".join(
+            f"(?=(?P<{category}>{data['pattern']}))"
+            for category, data in self.patterns.items()
+        ))
+        self._order = {category: i for i, category in enumerate(self.patterns)}
+
+    def _match_uncached(self, normalized: str) -> Tuple[str, ...]:
+        """Categories matched by a normalized prompt, in pattern order."""
+        found = set()
+        for match in self._regex.finditer(normalized):
+            found.update(
+                category for category, value in match.groupdict().items()
+                if value is not None
+            )
+            if len(found) == len(self._order):
+                break
+        return tuple(sorted(found, key=self._order.__getitem__))
+
     def analyze_prompt(self, prompt: str) -> Dict[str, List[str]]:
         """
         Analyze a user prompt and provide coaching suggestions.
@@ -53,14 +96,10 @@ class PromptCoach:
         Returns:
             Dict with matched categories and suggested improvements
         """
-        prompt = prompt.lower().strip()
-        matches = {}
-        
-        for category, data in self.patterns.items():
-            if re.search(data["pattern"], prompt):
-                matches[category] = data["suggestions"]
-        
-        return matches
+        return {
+            category: self.patterns[category]["suggestions"]
+            for category in self._match(normalize_prompt(prompt))
+        }
 
     def get_structured_prompt(
         self,
@@ -109,17 +148,16 @@ class PromptCoach:
         Returns:
             Tooltip text if suggestions available
         """
-        matches = self.analyze_prompt(prompt)
-        
-        if not matches:
-            return None
-            
-        # Get all unique suggestions
-        suggestions = []
-        for category_suggestions in matches.values():
-            for suggestion in category_suggestions:
-                if suggestion not in suggestions:
-                    suggestions.append(suggestion)
+        return self._tooltip(self._match(normalize_prompt(prompt)))
+
+    def _tooltip_uncached(self, categories: Tuple[str, ...]) -> Optional[str]:
+        """Tooltip for a set of matched categories."""
+        # Unique suggestions in order
+        suggestions = list(dict.fromkeys(
+            suggestion
+            for category in categories
+            for suggestion in self.patterns[category]["suggestions"]
+        ))
         
         if not suggestions:
             return None
@@ -127,4 +165,15 @@ class PromptCoach:
         tooltip = "Try structuring your prompt:\n"
         tooltip += "\n".join(f"• {s}" for s in suggestions[:3])
         
-        return tooltip 
\ No newline at end of file
+        return tooltip
+
+
+_coach: Optional[PromptCoach] = None
+
+
+def get_prompt_coach() -> PromptCoach:
+    """Return the process-wide prompt coach, so its cache survives reruns."""
+    global _coach
+    if _coach is None:
+        _coach = PromptCoach()
+    return _coach
@@ -0,0 +1,398 @@
+"""
+Quantized vector index with full-precision rescoring.
+
+Full 1536-dim float32 vectors cost 6 KB per chunk. This index keeps only
+compact codes in memory for the first pass, either int8 scalar codes with a
+per-vector scale (4x smaller) or packed sign bits compared by Hamming
+distance (32x smaller), and rescores the best first-pass candidates
+against full-precision vectors read from a memory-mapped file, so only
+the rows being rescored are paged in.
+
+With shortened embeddings (see src.core.dimensions) the codes can be built
+from the first `dimension` values while rescoring uses the full vectors.
+
+On disk the index is a directory of append-only row files plus a small
+metadata pickle recording how many rows are valid; rows appended after
+the last metadata write are ignored and truncated on load.
+"""
+import os
+import pickle
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.dimensions import shorten
+
+QUANTIZATION_MODES = ("int8", "binary")
+
+# Bits set in each byte value, for Hamming distance on packed codes where
+# np.bitwise_count (NumPy 2.0+) is unavailable
+_POPCOUNT = np.unpackbits(
+    np.arange(256, dtype=np.uint8)[:, None], axis=1
+).sum(axis=1).astype(np.int32)
+_bitwise_count = getattr(np, "bitwise_count", None)
+
+# Rows scored per block, bounding temporaries to a few MB
+_BLOCK_ROWS = 4096
+# int8 rows are widened into a float32 buffer small enough to stay in cache
+_INT8_BLOCK_ROWS = 128
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scalar-quantize vectors to int8 with one scale per vector.
+
+    Returns:
+        Tuple of (codes of shape (n, dim), float32 scales of shape (n,))
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Quantize vectors to packed sign bits, shape (n, dim / 8)."""
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class QuantizedVectorIndex:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        mode: str = "int8",
+        dimension: int = 1536,
+        rescore_dimension: Optional[int] = None
+    ):
+        """
+        Initialize the index, loading it from disk if it exists.
+
+        Args:
+            path: Optional directory to persist the index to
+            mode: "int8" or "binary"
+            dimension: Dimension the first-pass codes are built from
+            rescore_dimension: Dimension of the vectors passed in and used
+                for rescoring (default: dimension); larger values shorten
+                vectors to dimension for the first pass
+        """
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Quantization mode must be one of {QUANTIZATION_MODES}, got {mode!r}"
+            )
+        rescore_dimension = rescore_dimension or dimension
+        if rescore_dimension < dimension:
+            raise ValueError(
+                f"Rescore dimension {rescore_dimension} is smaller than "
+                f"the first-pass dimension {dimension}"
+            )
+        self.path = path
+        self.mode = mode
+        self.dimension = dimension
+        self.rescore_dimension = rescore_dimension
+        self._lock = threading.Lock()
+
+        code_width = dimension if mode == "int8" else (dimension + 7) // 8
+        code_dtype = np.int8 if mode == "int8" else np.uint8
+        # Row buffers grow by doubling; only the first _size rows are valid
+        self._codes = np.empty((0, code_width), dtype=code_dtype)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._size = 0
+
+        self.chunk_ids: List[Optional[str]] = []
+        self.parent_ids: List[Optional[str]] = []
+        self._positions: Dict[str, int] = {}
+
+        # Full vectors: rows [0, _persisted) are on disk, the rest pending
+        self._persisted = 0
+        self._full: Optional[np.memmap] = None
+        self._pending: List[np.ndarray] = []
+
+        if path and os.path.exists(os.path.join(path, "meta.pkl")):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """In-memory code size versus the full-precision vectors it replaces."""
+        rows = self._size
+        code_bytes = rows * self._codes.shape[1] * self._codes.itemsize
+        if self.mode == "int8":
+            code_bytes += rows * 4
+        return {"codes": code_bytes, "full_precision": rows * self.rescore_dimension * 4}
+
+    def _grow(self, extra: int):
+        """Ensure room for extra rows (lock held)."""
+        needed = self._size + extra
+        if needed <= len(self._codes):
+            return
+        capacity = max(needed, 2 * len(self._codes), 1024)
+        codes = np.empty((capacity, self._codes.shape[1]), dtype=self._codes.dtype)
+        codes[:self._size] = self._codes[:self._size]
+        scales = np.empty(capacity, dtype=np.float32)
+        scales[:self._size] = self._scales[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._codes, self._scales, self._alive = codes, scales, alive
+
+    def add_many(self, items: Iterable[Tuple[str, Optional[str], List[float]]]):
+        """
+        Index (chunk_id, parent_id, vector) triples, replacing previous
+        versions of the same chunks.
+        """
+        items = list(items)
+        if not items:
+            return
+        vectors = _normalize([vector for _, _, vector in items])
+        if vectors.shape[1] != self.rescore_dimension:
+            raise ValueError(
+                f"Vector dimension must be {self.rescore_dimension}, "
+                f"got {vectors.shape[1]}"
+            )
+        short = shorten(vectors, self.dimension)
+        if self.mode == "int8":
+            codes, scales = quantize_int8(short)
+        else:
+            codes, scales = quantize_binary(short), np.ones(len(items), np.float32)
+
+        with self._lock:
+            self._grow(len(items))
+            for i, (chunk_id, parent_id, _) in enumerate(items):
+                if chunk_id in self._positions:
+                    self._alive[self._positions.pop(chunk_id)] = False
+                row = self._size + i
+                self.chunk_ids.append(chunk_id)
+                self.parent_ids.append(parent_id)
+                self._positions[chunk_id] = row
+            rows = slice(self._size, self._size + len(items))
+            self._codes[rows] = codes
+            self._scales[rows] = scales
+            self._alive[rows] = True
+            self._size += len(items)
+            self._pending.append(vectors)
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Tombstone chunks; their rows are dropped on the next compaction."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                row = self._positions.pop(chunk_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self.chunk_ids[row] = None
+                    self.parent_ids[row] = None
+
+    def _first_pass(self, query: np.ndarray) -> np.ndarray:
+        """Approximate scores for every row, higher is better (lock held)."""
+        scores = np.empty(self._size, dtype=np.float32)
+        if self.mode == "int8":
+            buffer = np.empty((_INT8_BLOCK_ROWS, self.dimension), dtype=np.float32)
+            for start in range(0, self._size, _INT8_BLOCK_ROWS):
+                end = min(start + _INT8_BLOCK_ROWS, self._size)
+                block = buffer[:end - start]
+                np.copyto(block, self._codes[start:end], casting="unsafe")
+                np.dot(block, query, out=scores[start:end])
+            scores *= self._scales[:self._size]
+        else:
+            query_bits = quantize_binary(query[None, :])[0]
+            for start in range(0, self._size, _BLOCK_ROWS):
+                end = min(start + _BLOCK_ROWS, self._size)
+                xor = self._codes[start:end] ^ query_bits
+                if _bitwise_count is not None and xor.shape[1] % 8 == 0:
+                    distances = _bitwise_count(xor.view(np.uint64)).sum(axis=1)
+                else:
+                    distances = _POPCOUNT[xor].sum(axis=1)
+                scores[start:end] = -distances.astype(np.float32)
+        scores[~self._alive[:self._size]] = -np.inf
+        return scores
+
+    def _full_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Full-precision vectors for rows (lock held)."""
+        vectors = np.empty((len(rows), self.rescore_dimension), dtype=np.float32)
+        on_disk = rows < self._persisted
+        if on_disk.any():
+            vectors[on_disk] = self._full[rows[on_disk]]
+        if (~on_disk).any():
+            if len(self._pending) > 1:
+                self._pending = [np.concatenate(self._pending)]
+            vectors[~on_disk] = self._pending[0][rows[~on_disk] - self._persisted]
+        return vectors
+
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int,
+        rescore: Optional[int] = None
+    ) -> Tuple[List[Tuple[str, str, float]], np.ndarray]:
+        """
+        Find the nearest chunks by cosine similarity.
+
+        Args:
+            query_embedding: Query vector
+            k: Number of results
+            rescore: First-pass candidates rescored at full precision
+                (default 4 * k); 0 returns first-pass order unrescored
+
+        Returns:
+            Tuple of ([(chunk_id, parent_id, similarity)], full vectors of
+            shape (n, rescore_dimension)), best first
+        """
+        query = _normalize(query_embedding)[0]
+        if len(query) != self.rescore_dimension:
+            raise ValueError(
+                f"Query dimension must be {self.rescore_dimension}, got {len(query)}"
+            )
+        with self._lock:
+            if not self._positions:
+                return [], np.empty((0, self.rescore_dimension), dtype=np.float32)
+
+            scores = self._first_pass(shorten(query, self.dimension))
+            candidates = min(len(self._positions), k if rescore == 0 else (rescore or 4 * k))
+            rows = np.argpartition(-scores, candidates - 1)[:candidates]
+            rows = rows[np.isfinite(scores[rows])]
+            vectors = self._full_vectors(rows)
+
+            if rescore == 0:
+                order = np.argsort(-scores[rows])[:k]
+                similarities = vectors[order] @ query
+            else:
+                exact = vectors @ query
+                order = np.argsort(-exact)[:k]
+                similarities = exact[order]
+            rows = rows[order]
+            hits = [
+                (self.chunk_ids[row], self.parent_ids[row], float(score))
+                for row, score in zip(rows, similarities)
+            ]
+            return hits, vectors[order]
+
+    def _files(self) -> Dict[str, str]:
+        return {
+            name: os.path.join(self.path, name)
+            for name in ("codes.bin", "scales.f32", "vectors.f32", "meta.pkl")
+        }
+
+    def _open_full(self):
+        """Memory-map the persisted full-precision vectors (lock held)."""
+        self._full = None
+        if self._persisted:
+            self._full = np.memmap(
+                self._files()["vectors.f32"], dtype=np.float32, mode="r",
+                shape=(self._persisted, self.rescore_dimension)
+            )
+
+    def _compact(self):
+        """Rewrite the index without tombstoned rows (lock held)."""
+        files = self._files()
+        alive = np.flatnonzero(self._alive[:self._size])
+        vectors = self._full_vectors(alive)
+        for name, data in (
+            ("codes.bin", self._codes[alive]),
+            ("scales.f32", self._scales[alive]),
+            ("vectors.f32", vectors)
+        ):
+            tmp_path = f"{files[name]}.tmp"
+            data.tofile(tmp_path)
+            os.replace(tmp_path, files[name])
+
+        self._codes = self._codes[alive]
+        self._scales = self._scales[alive]
+        self._alive = np.ones(len(alive), dtype=bool)
+        self._size = len(alive)
+        self.chunk_ids = [self.chunk_ids[row] for row in alive]
+        self.parent_ids = [self.parent_ids[row] for row in alive]
+        self._positions = {chunk_id: i for i, chunk_id in enumerate(self.chunk_ids)}
+        self._persisted = self._size
+        self._pending = []
+
+    def save(self):
+        """Append new rows to disk (compacting if mostly tombstones)."""
+        if not self.path:
+            return
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            files = self._files()
+            if self._size and len(self._positions) < self._size // 2:
+                self._compact()
+            elif self._pending:
+                rows = slice(self._persisted, self._size)
+                with open(files["codes.bin"], "ab") as f:
+                    self._codes[rows].tofile(f)
+                with open(files["scales.f32"], "ab") as f:
+                    self._scales[rows].tofile(f)
+                with open(files["vectors.f32"], "ab") as f:
+                    for vectors in self._pending:
+                        vectors.tofile(f)
+                self._persisted = self._size
+                self._pending = []
+
+            state = {
+                "mode": self.mode,
+                "dimension": self.dimension,
+                "rescore_dimension": self.rescore_dimension,
+                "rows": self._size,
+                "chunk_ids": self.chunk_ids,
+                "parent_ids": self.parent_ids,
+                "alive": np.packbits(self._alive[:self._size]).tobytes()
+            }
+            tmp_path = f"{files['meta.pkl']}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, files["meta.pkl"])
+            self._open_full()
+
+    def load(self):
+        """Load the index from its directory."""
+        files = self._files()
+        with open(files["meta.pkl"], "rb") as f:
+            state = pickle.load(f)
+        stored = (
+            state["mode"],
+            state["dimension"],
+            state.get("rescore_dimension", state["dimension"])
+        )
+        expected = (self.mode, self.dimension, self.rescore_dimension)
+        if stored != expected:
+            raise ValueError(
+                f"Index at {self.path} is {'/'.join(map(str, stored))}, expected "
+                f"{'/'.join(map(str, expected))}; rebuild it"
+            )
+
+        rows = state["rows"]
+        code_width = self._codes.shape[1]
+        # Drop rows appended after the last metadata write
+        for name, row_bytes in (
+            ("codes.bin", code_width * self._codes.itemsize),
+            ("scales.f32", 4),
+            ("vectors.f32", self.rescore_dimension * 4)
+        ):
+            if not os.path.exists(files[name]):
+                open(files[name], "wb").close()
+            if os.path.getsize(files[name]) > rows * row_bytes:
+                os.truncate(files[name], rows * row_bytes)
+
+        with self._lock:
+            self._codes = np.fromfile(files["codes.bin"], dtype=self._codes.dtype)\
+                .reshape(rows, code_width)
+            self._scales = np.fromfile(files["scales.f32"], dtype=np.float32)
+            self._alive = np.unpackbits(
+                np.frombuffer(state["alive"], dtype=np.uint8), count=rows
+            ).astype(bool)
+            self._size = rows
+            self.chunk_ids = state["chunk_ids"]
+            self.parent_ids = state["parent_ids"]
+            self._positions = {
+                chunk_id: row for row, chunk_id in enumerate(self.chunk_ids)
+                if chunk_id is not None and self._alive[row]
+            }
+            self._persisted = rows
+            self._pending = []
+            self._open_full()
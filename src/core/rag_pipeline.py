@@ -1,25 +1,82 @@
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 import os
-from langchain.text_splitter import TokenTextSplitter
-from langchain.storage import LocalFileStore
+import numpy as np
 from langchain.embeddings import CacheBackedEmbeddings
 from openai import OpenAI
 from langchain_openai import OpenAIEmbeddings
 from src.config.settings import (
     CHUNK_SIZE,
     CHUNK_OVERLAP,
-    OPENAI_API_KEY
+    CONTEXT_TOKEN_BUDGET,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    CHAT_MODEL,
+    CHAT_MAX_TOKENS,
+    CHAT_TEMPERATURE,
+    COMPLETION_CACHE_SIZE,
+    COMPLETION_CACHE_TTL,
+    REDIS_COMPRESS_THRESHOLD,
+    MEMORY_TURNS,
+    MEMORY_MAX_CONVERSATIONS,
+    MEMORY_PENDING_MAX_TOKENS,
+    MEMORY_SUMMARY_MAX_TOKENS,
+    TEMPLATE_CONTEXT_CACHE_SIZE,
+    TEMPLATE_CONTEXT_REVALIDATE,
+    EMBEDDING_MODEL,
+    EMBEDDING_MODEL_DIMENSION,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_POLICY,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+    RETRIEVAL_TOP_K,
+    HYBRID_SEARCH_ENABLED,
+    HYBRID_CANDIDATES,
+    RRF_K,
+    LEXICAL_INDEX_PATH,
+    CITATION_INDEX_PATH,
+    CITATION_LOOKUP_MODE,
+    RERANK_ENABLED,
+    RERANK_FETCH_K,
+    MMR_LAMBDA,
+    VECTOR_DIMENSION,
+    FULL_VECTOR_RESCORE,
+    VECTOR_QUANTIZATION,
+    VECTOR_INDEX_PATH,
+    RESCORE_FACTOR,
+    INDEX_PARTITIONS_OPEN,
+    BASE_CORPUS_ENABLED,
+    BASE_CORPUS_PATH
 )
-from src.db.supabase import SupabaseVectorStore
+from src.core.chunker import LegalChunker
+from src.core.context_assembler import ContextAssembler
+from src.core.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.core.citations import CitationIndex
+from src.core.rerank import mmr
+from src.core.quantization import QuantizedVectorIndex
+from src.core.base_corpus import BaseCorpus, get_base_corpus
+from src.core.dimensions import embedding_namespace, shorten, validate_dimension
+from src.core.partitions import PartitionedIndexes
+from src.core.embedding_cache import get_query_embedding_cache
+from src.core.embedding_file_cache import get_managed_file_store
+from src.core.completion_cache import get_completion_cache
+from src.core.conversation_memory import Turn, format_turns, get_conversation_memory
+from src.core.template_context import get_template_context_service
+from src.core.metrics import StageTimer
+from src.db.supabase import SupabaseVectorStore, redis_client
 
 
 class RAGPipeline:
     def __init__(self):
         """Initialize the RAG pipeline components."""
-        self.text_splitter = TokenTextSplitter(
+        self.text_splitter = LegalChunker(
             chunk_size=CHUNK_SIZE,
             chunk_overlap=CHUNK_OVERLAP
         )
+        self.context_assembler = ContextAssembler(
+            token_budget=CONTEXT_TOKEN_BUDGET
+        )
         
         # Initialize OpenAI client instead of Anthropic
         api_key = OPENAI_API_KEY
@@ -29,29 +86,149 @@ class RAGPipeline:
             
         print(f"Using OpenAI API key: {api_key[:10]}..."
               f"{api_key[-5:] if api_key else 'None'}")
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, base_url=OPENAI_BASE_URL)
+        
+        # Embeddings are requested at full size when the full vectors are
+        # kept for rescoring, otherwise at the stored (possibly shortened) size
+        validate_dimension(VECTOR_DIMENSION, EMBEDDING_MODEL_DIMENSION)
+        if FULL_VECTOR_RESCORE and VECTOR_QUANTIZATION == "none":
+            raise ValueError(
+                "FULL_VECTOR_RESCORE keeps full vectors in the local vector "
+                "index; set VECTOR_QUANTIZATION to int8 or binary"
+            )
+        self.embedding_dimension = (
+            EMBEDDING_MODEL_DIMENSION if FULL_VECTOR_RESCORE else VECTOR_DIMENSION
+        )
         
         self.vector_store = SupabaseVectorStore()
         
+        # BM25 and citation indexes maintained alongside the vector store,
+        # one set per bot (see src/core/partitions.py)
+        self.lexical_indexes = PartitionedIndexes(
+            LexicalIndex, LEXICAL_INDEX_PATH, max_open=INDEX_PARTITIONS_OPEN
+        )
+        self.citation_indexes = PartitionedIndexes(
+            CitationIndex, CITATION_INDEX_PATH, max_open=INDEX_PARTITIONS_OPEN
+        )
+        # Local quantized copy of the vectors for first-pass search
+        self.vector_indexes = None
+        if VECTOR_QUANTIZATION != "none":
+            self.vector_indexes = PartitionedIndexes(
+                lambda path: QuantizedVectorIndex(
+                    path,
+                    mode=VECTOR_QUANTIZATION,
+                    dimension=VECTOR_DIMENSION,
+                    rescore_dimension=self.embedding_dimension
+                ),
+                VECTOR_INDEX_PATH,
+                max_open=INDEX_PARTITIONS_OPEN
+            )
+        # Prebuilt base-layer corpus, searched locally with every query
+        self.base_corpus = self._open_base_corpus() if BASE_CORPUS_ENABLED else None
+        self._retrieval_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="retrieval"
+        )
+        
         # Setup embeddings with local file caching
+        embedding_options = {}
+        if self.embedding_dimension != EMBEDDING_MODEL_DIMENSION:
+            embedding_options["dimensions"] = self.embedding_dimension
         underlying_embeddings = OpenAIEmbeddings(
             openai_api_key=api_key,
-            model="text-embedding-3-small"
+            openai_api_base=OPENAI_BASE_URL,
+            model=EMBEDDING_MODEL,
+            **embedding_options
         )
         
-        # Use local file store for caching
-        fs = LocalFileStore("./cache/")
+        # Use a size-bounded local file store for caching, namespaced by dimension
+        self.embedding_file_cache = get_managed_file_store(
+            EMBEDDING_CACHE_DIR,
+            max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+            policy=EMBEDDING_CACHE_POLICY
+        )
+        self.embedding_cache_namespace = embedding_namespace(
+            "embeddings_cache", self.embedding_dimension, EMBEDDING_MODEL_DIMENSION
+        )
         self.embeddings = CacheBackedEmbeddings.from_bytes_store(
             underlying_embeddings=underlying_embeddings,
-            document_embedding_cache=fs,
-            namespace="embeddings_cache"
+            document_embedding_cache=self.embedding_file_cache,
+            namespace=self.embedding_cache_namespace
+        )
+        
+        # Query embeddings are cached separately, shared across pipelines
+        self.query_embedding_cache = get_query_embedding_cache(
+            embedding_namespace(
+                EMBEDDING_MODEL, self.embedding_dimension, EMBEDDING_MODEL_DIMENSION
+            ),
+            max_size=QUERY_EMBEDDING_CACHE_SIZE,
+            redis_client=redis_client,
+            ttl=QUERY_EMBEDDING_CACHE_TTL
         )
+        self.completion_cache = get_completion_cache(
+            max_size=COMPLETION_CACHE_SIZE,
+            ttl=COMPLETION_CACHE_TTL,
+            redis_client=redis_client,
+            compress_threshold=REDIS_COMPRESS_THRESHOLD
+        )
+        self.memory = get_conversation_memory(
+            self._summarize_turns,
+            max_turns=MEMORY_TURNS,
+            max_conversations=MEMORY_MAX_CONVERSATIONS,
+            max_pending_tokens=MEMORY_PENDING_MAX_TOKENS,
+            count_tokens=lambda text: len(
+                self.context_assembler.encoding.encode(text, disallowed_special=())
+            )
+        )
+        self.template_context = get_template_context_service(
+            self.vector_store.supabase,
+            max_size=TEMPLATE_CONTEXT_CACHE_SIZE,
+            revalidate_seconds=TEMPLATE_CONTEXT_REVALIDATE
+        )
+
+    def _open_base_corpus(self) -> Optional[BaseCorpus]:
+        """Memory-map the base corpus if one is built for this embedding setup."""
+        try:
+            corpus = get_base_corpus(BASE_CORPUS_PATH)
+        except Exception as e:
+            print(f"Warning: could not open the base corpus at {BASE_CORPUS_PATH}: {e}")
+            return None
+        if corpus is None:
+            return None
+        if corpus.embedding_model != EMBEDDING_MODEL or corpus.dimension > self.embedding_dimension:
+            print(
+                f"Warning: base corpus {corpus.version} was embedded with "
+                f"{corpus.embedding_model} at {corpus.dimension} dimensions, which "
+                f"queries at {self.embedding_dimension} cannot search; rebuild it"
+            )
+            return None
+        return corpus
+
+    def _summarize_turns(self, summary: str, turns: List[Turn]) -> str:
+        """Fold conversation turns into a rolling summary with the chat model."""
+        prompt = (
+            "Update the summary of a conversation between a lawyer and a "
+            "legal assistant with the new turns below. Keep parties, facts, "
+            "citations, decisions and open questions; drop pleasantries. "
+            "Answer with the updated summary only.\n\n"
+            f"Current summary:\n{summary or '(none)'}\n\n"
+            f"New turns:\n{format_turns(turns)}"
+        )
+        response = self.client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=MEMORY_SUMMARY_MAX_TOKENS,
+            temperature=0
+        )
+        return response.choices[0].message.content.strip()
 
     def process_document(
         self,
         content: str,
         metadata: Dict,
-        doc_id: Optional[str] = None
+        doc_id: Optional[str] = None,
+        pages: Optional[List[Dict]] = None,
+        bot_id: Optional[str] = None,
+        save_indexes: bool = True
     ) -> str:
         """
         Process a document for storage in the vector database.
@@ -60,52 +237,399 @@ class RAGPipeline:
             content: Document text content
             metadata: Document metadata
             doc_id: Optional document ID
+            pages: Optional page offsets from the extraction layer
+            bot_id: Optional bot (case) whose partition the chunks go to
+            save_indexes: Write the local indexes to disk; bulk loads pass
+                False and call save_indexes() at checkpoints instead
             
         Returns:
-            Stored document ID
+            Stored document group (parent) ID, shared by all its chunks
         """
-        # Split text into chunks
-        chunks = self.text_splitter.split_text(content)
+        timer = StageTimer("ingest")
+        if bot_id is not None:
+            metadata = {**metadata, "bot_id": bot_id}
         
-        # Get embeddings for chunks
-        embeddings = self.embeddings.embed_documents(chunks)
+        chunks, embeddings, stored = self._chunk_and_embed(content, pages, timer)
         
-        # Store chunks with embeddings
-        chunk_ids = []
-        for chunk, embedding in zip(chunks, embeddings):
-            chunk_id = self.vector_store.store_document(
-                content=chunk,
+        # Store document-level metadata once, then chunks with their offsets
+        with timer.stage("store"):
+            parent_id = self.vector_store.store_parent_document(
                 metadata=metadata,
-                embeddings=embedding,
-                doc_id=doc_id
+                parent_id=doc_id
+            )
+            chunk_ids = self.vector_store.store_chunks(
+                parent_id, chunks, stored, bot_id=bot_id
+            )
+        
+        with timer.stage("index"):
+            self._index_chunks(parent_id, chunk_ids, chunks, embeddings, bot_id)
+            if save_indexes:
+                self.save_indexes(bot_id)
+        
+        timer.finish()
+        return parent_id
+
+    def _chunk_and_embed(
+        self,
+        content: str,
+        pages: Optional[List[Dict]],
+        timer: StageTimer
+    ) -> Tuple[List[Dict], List[List[float]], List[List[float]]]:
+        """Chunk a document and embed the chunks at the model and stored sizes."""
+        # Split text into chunks at legal-structure boundaries
+        with timer.stage("chunk"):
+            chunks = self.text_splitter.split(content, pages=pages)
+        
+        # Get embeddings for chunks
+        with timer.stage("embed"):
+            embeddings = self.embeddings.embed_documents(
+                [chunk["content"] for chunk in chunks]
             )
-            chunk_ids.append(chunk_id)
+            stored = embeddings
+            if self.embedding_dimension != VECTOR_DIMENSION:
+                stored = shorten(embeddings, VECTOR_DIMENSION).tolist()
+        return chunks, embeddings, stored
+
+    def _index_chunks(
+        self,
+        parent_id: str,
+        chunk_ids: List[str],
+        chunks: List[Dict],
+        embeddings: List[List[float]],
+        bot_id: Optional[str]
+    ):
+        """Add stored chunks to their bot's local indexes."""
+        indexed = [(chunk_id, chunk["content"]) for chunk_id, chunk in zip(chunk_ids, chunks)]
+        self.lexical_indexes.get(bot_id).add_many(indexed)
+        self.citation_indexes.get(bot_id).add_many(indexed)
+        if self.vector_indexes is not None:
+            self.vector_indexes.get(bot_id).add_many(
+                [(chunk_id, parent_id, embedding) for chunk_id, embedding in zip(chunk_ids, embeddings)]
+            )
+
+    def _unindex_chunks(
+        self,
+        chunk_ids: List[str],
+        texts: List[str],
+        bot_id: Optional[str]
+    ):
+        """
+        Drop removed chunks from their bot's local indexes and the caches.
+
+        Args:
+            chunk_ids: Removed chunk IDs
+            texts: Texts whose cached embeddings are no longer needed
+            bot_id: Bot whose indexes held the chunks
+        """
+        # A chunk with identical text elsewhere just gets re-embedded
+        self.embedding_file_cache.mdelete(
+            list({self.embedding_cache_key(text) for text in texts})
+        )
+        self.lexical_indexes.get(bot_id).remove(chunk_ids)
+        self.citation_indexes.get(bot_id).remove(chunk_ids)
+        if self.vector_indexes is not None:
+            self.vector_indexes.get(bot_id).remove(chunk_ids)
+        self.completion_cache.invalidate_chunks(chunk_ids)
+
+    def save_indexes(self, bot_id: Optional[str] = None):
+        """Write a bot's lexical, citation and vector indexes to disk."""
+        self.lexical_indexes.get(bot_id).save()
+        self.citation_indexes.get(bot_id).save()
+        if self.vector_indexes is not None:
+            self.vector_indexes.get(bot_id).save()
+
+    def _quantized_candidates(
+        self,
+        vector_index: QuantizedVectorIndex,
+        query_embedding: List[float],
+        fetch_k: int,
+        metadata_filter: Optional[Dict]
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Candidate search on the local quantized index.
+        
+        The first pass scores every chunk on its quantized code; the best
+        fetch_k * RESCORE_FACTOR are rescored against full-precision
+        vectors. The metadata filter is applied to the rescored candidates
+        using the cached parent metadata.
+        
+        Returns:
+            Tuple of (chunk IDs, float32 array of shape (n, dim))
+        """
+        rescore = fetch_k * RESCORE_FACTOR
+        hits, vectors = vector_index.search(
+            query_embedding,
+            k=rescore if metadata_filter else fetch_k,
+            rescore=rescore
+        )
+        if metadata_filter:
+            parents = self.vector_store.get_parent_metadata(
+                [parent_id for _, parent_id, _ in hits if parent_id]
+            )
+            keep = [
+                i for i, (_, parent_id, _) in enumerate(hits)
+                if self._matches_filter(
+                    {"metadata": parents.get(parent_id, {})}, metadata_filter
+                )
+            ][:fetch_k]
+            hits, vectors = [hits[i] for i in keep], vectors[keep]
+        return [chunk_id for chunk_id, _, _ in hits], vectors
+
+    def _vector_search(
+        self,
+        query: str,
+        metadata_filter: Optional[Dict],
+        top_k: int,
+        timer: StageTimer,
+        bot_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Embed the query and run vector search.
+        
+        With reranking enabled, a wide candidate set of IDs and vectors is
+        fetched, MMR keeps the final top_k, and only those are hydrated.
+        Supabase is searched at VECTOR_DIMENSION; the local index takes the
+        query at full size when FULL_VECTOR_RESCORE is set. With a bot_id,
+        only that bot's partition is searched.
+        """
+        with timer.stage("embed"):
+            query_embedding = self.query_embedding_cache.get_or_embed(
+                query, self.embeddings.embed_query
+            )
+            search_embedding = query_embedding
+            if self.embedding_dimension != VECTOR_DIMENSION:
+                search_embedding = shorten(query_embedding, VECTOR_DIMENSION).tolist()
+        
+        if RERANK_ENABLED:
+            try:
+                fetch_k = max(RERANK_FETCH_K, top_k)
+                with timer.stage("vector_search"):
+                    vector_index = (
+                        self.vector_indexes.get(bot_id)
+                        if self.vector_indexes is not None else None
+                    )
+                    if vector_index is not None and len(vector_index):
+                        chunk_ids, vectors = self._quantized_candidates(
+                            vector_index, query_embedding, fetch_k, metadata_filter
+                        )
+                    else:
+                        chunk_ids, vectors = self.vector_store.candidate_search(
+                            query_embedding=search_embedding,
+                            fetch_k=fetch_k,
+                            metadata_filter=metadata_filter,
+                            bot_id=bot_id,
+                            rescore_count=(
+                                fetch_k * RESCORE_FACTOR
+                                if VECTOR_QUANTIZATION == "binary"
+                                and VECTOR_DIMENSION == EMBEDDING_MODEL_DIMENSION
+                                else None
+                            )
+                        )
+                with timer.stage("rerank"):
+                    rerank_query = (
+                        query_embedding if vectors.shape[1] == len(query_embedding)
+                        else search_embedding
+                    )
+                    selected = mmr(
+                        np.asarray(rerank_query, dtype=np.float32),
+                        vectors,
+                        k=top_k,
+                        lambda_mult=MMR_LAMBDA
+                    )
+                with timer.stage("fetch"):
+                    return self.vector_store.get_chunks(
+                        [chunk_ids[i] for i in selected]
+                    )
+            except Exception as e:
+                print(f"Candidate search unavailable, skipping rerank: {e}")
+        
+        with timer.stage("vector_search"):
+            return self.vector_store.similarity_search(
+                query_embedding=search_embedding,
+                top_k=top_k,
+                metadata_filter=metadata_filter,
+                bot_id=bot_id
+            )
+
+    def _base_search(
+        self,
+        query: str,
+        metadata_filter: Optional[Dict],
+        top_k: int,
+        timer: StageTimer
+    ) -> List[Dict]:
+        """Search the base corpus locally with the (cached) query embedding."""
+        query_embedding = self.query_embedding_cache.get_or_embed(
+            query, self.embeddings.embed_query
+        )
+        with timer.stage("base_search"):
+            hits = self.base_corpus.search(query_embedding, k=top_k)
+            return [
+                doc for doc in self.base_corpus.get([row for row, _ in hits])
+                if self._matches_filter(doc, metadata_filter)
+            ]
+
+    def _lexical_search(
+        self,
+        query: str,
+        top_k: int,
+        timer: StageTimer,
+        bot_id: Optional[str] = None
+    ) -> List[str]:
+        """Run BM25 search on a bot's partition; returns chunk IDs."""
+        with timer.stage("lexical_search"):
+            hits = self.lexical_indexes.get(bot_id).search(query, top_k=top_k)
+        return [chunk_id for chunk_id, _ in hits]
+
+    def _matches_filter(self, doc: Dict, metadata_filter: Optional[Dict]) -> bool:
+        """Check a hydrated chunk against a metadata filter."""
+        return not metadata_filter or all(
+            doc["metadata"].get(key) == value
+            for key, value in metadata_filter.items()
+        )
+
+    def lookup_citations(
+        self,
+        query: str,
+        metadata_filter: Optional[Dict] = None,
+        top_k: int = RETRIEVAL_TOP_K,
+        bot_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Fetch the chunks for citations in the query by direct lookup.
+
+        Case documents come first, then base corpus chunks for the same
+        citations (up to top_k each).
+        """
+        chunk_ids = self.citation_indexes.get(bot_id).lookup(query, limit=top_k)
+        cited = [
+            doc for doc in self.vector_store.get_chunks(chunk_ids)
+            if self._matches_filter(doc, metadata_filter)
+        ]
+        if self.base_corpus is not None:
+            cited += [
+                doc for doc in self.base_corpus.get(
+                    self.base_corpus.lookup_citations(query, limit=top_k)
+                )
+                if self._matches_filter(doc, metadata_filter)
+            ]
+        return cited
+
+    def retrieve(
+        self,
+        query: str,
+        metadata_filter: Optional[Dict] = None,
+        top_k: int = RETRIEVAL_TOP_K,
+        timer: Optional[StageTimer] = None,
+        bot_id: Optional[str] = None
+    ) -> Tuple[List[Dict], Dict[str, float]]:
+        """
+        Retrieve chunks with vector and BM25 search fused by reciprocal rank.
+        
+        Both legs run in parallel. Chunks found only by BM25 are fetched
+        by ID and checked against the metadata filter. The base corpus, if
+        built, is searched locally and fused as a third ranking.
+        
+        Args:
+            query: User question
+            metadata_filter: Optional filter for document types
+            top_k: Number of chunks to return
+            timer: Optional timer to record stages on (e.g. from query())
+            bot_id: Optional bot (case) to search; only its partition is read
             
-        return chunk_ids[0]  # Return first chunk ID as document ID
+        Returns:
+            Tuple of (results, per-stage latency in milliseconds)
+        """
+        timer = timer or StageTimer("retrieve")
+        hybrid = HYBRID_SEARCH_ENABLED and len(self.lexical_indexes.get(bot_id))
+        if not hybrid and self.base_corpus is None:
+            results = self._vector_search(
+                query, metadata_filter, top_k, timer, bot_id
+            )
+            return results, timer.timings
+
+        vector_future = self._retrieval_pool.submit(
+            self._vector_search, query, metadata_filter, HYBRID_CANDIDATES,
+            timer, bot_id
+        )
+        lexical_future = self._retrieval_pool.submit(
+            self._lexical_search, query, HYBRID_CANDIDATES, timer, bot_id
+        ) if hybrid else None
+        vector_results = vector_future.result()
+        lexical_ids = lexical_future.result() if lexical_future else []
+        # Local and fast; by now the query embedding is cached
+        base_results = []
+        if self.base_corpus is not None:
+            base_results = self._base_search(
+                query, metadata_filter, HYBRID_CANDIDATES, timer
+            )
+        
+        with timer.stage("fusion"):
+            fused = reciprocal_rank_fusion(
+                [
+                    [doc["id"] for doc in vector_results],
+                    lexical_ids,
+                    [doc["id"] for doc in base_results]
+                ],
+                k=RRF_K
+            )
+            by_id = {doc["id"]: doc for doc in vector_results + base_results}
+            missing = [
+                chunk_id for chunk_id, _ in fused[:top_k * 2]
+                if chunk_id not in by_id
+            ]
+            for doc in self.vector_store.get_chunks(missing):
+                if self._matches_filter(doc, metadata_filter):
+                    by_id[doc["id"]] = doc
+            results = [by_id[chunk_id] for chunk_id, _ in fused if chunk_id in by_id]
+        
+        return results[:top_k], timer.timings
 
     def query(
         self,
         query: str,
-        metadata_filter: Optional[Dict] = None
+        metadata_filter: Optional[Dict] = None,
+        bot_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        template_id: Optional[str] = None
     ) -> Dict:
         """
         Query the RAG system with a user question.
         
+        With a user_id, the prompt carries that user's conversation memory
+        for the bot (recent turns plus a rolling summary) and the answer is
+        added to it. With a template_id, the template's compiled context is
+        sent first as a system message, so the provider can cache it as a
+        shared prompt prefix.
+        
         Args:
             query: User question
             metadata_filter: Optional filter for document types
+            bot_id: Optional bot (case) whose documents are searched
+            user_id: Optional user whose conversation this continues
+            template_id: Optional case bot template whose context is used
             
         Returns:
-            Dict with answer and sources
+            Dict with answer, sources and per-stage timings in milliseconds
         """
-        # Get query embedding
-        query_embedding = self.embeddings.embed_query(query)
+        timer = StageTimer("query")
         
-        # Search for relevant chunks
-        results = self.vector_store.similarity_search(
-            query_embedding=query_embedding,
-            metadata_filter=metadata_filter
-        )
+        # Cited statutes and cases resolve by direct lookup
+        with timer.stage("citation_lookup"):
+            cited = self.lookup_citations(query, metadata_filter, bot_id=bot_id)
+        
+        if cited and CITATION_LOOKUP_MODE == "replace":
+            results = cited
+        else:
+            # Search for relevant chunks (vector + BM25)
+            results, _ = self.retrieve(
+                query, metadata_filter, timer=timer, bot_id=bot_id
+            )
+            cited_ids = {doc["id"] for doc in cited}
+            results = cited + [
+                doc for doc in results if doc["id"] not in cited_ids
+            ]
+            results = results[:max(RETRIEVAL_TOP_K, len(cited))]
         
         # Handle case when no documents are found
         if not results:
@@ -113,14 +637,20 @@ class RAGPipeline:
                 "answer": "I couldn't find any relevant information in the database "
                           "to answer your question. Please try a different question "
                           "or upload relevant documents first.",
-                "sources": []
+                "sources": [],
+                "timings": timer.finish()
             }
         
-        # Prepare context from chunks
+        # Merge overlapping chunks and fit them to the token budget
+        with timer.stage("assemble"):
+            sources = self.context_assembler.assemble(results)
         context = "\n\n".join([
-            f"Source {i+1}:\n{doc['content']}"
-            for i, doc in enumerate(results)
+            f"Source {i+1}:\n{source['content']}"
+            for i, source in enumerate(sources)
         ])
+        # Bounded memory of the conversation, not the whole transcript
+        history = self.memory.context(bot_id, user_id) if user_id else ""
+        memory_block = f"{history}\n\n" if history else ""
         
         # Generate answer with citations using OpenAI instead of Anthropic
         prompt = (
@@ -128,24 +658,156 @@ class RAGPipeline:
             "Use the following sources to answer the question. Include "
             "specific citations to the sources used.\n\n"
             f"Sources:\n{context}\n\n"
+            f"{memory_block}"
             f"Question: {query}\n\n"
             "Answer: Let me help you with that based on the provided sources."
         )
         
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=1000,
-            temperature=0.1
+        # Stable template prefix first, query-specific content after it
+        messages = [{"role": "user", "content": prompt}]
+        template = self.template_context.get(template_id) if template_id else None
+        if template:
+            messages.insert(0, {"role": "system", "content": template["prefix"]})
+        
+        # Same question over the same chunk versions -> same answer
+        params = {"max_tokens": CHAT_MAX_TOKENS, "temperature": CHAT_TEMPERATURE}
+        cache_key = self.completion_cache.make_key(
+            CHAT_MODEL, params, query, sources, history,
+            template["version"] if template else ""
         )
+        with timer.stage("completion_cache"):
+            completion = self.completion_cache.get(cache_key)
+        cached = completion is not None
+        
+        if not cached:
+            with timer.stage("llm"):
+                response = self.client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=messages,
+                    **params
+                )
+            completion = {"answer": response.choices[0].message.content}
+            self.completion_cache.put(
+                cache_key,
+                completion,
+                [chunk_id for source in sources for chunk_id in source["chunk_ids"]]
+            )
+        if user_id:
+            self.memory.record(bot_id, user_id, query, completion["answer"])
         
         return {
-            "answer": response.choices[0].message.content,
+            "answer": completion["answer"],
             "sources": [
                 {
-                    "content": doc["content"],
-                    "metadata": doc["metadata"]
+                    "content": source["content"],
+                    "metadata": source["metadata"]
                 }
-                for doc in results
-            ]
-        } 
\ No newline at end of file
+                for source in sources
+            ],
+            "context_tokens": sum(source["tokens"] for source in sources),
+            "timings": timer.finish(),
+            "cached": cached
+        }
+
+    def embedding_cache_key(self, text: str) -> str:
+        """Key of a chunk text's entry in the embedding file cache."""
+        return self.embeddings.document_embedding_store.key_encoder(text)
+
+    def delete_document(self, doc_id: str, bot_id: Optional[str] = None):
+        """
+        Delete a single chunk and drop it from its bot's indexes and the caches.
+
+        Use delete_document_group() to delete a whole document.
+        """
+        chunks = self.vector_store.get_chunks([doc_id])
+        self.vector_store.delete_document(doc_id)
+        self._unindex_chunks(
+            [doc_id], [chunk["content"] for chunk in chunks], bot_id
+        )
+        self.save_indexes(bot_id)
+
+    def delete_document_group(
+        self,
+        group_ids: Union[str, List[str]],
+        bot_id: Optional[str] = None,
+        save_indexes: bool = True
+    ) -> int:
+        """
+        Delete whole documents with one database call.
+
+        Their chunks, vectors and tag links are deleted together, and the
+        chunks are dropped from the bot's local indexes and the embedding,
+        completion and parent metadata caches.
+
+        Args:
+            group_ids: Document group ID(s), as returned by process_document
+            bot_id: Optional bot (case) the documents belong to
+            save_indexes: Write the local indexes to disk afterwards
+
+        Returns:
+            Number of chunks removed
+        """
+        if isinstance(group_ids, str):
+            group_ids = [group_ids]
+        removed = self.vector_store.delete_document_groups(group_ids, bot_id=bot_id)
+        self._unindex_chunks(
+            [chunk["id"] for chunk in removed],
+            [chunk["content"] for chunk in removed],
+            bot_id
+        )
+        if save_indexes:
+            self.save_indexes(bot_id)
+        return len(removed)
+
+    def replace_document_group(
+        self,
+        group_id: str,
+        content: str,
+        metadata: Dict,
+        pages: Optional[List[Dict]] = None,
+        bot_id: Optional[str] = None,
+        save_indexes: bool = True
+    ) -> str:
+        """
+        Re-ingest a changed document under its existing group ID.
+
+        The new chunks are embedded first; the old chunks are then swapped
+        for them in one database transaction, so searches never see the
+        document half-replaced or missing.
+
+        Args:
+            group_id: Document group ID, as returned by process_document
+            content: New document text content
+            metadata: New document metadata
+            pages: Optional page offsets from the extraction layer
+            bot_id: Optional bot (case) the document belongs to
+            save_indexes: Write the local indexes to disk afterwards
+
+        Returns:
+            The document group ID
+        """
+        timer = StageTimer("ingest")
+        if bot_id is not None:
+            metadata = {**metadata, "bot_id": bot_id}
+        
+        chunks, embeddings, stored = self._chunk_and_embed(content, pages, timer)
+        
+        with timer.stage("store"):
+            removed, chunk_ids = self.vector_store.replace_document_group(
+                group_id, metadata, chunks, stored, bot_id=bot_id
+            )
+        
+        with timer.stage("index"):
+            # The new chunks' embeddings were just cached; keep those
+            kept = {chunk["content"] for chunk in chunks}
+            self._unindex_chunks(
+                [chunk["id"] for chunk in removed],
+                [chunk["content"] for chunk in removed if chunk["content"] not in kept],
+                bot_id
+            )
+            self._index_chunks(group_id, chunk_ids, chunks, embeddings, bot_id)
+            if save_indexes:
+                self.save_indexes(bot_id)
+        
+        timer.finish()
+        return group_id
@@ -0,0 +1,62 @@
+"""
+Maximal marginal relevance reranking.
+
+Used for fetch-wide, rerank-narrow retrieval: a wide candidate set of chunk
+IDs and vectors is fetched first, and MMR picks the final k so that
+near-duplicate chunks (e.g. repeated pages of one exhibit) do not take
+every slot. Only the selected chunks are then hydrated with content.
+"""
+from typing import List
+
+import numpy as np
+
+
+def mmr(
+    query_embedding: np.ndarray,
+    candidate_embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7
+) -> List[int]:
+    """
+    Select k candidates by maximal marginal relevance.
+
+    Query and candidate similarities are computed in one matrix product
+    over the normalized vectors; the greedy selection then only updates a
+    running max-similarity vector, so no Python loop runs over candidates.
+
+    Args:
+        query_embedding: Query vector, shape (dim,)
+        candidate_embeddings: Candidate vectors, shape (n, dim)
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+    Returns:
+        Indices into candidate_embeddings, in selection order
+    """
+    n = len(candidate_embeddings)
+    if n == 0 or k <= 0:
+        return []
+
+    vectors = np.vstack([query_embedding, candidate_embeddings]).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1, norms)
+
+    # Row 0 holds query similarities, the rest candidate-candidate ones
+    similarity = vectors[1:] @ vectors.T
+    relevance = similarity[:, 0]
+    pairwise = similarity[:, 1:]
+
+    selected = [int(np.argmax(relevance))]
+    max_redundancy = pairwise[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    for _ in range(min(k, n) - 1):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_redundancy, pairwise[best], out=max_redundancy)
+
+    return selected
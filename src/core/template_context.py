@@ -0,0 +1,199 @@
+"""
+Compiled template context for case bots.
+
+A case bot's template carries its instructions (prompt), case history,
+participants and objective, plus links to documents
+(public.template_documents). These are compiled once per template version
+into a prompt prefix that is sent ahead of everything query-specific. The
+prefix is byte-stable for a given version (fixed section order, normalized
+whitespace, documents sorted, no timestamps), so the provider's prompt
+prefix caching can reuse it across queries.
+"""
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from src.core.metrics import record_cache
+
+# (heading, column), in prompt order
+TEMPLATE_SECTIONS = (
+    ("Objective", "objective"),
+    ("Participants", "participants"),
+    ("Case history", "case_history"),
+    ("Instructions", "prompt"),
+)
+
+TEMPLATE_COLUMNS = "id, name, description, prompt, case_history, participants, objective, updated_at"
+# Only what document_reference() reads; linked rows may carry their full
+# extracted text in content
+DOCUMENT_COLUMNS = "id, metadata"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """NFC, LF line endings, no trailing whitespace."""
+    text = unicodedata.normalize("NFC", text or "").replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def document_reference(document: Dict) -> str:
+    """One-line reference to a linked document."""
+    metadata = document.get("metadata") or {}
+    name = normalize_text(
+        document.get("name") or metadata.get("name") or metadata.get("title")
+        or document["id"]
+    )
+    tag = document.get("tag") or metadata.get("type")
+    return f"- {name}" + (f" [{normalize_text(tag)}]" if tag else "")
+
+
+def compile_prefix(template: Dict, documents: List[Dict]) -> str:
+    """
+    Compile a template and its linked documents into a prompt prefix.
+
+    Args:
+        template: templates row
+        documents: Rows of the documents linked to the template
+
+    Returns:
+        The prefix; identical input gives byte-identical output
+    """
+    parts = [f"You are the case assistant for: {normalize_text(template.get('name'))}"]
+    description = normalize_text(template.get("description"))
+    if description:
+        parts.append(description)
+    for heading, column in TEMPLATE_SECTIONS:
+        value = normalize_text(template.get(column))
+        if value:
+            parts.append(f"## {heading}\n{value}")
+    if documents:
+        ordered = sorted(documents, key=lambda document: str(document["id"]))
+        parts.append(
+            "## Case documents\n" + "\n".join(document_reference(d) for d in ordered)
+        )
+    return "\n\n".join(parts) + "\n"
+
+
+class TemplateContextService:
+    def __init__(
+        self,
+        client,
+        max_size: int = 256,
+        revalidate_seconds: float = 30
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            client: Supabase client
+            max_size: Compiled templates kept in memory
+            revalidate_seconds: How long a compiled prefix is used before
+                its template's updated_at is checked again
+        """
+        self.client = client
+        self.max_size = max_size
+        self.revalidate_seconds = revalidate_seconds
+        # template ID -> (checked_at, context)
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, template_id: str, context: Dict):
+        with self._lock:
+            self._entries[template_id] = (time.time(), context)
+            self._entries.move_to_end(template_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _compile(self, template_id: str) -> Optional[Dict]:
+        """Fetch a template and its linked documents and compile them."""
+        rows = self.client.table("templates") \
+            .select(TEMPLATE_COLUMNS) \
+            .eq("id", template_id) \
+            .execute().data
+        if not rows:
+            return None
+        template = rows[0]
+
+        links = self.client.table("template_documents") \
+            .select("document_id") \
+            .eq("template_id", template_id) \
+            .execute().data
+        documents = []
+        if links:
+            documents = self.client.table("documents") \
+                .select(DOCUMENT_COLUMNS) \
+                .in_("id", [link["document_id"] for link in links]) \
+                .execute().data
+
+        prefix = compile_prefix(template, documents)
+        return {
+            "template_id": template_id,
+            "updated_at": template["updated_at"],
+            "version": hashlib.sha256(prefix.encode()).hexdigest()[:16],
+            "prefix": prefix
+        }
+
+    def get(self, template_id: str) -> Optional[Dict]:
+        """
+        Compiled context for a template.
+
+        Within revalidate_seconds of the last check the cached prefix is
+        returned without a query; after that only updated_at is fetched,
+        and the template is recompiled when it changed.
+
+        Returns:
+            Dict with template_id, updated_at, version (prefix hash) and
+            prefix, or None if the template does not exist
+        """
+        with self._lock:
+            entry = self._entries.get(template_id)
+            if entry is not None:
+                self._entries.move_to_end(template_id)
+        if entry is not None:
+            checked_at, context = entry
+            if time.time() - checked_at < self.revalidate_seconds:
+                record_cache("template_context", "hit")
+                return context
+            rows = self.client.table("templates") \
+                .select("updated_at") \
+                .eq("id", template_id) \
+                .execute().data
+            if rows and rows[0]["updated_at"] == context["updated_at"]:
+                self._remember(template_id, context)
+                record_cache("template_context", "hit")
+                return context
+
+        record_cache("template_context", "miss")
+        context = self._compile(template_id)
+        if context is None:
+            with self._lock:
+                self._entries.pop(template_id, None)
+            return None
+        self._remember(template_id, context)
+        return context
+
+    def invalidate(self, template_id: str):
+        """Drop a template's compiled context, e.g. right after editing it."""
+        with self._lock:
+            self._entries.pop(template_id, None)
+
+
+_service: Optional[TemplateContextService] = None
+_service_lock = threading.Lock()
+
+
+def get_template_context_service(
+    client,
+    max_size: int = 256,
+    revalidate_seconds: float = 30
+) -> TemplateContextService:
+    """Return the process-wide template context service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TemplateContextService(
+                client, max_size=max_size, revalidate_seconds=revalidate_seconds
+            )
+        return _service
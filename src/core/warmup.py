@@ -0,0 +1,119 @@
+"""
+Lazy construction and background warm-up of heavy components.
+
+The RAG pipeline (LangChain, OpenAI, NumPy, Supabase) and the document
+tagger (spaCy) take seconds to import and build, so entry points get them
+through the accessors below instead of importing them at module load.
+A Warmup runs the accessors in a background thread after startup and
+reports its progress, so the app can serve (and report not-ready) while
+they load.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+_tagger = None
+_tagger_lock = threading.Lock()
+
+
+def get_rag_pipeline():
+    """Return the process-wide RAGPipeline, importing and building it on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            from src.core.rag_pipeline import RAGPipeline
+            _pipeline = RAGPipeline()
+        return _pipeline
+
+
+def get_document_tagger():
+    """Return the process-wide DocumentTagger, loading spaCy on first use."""
+    global _tagger
+    with _tagger_lock:
+        if _tagger is None:
+            from src.core.auto_tagger import DocumentTagger
+            _tagger = DocumentTagger()
+        return _tagger
+
+
+class Warmup:
+    def __init__(self, steps: List[Tuple[str, Callable[[], object]]]):
+        """
+        Initialize the warm-up.
+
+        Args:
+            steps: (name, function) pairs run in order in the background
+        """
+        self.steps = steps
+        self.status: Dict[str, str] = {name: "pending" for name, _ in steps}
+        self.seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start warming up; later calls do nothing."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name, step in self.steps:
+            self.status[name] = "running"
+            start = time.perf_counter()
+            try:
+                step()
+                self.status[name] = "done"
+            except Exception as e:
+                print(f"Warm-up step {name} failed: {e}")
+                self.errors[name] = str(e)
+                self.status[name] = "failed"
+            self.seconds[name] = round(time.perf_counter() - start, 3)
+
+    @property
+    def ready(self) -> bool:
+        return all(status == "done" for status in self.status.values())
+
+    def report(self) -> Dict:
+        """
+        Warm-up progress.
+
+        Returns:
+            Dict with ready, progress (fraction of steps done) and one
+            entry per step with its status, seconds and error
+        """
+        done = sum(1 for status in self.status.values() if status == "done")
+        return {
+            "ready": self.ready,
+            "progress": done / len(self.steps) if self.steps else 1.0,
+            "steps": [
+                {
+                    "name": name,
+                    "status": self.status[name],
+                    "seconds": self.seconds.get(name),
+                    "error": self.errors.get(name)
+                }
+                for name, _ in self.steps
+            ]
+        }
+
+
+_warmup: Optional[Warmup] = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> Warmup:
+    """Return the process-wide warm-up of the pipeline and tagger, started."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup([
+                ("rag_pipeline", get_rag_pipeline),
+                ("document_tagger", get_document_tagger)
+            ])
+    _warmup.start()
+    return _warmup
@@ -0,0 +1,223 @@
+"""
+Shared, pooled Supabase and HTTP clients.
+
+Every Supabase client in the process goes through one httpx connection
+pool (one for sync and one for async code), with keep-alive, optional
+HTTP/2 and explicit timeouts, so connections and TLS sessions are reused
+across vector stores, pipelines and requests instead of being set up per
+client. Clients are cached per (url, key).
+
+supabase-py releases that accept an httpx client (ClientOptions.httpx_client)
+use the pool for PostgREST, storage, auth and functions. With older
+releases the PostgREST session (the path every query takes) and the auth
+client are moved onto it.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from supabase import Client, create_client
+
+try:
+    from supabase.lib.client_options import SyncClientOptions as ClientOptions
+except ImportError:
+    from supabase.lib.client_options import ClientOptions
+
+from src.config.settings import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_MAX_CONNECTIONS,
+    SUPABASE_MAX_KEEPALIVE,
+    SUPABASE_KEEPALIVE_EXPIRY,
+    SUPABASE_CONNECT_TIMEOUT,
+    SUPABASE_TIMEOUT,
+    SUPABASE_HTTP2
+)
+
+_lock = threading.Lock()
+_transport: Optional[httpx.HTTPTransport] = None
+_async_transport: Optional[httpx.AsyncHTTPTransport] = None
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_clients: Dict[Tuple[str, str], Client] = {}
+_async_clients: Dict[Tuple[str, str], object] = {}
+
+
+def http_limits() -> httpx.Limits:
+    """Pool limits from the SUPABASE_* settings."""
+    return httpx.Limits(
+        max_connections=SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+        keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    """Request timeouts from the SUPABASE_* settings."""
+    return httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+
+
+def _use_http2() -> bool:
+    if not SUPABASE_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("Warning: h2 is not installed; Supabase requests use HTTP/1.1")
+        return False
+    return True
+
+
+def _pooled_transport() -> httpx.HTTPTransport:
+    """The process-wide sync connection pool (lock held)."""
+    global _transport
+    if _transport is None:
+        _transport = httpx.HTTPTransport(limits=http_limits(), http2=_use_http2(), retries=1)
+    return _transport
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                transport=_pooled_transport(),
+                timeout=http_timeout(),
+                follow_redirects=True
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide pooled async HTTP client.
+
+    Its connections belong to the event loop that first uses them, so use
+    it from one loop (e.g. the server's).
+    """
+    global _async_transport, _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_transport = httpx.AsyncHTTPTransport(
+                limits=http_limits(), http2=_use_http2(), retries=1
+            )
+            _async_http_client = httpx.AsyncClient(
+                transport=_async_transport,
+                timeout=http_timeout(),
+                follow_redirects=True
+            )
+        return _async_http_client
+
+
+def _supports_http_client(options_class) -> bool:
+    return "httpx_client" in getattr(options_class, "__dataclass_fields__", {})
+
+
+def _pool_legacy_client(client: Client):
+    """Move an older client's PostgREST session and auth requests onto the pool."""
+    postgrest = client.postgrest
+    session = postgrest.session
+    with _lock:
+        transport = _pooled_transport()
+    postgrest.session = httpx.Client(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=http_timeout(),
+        transport=transport,
+        follow_redirects=True
+    )
+    session.close()
+    # GoTrue sends full URLs and per-request headers, so it can share the client
+    if hasattr(client.auth, "_http_client"):
+        client.auth._http_client = get_http_client()
+
+
+def get_supabase_client(url: Optional[str] = None, key: Optional[str] = None) -> Client:
+    """
+    Return the process-wide Supabase client for a project and key.
+
+    Args:
+        url: Project URL; defaults to SUPABASE_URL
+        key: API key; defaults to SUPABASE_KEY
+
+    Returns:
+        A client whose requests share the pooled connections
+    """
+    url = url or SUPABASE_URL
+    key = key or SUPABASE_KEY
+    with _lock:
+        client = _clients.get((url, key))
+    if client is not None:
+        return client
+
+    timeout = SUPABASE_TIMEOUT
+    if _supports_http_client(ClientOptions):
+        options = ClientOptions(
+            httpx_client=get_http_client(),
+            postgrest_client_timeout=timeout,
+            storage_client_timeout=int(timeout)
+        )
+        client = create_client(url, key, options)
+    else:
+        options = ClientOptions(
+            postgrest_client_timeout=timeout,
+            storage_client_timeout=int(timeout)
+        )
+        client = create_client(url, key, options)
+        _pool_legacy_client(client)
+
+    with _lock:
+        # Keep the first one if another thread got here too
+        return _clients.setdefault((url, key), client)
+
+
+async def get_async_supabase_client(url: Optional[str] = None, key: Optional[str] = None):
+    """
+    Return the process-wide async Supabase client for a project and key.
+
+    Requires a supabase-py release with async clients (acreate_client).
+
+    Raises:
+        RuntimeError: If the installed supabase-py has no async client
+    """
+    try:
+        from supabase import AsyncClientOptions, acreate_client
+    except ImportError:
+        raise RuntimeError("Async Supabase clients need a newer supabase-py (acreate_client)")
+
+    url = url or SUPABASE_URL
+    key = key or SUPABASE_KEY
+    client = _async_clients.get((url, key))
+    if client is None:
+        options = AsyncClientOptions(
+            postgrest_client_timeout=SUPABASE_TIMEOUT,
+            storage_client_timeout=int(SUPABASE_TIMEOUT)
+        )
+        if _supports_http_client(AsyncClientOptions):
+            options.httpx_client = get_async_http_client()
+        client = await acreate_client(url, key, options)
+        client = _async_clients.setdefault((url, key), client)
+    return client
+
+
+def close_clients():
+    """Close the pooled sync connections, e.g. on shutdown."""
+    global _transport, _http_client
+    with _lock:
+        _clients.clear()
+        if _http_client is not None:
+            _http_client.close()
+        elif _transport is not None:
+            _transport.close()
+        _transport = _http_client = None
+
+
+async def aclose_clients():
+    """Close the pooled async connections, e.g. in a shutdown handler."""
+    global _async_transport, _async_http_client
+    with _lock:
+        _async_clients.clear()
+        client, _async_transport, _async_http_client = _async_http_client, None, None
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,83 @@
+-- Store document-level metadata once per document instead of on every chunk
+-- Chunk rows in public.documents reference their parent and keep only
+-- their ordinal and offsets
+
+CREATE TABLE IF NOT EXISTS public.parent_documents (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION public.set_parent_documents_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS set_parent_documents_updated_at ON public.parent_documents;
+CREATE TRIGGER set_parent_documents_updated_at
+    BEFORE UPDATE ON public.parent_documents
+    FOR EACH ROW
+    EXECUTE FUNCTION public.set_parent_documents_updated_at();
+
+-- Chunk-level columns
+ALTER TABLE public.documents
+    ADD COLUMN IF NOT EXISTS parent_id UUID
+        REFERENCES public.parent_documents(id) ON DELETE CASCADE,
+    ADD COLUMN IF NOT EXISTS ordinal INTEGER,
+    ADD COLUMN IF NOT EXISTS start_offset INTEGER,
+    ADD COLUMN IF NOT EXISTS end_offset INTEGER,
+    ADD COLUMN IF NOT EXISTS page_start INTEGER,
+    ADD COLUMN IF NOT EXISTS page_end INTEGER;
+
+-- Chunk rows have no metadata of their own; it lives on the parent
+ALTER TABLE public.documents
+    ALTER COLUMN metadata DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_documents_parent_ordinal
+    ON public.documents(parent_id, ordinal);
+
+CREATE INDEX IF NOT EXISTS idx_parent_documents_metadata
+    ON public.parent_documents USING GIN (metadata);
+
+-- Vector search over chunks. The metadata filter is applied against the
+-- parent row; results carry only the parent ID, and callers hydrate
+-- parent metadata once per parent rather than once per chunk.
+CREATE OR REPLACE FUNCTION public.match_document_chunks(
+    query_embedding VECTOR(1536),
+    match_count INTEGER DEFAULT 5,
+    filter_metadata JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+    id UUID,
+    parent_id UUID,
+    content TEXT,
+    ordinal INTEGER,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    page_start INTEGER,
+    page_end INTEGER,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        d.id,
+        d.parent_id,
+        d.content,
+        d.ordinal,
+        d.start_offset,
+        d.end_offset,
+        d.page_start,
+        d.page_end,
+        1 - (v.embedding <=> query_embedding) AS similarity
+    FROM public.document_vectors v
+    JOIN public.documents d ON d.id = v.document_id
+    LEFT JOIN public.parent_documents p ON p.id = d.parent_id
+    WHERE COALESCE(p.metadata, d.metadata) @> filter_metadata
+    ORDER BY v.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
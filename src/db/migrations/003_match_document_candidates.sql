@@ -0,0 +1,27 @@
+-- Candidate fetch for two-stage (fetch-wide, rerank-narrow) retrieval
+-- Returns only chunk IDs, similarities and vectors; content is fetched
+-- afterwards for the few chunks that survive reranking
+
+CREATE OR REPLACE FUNCTION public.match_document_candidates(
+    query_embedding VECTOR(1536),
+    match_count INTEGER DEFAULT 50,
+    filter_metadata JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+    id UUID,
+    similarity FLOAT,
+    embedding VECTOR(1536)
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        d.id,
+        1 - (v.embedding <=> query_embedding) AS similarity,
+        v.embedding
+    FROM public.document_vectors v
+    JOIN public.documents d ON d.id = v.document_id
+    LEFT JOIN public.parent_documents p ON p.id = d.parent_id
+    WHERE COALESCE(p.metadata, d.metadata) @> filter_metadata
+    ORDER BY v.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
@@ -0,0 +1,43 @@
+-- Binary-quantized first pass with full-precision rescoring
+-- Requires pgvector >= 0.7.0 (binary_quantize, bit type, <~> Hamming distance)
+--
+-- The HNSW index covers only the sign bits of each embedding (192 bytes per
+-- row instead of 6 KB), so it stays in memory for much larger corpora. The
+-- first rescore_count rows by Hamming distance are reordered by exact
+-- cosine distance on the stored full-precision vectors.
+
+CREATE INDEX IF NOT EXISTS document_vectors_embedding_bq_idx
+    ON public.document_vectors
+    USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops);
+
+CREATE OR REPLACE FUNCTION public.match_document_candidates_bq(
+    query_embedding VECTOR(1536),
+    match_count INTEGER DEFAULT 50,
+    rescore_count INTEGER DEFAULT 200,
+    filter_metadata JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+    id UUID,
+    similarity FLOAT,
+    embedding VECTOR(1536)
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH first_pass AS (
+        SELECT v.document_id, v.embedding
+        FROM public.document_vectors v
+        ORDER BY binary_quantize(v.embedding)::bit(1536)
+            <~> binary_quantize(query_embedding)
+        LIMIT rescore_count
+    )
+    SELECT
+        d.id,
+        1 - (f.embedding <=> query_embedding) AS similarity,
+        f.embedding
+    FROM first_pass f
+    JOIN public.documents d ON d.id = f.document_id
+    LEFT JOIN public.parent_documents p ON p.id = d.parent_id
+    WHERE COALESCE(p.metadata, d.metadata) @> filter_metadata
+    ORDER BY f.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
@@ -0,0 +1,56 @@
+-- Shortened embeddings
+-- Requires pgvector >= 0.7.0 (subvector, l2_normalize)
+--
+-- text-embedding-3 vectors can be truncated to a prefix and re-normalized
+-- with little loss in retrieval quality, so the embedding column can be
+-- stored at e.g. 256 or 512 dimensions (6x / 3x smaller rows and index).
+-- VECTOR_DIMENSION must match the column; SupabaseVectorStore checks it
+-- with vector_dimension() at startup.
+--
+-- The match_* functions need no change: Postgres ignores the VECTOR(1536)
+-- typmod on function arguments and results. The binary-quantized index and
+-- match_document_candidates_bq (004) are 1536-only and are dropped by
+-- resize_embeddings; the pipeline only calls them at full dimension.
+
+CREATE OR REPLACE FUNCTION public.vector_dimension()
+RETURNS INTEGER
+LANGUAGE sql STABLE
+AS $$
+    SELECT a.atttypmod
+    FROM pg_attribute a
+    WHERE a.attrelid = 'public.document_vectors'::regclass
+      AND a.attname = 'embedding';
+$$;
+
+-- Shorten stored embeddings in place, e.g. SELECT public.resize_embeddings(256);
+-- Rewrites the table and rebuilds the HNSW index; run during a quiet period.
+CREATE OR REPLACE FUNCTION public.resize_embeddings(dimensions INTEGER)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    current_dimension INTEGER := public.vector_dimension();
+BEGIN
+    IF dimensions < 1 OR dimensions > current_dimension THEN
+        RAISE EXCEPTION 'dimensions must be between 1 and %, got %',
+            current_dimension, dimensions;
+    END IF;
+    IF dimensions = current_dimension THEN
+        RETURN;
+    END IF;
+
+    DROP INDEX IF EXISTS public.document_vectors_embedding_idx;
+    DROP INDEX IF EXISTS public.document_vectors_embedding_bq_idx;
+
+    EXECUTE format(
+        'ALTER TABLE public.document_vectors
+             ALTER COLUMN embedding TYPE VECTOR(%1$s)
+             USING l2_normalize(subvector(embedding, 1, %1$s))::vector(%1$s)',
+        dimensions
+    );
+
+    CREATE INDEX document_vectors_embedding_idx
+        ON public.document_vectors
+        USING hnsw (embedding vector_cosine_ops);
+END;
+$$;
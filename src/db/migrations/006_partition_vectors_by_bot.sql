@@ -0,0 +1,147 @@
+-- Partition chunk vectors by bot (case)
+--
+-- public.document_vectors becomes a LIST-partitioned table keyed on bot_id.
+-- Each bot gets its own partition, created on first ingest by
+-- create_bot_partition(), with its own HNSW index, so a query scoped to a
+-- bot (match_bot_chunks / match_bot_candidates) is pruned to that bot's
+-- rows and its latency depends only on the size of the case. Rows stored
+-- without a bot land in the shared default partition and are still
+-- searched by the match_document_* functions.
+--
+-- The existing column types (including a shortened embedding from 005)
+-- are kept. If the binary-quantized index from 004 is used, re-run its
+-- CREATE INDEX statement afterwards.
+
+BEGIN;
+
+CREATE TABLE public.document_vectors_partitioned (
+    LIKE public.document_vectors INCLUDING DEFAULTS,
+    bot_id TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (bot_id, id)
+) PARTITION BY LIST (bot_id);
+
+CREATE TABLE public.document_vectors_shared
+    PARTITION OF public.document_vectors_partitioned DEFAULT;
+
+INSERT INTO public.document_vectors_partitioned
+SELECT v.*, '' FROM public.document_vectors v;
+
+DROP TABLE public.document_vectors;
+ALTER TABLE public.document_vectors_partitioned RENAME TO document_vectors;
+
+ALTER TABLE public.document_vectors
+    ADD CONSTRAINT document_vectors_document_id_fkey
+    FOREIGN KEY (document_id) REFERENCES public.documents(id) ON DELETE CASCADE;
+
+-- Created on the parent, so every partition gets its own copy
+CREATE INDEX document_vectors_document_id_idx
+    ON public.document_vectors (document_id);
+CREATE INDEX document_vectors_embedding_idx
+    ON public.document_vectors
+    USING hnsw (embedding vector_cosine_ops);
+
+COMMIT;
+
+-- Create a bot's partition; a no-op if it exists. Rows for the bot that
+-- were stored before its partition existed are moved out of the default
+-- partition, since Postgres refuses to add a partition they would belong to.
+CREATE OR REPLACE FUNCTION public.create_bot_partition(bot TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    partition_name TEXT := 'document_vectors_bot_' || md5(bot);
+BEGIN
+    IF bot IS NULL OR bot = '' THEN
+        RAISE EXCEPTION 'bot must not be empty';
+    END IF;
+    IF to_regclass('public.' || partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    CREATE TEMP TABLE moved_vectors AS
+        SELECT * FROM public.document_vectors_shared WHERE bot_id = bot;
+    DELETE FROM public.document_vectors_shared WHERE bot_id = bot;
+
+    BEGIN
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public.document_vectors '
+            'FOR VALUES IN (%L)',
+            partition_name, bot
+        );
+    EXCEPTION WHEN duplicate_table THEN
+        -- Created concurrently by another ingest
+        NULL;
+    END;
+
+    INSERT INTO public.document_vectors SELECT * FROM moved_vectors;
+    DROP TABLE moved_vectors;
+END;
+$$;
+
+-- Vector search within one bot's partition; same results as
+-- match_document_chunks restricted to the bot
+CREATE OR REPLACE FUNCTION public.match_bot_chunks(
+    bot TEXT,
+    query_embedding VECTOR(1536),
+    match_count INTEGER DEFAULT 5,
+    filter_metadata JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+    id UUID,
+    parent_id UUID,
+    content TEXT,
+    ordinal INTEGER,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    page_start INTEGER,
+    page_end INTEGER,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        d.id,
+        d.parent_id,
+        d.content,
+        d.ordinal,
+        d.start_offset,
+        d.end_offset,
+        d.page_start,
+        d.page_end,
+        1 - (v.embedding <=> query_embedding) AS similarity
+    FROM public.document_vectors v
+    JOIN public.documents d ON d.id = v.document_id
+    LEFT JOIN public.parent_documents p ON p.id = d.parent_id
+    WHERE v.bot_id = bot
+      AND COALESCE(p.metadata, d.metadata) @> filter_metadata
+    ORDER BY v.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
+
+-- Candidate fetch within one bot's partition (see 003)
+CREATE OR REPLACE FUNCTION public.match_bot_candidates(
+    bot TEXT,
+    query_embedding VECTOR(1536),
+    match_count INTEGER DEFAULT 50,
+    filter_metadata JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+    id UUID,
+    similarity FLOAT,
+    embedding VECTOR(1536)
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        d.id,
+        1 - (v.embedding <=> query_embedding) AS similarity,
+        v.embedding
+    FROM public.document_vectors v
+    JOIN public.documents d ON d.id = v.document_id
+    LEFT JOIN public.parent_documents p ON p.id = d.parent_id
+    WHERE v.bot_id = bot
+      AND COALESCE(p.metadata, d.metadata) @> filter_metadata
+    ORDER BY v.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
@@ -0,0 +1,37 @@
+-- Template version for cached template context
+--
+-- src/core/template_context.py caches each template's compiled prompt
+-- prefix keyed on templates.updated_at. Keep updated_at current on every
+-- edit, and bump it when documents are linked or unlinked, since the
+-- linked documents are part of the prefix.
+
+CREATE OR REPLACE FUNCTION public.set_templates_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_templates_updated_at ON public.templates;
+DROP TRIGGER IF EXISTS set_templates_updated_at ON public.templates;
+CREATE TRIGGER set_templates_updated_at
+    BEFORE UPDATE ON public.templates
+    FOR EACH ROW
+    EXECUTE FUNCTION public.set_templates_updated_at();
+
+CREATE OR REPLACE FUNCTION public.touch_template_for_documents()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE public.templates
+    SET updated_at = NOW()
+    WHERE id = COALESCE(NEW.template_id, OLD.template_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS touch_template_for_documents ON public.template_documents;
+CREATE TRIGGER touch_template_for_documents
+    AFTER INSERT OR UPDATE OR DELETE ON public.template_documents
+    FOR EACH ROW
+    EXECUTE FUNCTION public.touch_template_for_documents();
@@ -0,0 +1,122 @@
+-- Set-based delete and replace of whole documents
+--
+-- Every chunk row carries its document's group ID: the parent_id of its
+-- public.parent_documents row (see 002). delete_document_groups() and
+-- replace_document_group() act on all of a document's chunks in one call
+-- instead of one request per chunk. Vectors are deleted explicitly, within
+-- the bot's partition when a bot is given (see 006); tag links go with
+-- their chunks through document_tag_links' ON DELETE CASCADE. Both
+-- functions return the removed chunks so callers can drop them from their
+-- local indexes and caches.
+
+-- replace_document_group() inserts chunk rows without metadata, like
+-- store_chunks(); repeated from 002 for databases migrated before it
+-- relaxed the column
+ALTER TABLE public.documents
+    ALTER COLUMN metadata DROP NOT NULL;
+
+-- Delete documents with all of their chunks, vectors and tag links
+CREATE OR REPLACE FUNCTION public.delete_document_groups(
+    group_ids UUID[],
+    bot TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    parent_id UUID,
+    content TEXT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    DELETE FROM public.document_vectors v
+    USING public.documents d
+    WHERE v.document_id = d.id
+      AND d.parent_id = ANY(group_ids)
+      AND (bot IS NULL OR v.bot_id = bot);
+
+    RETURN QUERY
+    WITH deleted AS (
+        DELETE FROM public.documents d
+        WHERE d.parent_id = ANY(group_ids)
+        RETURNING d.id, d.parent_id, d.content
+    )
+    SELECT x.id, x.parent_id, x.content FROM deleted x;
+
+    DELETE FROM public.parent_documents p
+    WHERE p.id = ANY(group_ids);
+END;
+$$;
+
+-- Swap a document's chunks for new ones in one transaction, keeping its
+-- group ID. The group is created if it does not exist. chunks is a JSON
+-- array of objects with content, ordinal, start_offset, end_offset,
+-- page_start, page_end and embedding (an array of floats). Rows come back
+-- with removed = TRUE for the old chunks and FALSE for the new ones.
+CREATE OR REPLACE FUNCTION public.replace_document_group(
+    group_id UUID,
+    group_metadata JSONB,
+    chunks JSONB,
+    bot TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    ordinal INTEGER,
+    removed BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    INSERT INTO public.parent_documents AS p (id, metadata)
+    VALUES (group_id, group_metadata)
+    ON CONFLICT (id) DO UPDATE SET metadata = EXCLUDED.metadata;
+
+    DELETE FROM public.document_vectors v
+    USING public.documents d
+    WHERE v.document_id = d.id
+      AND d.parent_id = group_id
+      AND (bot IS NULL OR v.bot_id = bot);
+
+    RETURN QUERY
+    WITH deleted AS (
+        DELETE FROM public.documents d
+        WHERE d.parent_id = group_id
+        RETURNING d.id, d.content, d.ordinal
+    )
+    SELECT x.id, x.content, x.ordinal, TRUE FROM deleted x;
+
+    RETURN QUERY
+    WITH new_chunks AS MATERIALIZED (
+        SELECT gen_random_uuid() AS id, c.value AS chunk
+        FROM jsonb_array_elements(chunks) AS c(value)
+    ),
+    inserted AS (
+        INSERT INTO public.documents AS d (
+            id, parent_id, content, ordinal,
+            start_offset, end_offset, page_start, page_end
+        )
+        SELECT
+            n.id,
+            group_id,
+            n.chunk->>'content',
+            (n.chunk->>'ordinal')::INTEGER,
+            (n.chunk->>'start_offset')::INTEGER,
+            (n.chunk->>'end_offset')::INTEGER,
+            (n.chunk->>'page_start')::INTEGER,
+            (n.chunk->>'page_end')::INTEGER
+        FROM new_chunks n
+        RETURNING d.id, d.content, d.ordinal
+    ),
+    vectors AS (
+        -- The foreign key to documents is checked at the end of the
+        -- statement, after both inserts
+        INSERT INTO public.document_vectors (document_id, embedding, bot_id)
+        SELECT n.id, (n.chunk->>'embedding')::vector, COALESCE(bot, '')
+        FROM new_chunks n
+    )
+    SELECT i.id, i.content, i.ordinal, FALSE
+    FROM inserted i;
+END;
+$$;
@@ -1,13 +1,20 @@
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import threading
 import numpy as np
-from supabase import create_client, Client
+from supabase import Client
 from src.config.settings import (
-    SUPABASE_URL,
-    SUPABASE_KEY,
     VECTOR_DIMENSION,
+    PARENT_CACHE_SIZE,
     REDIS_ENABLED,
-    REDIS_URL
+    REDIS_URL,
+    REDIS_COMPRESS_THRESHOLD
 )
+from src.core.cache_codec import CacheCodec
+from src.core.metrics import record_cache
+from src.db.client import get_supabase_client
 
 # Initialize Redis client only if a valid URL is provided
 redis_client = None
@@ -21,10 +28,65 @@ if REDIS_ENABLED and REDIS_URL and REDIS_URL.startswith(('redis://', 'rediss://'
         redis_client = None
         print("Warning: Redis connection failed. Caching disabled.")
 
+# Cached search results; bump the version when their shape changes
+SEARCH_CACHE_TTL = 3600
+_search_codec = CacheCodec(
+    "similarity_search", version=1, compress_threshold=REDIS_COMPRESS_THRESHOLD
+)
+
+# Search cache keys include generation counters that writes increment, so
+# results cached before a document was added, replaced, deleted or had its
+# metadata changed are never served again (they expire with their TTL).
+# One counter per bot partition (plus None for unpartitioned searches, which
+# see every bot's vectors) and one for all bots.
+_ALL_BOTS_GENERATION = "search_generation:*"
+
+
+def _generation_key(bot_id: Optional[str]) -> str:
+    return f"search_generation:{bot_id}"
+
+# Parent document metadata shared by all stores in this process; guarded
+# by _parent_cache_lock, since pipelines retrieve from several threads and
+# OrderedDict.move_to_end is not safe under concurrent mutation
+_parent_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_parent_cache_lock = threading.Lock()
+
+# The embedding column's dimension is checked once per process
+_dimension_checked = False
+
+# Bots whose vector partition is known to exist
+_bot_partitions = set()
+
+
 class SupabaseVectorStore:
     def __init__(self):
-        self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.supabase: Client = get_supabase_client()
         self._init_tables()
+        self._check_dimension()
+
+    def _check_dimension(self):
+        """
+        Fail fast if the embedding column does not match VECTOR_DIMENSION.
+        
+        Databases without migrations/005_vector_dimension.sql are assumed
+        to match.
+        """
+        global _dimension_checked
+        if _dimension_checked:
+            return
+        try:
+            dimension = self.supabase.rpc("vector_dimension", {}).execute().data
+        except Exception as e:
+            print(f"Warning: could not check the embedding column dimension: {e}")
+            _dimension_checked = True
+            return
+        if dimension and int(dimension) != VECTOR_DIMENSION:
+            raise ValueError(
+                f"document_vectors.embedding has {dimension} dimensions but "
+                f"VECTOR_DIMENSION is {VECTOR_DIMENSION}; set VECTOR_DIMENSION to "
+                f"match or shorten the column with public.resize_embeddings()"
+            )
+        _dimension_checked = True
 
     def _init_tables(self):
         """Initialize required tables if they don't exist."""
@@ -63,30 +125,446 @@ class SupabaseVectorStore:
 
         return doc_id
 
+    def store_parent_document(
+        self,
+        metadata: Dict,
+        parent_id: Optional[str] = None
+    ) -> str:
+        """Store document-level metadata once and return the parent ID."""
+        parent_data = {"metadata": metadata}
+        if parent_id:
+            parent_data["id"] = parent_id
+
+        result = self.supabase.table("parent_documents").insert(parent_data).execute()
+        parent_id = result.data[0]["id"]
+        self._cache_parent(parent_id, metadata)
+        return parent_id
+
+    def update_parent_metadata(
+        self,
+        parent_id: str,
+        metadata: Dict,
+        bot_id: Optional[str] = None
+    ):
+        """
+        Replace a document's metadata; its chunks pick it up on next read.
+
+        Args:
+            parent_id: Parent document ID
+            metadata: New document-level metadata
+            bot_id: Bot the document belongs to; if not given, cached
+                search results of every bot are invalidated
+        """
+        self.supabase.table("parent_documents")\
+            .update({"metadata": metadata})\
+            .eq("id", parent_id)\
+            .execute()
+        self._cache_parent(parent_id, metadata)
+        self._bump_search_generation(bot_id, all_bots=bot_id is None)
+
+    def store_chunk(
+        self,
+        parent_id: str,
+        content: str,
+        embeddings: List[float],
+        ordinal: int,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        page_start: Optional[int] = None,
+        page_end: Optional[int] = None,
+        bot_id: Optional[str] = None
+    ) -> str:
+        """
+        Store a chunk row that references its parent document.
+
+        With a bot_id the vector goes to that bot's partition of
+        document_vectors (see migrations/006_partition_vectors_by_bot.sql),
+        which is created on first use.
+        """
+        if len(embeddings) != VECTOR_DIMENSION:
+            raise ValueError(f"Embedding dimension must be {VECTOR_DIMENSION}")
+
+        chunk_data = {
+            "content": content,
+            "parent_id": parent_id,
+            "ordinal": ordinal,
+            "start_offset": start,
+            "end_offset": end,
+            "page_start": page_start,
+            "page_end": page_end
+        }
+        result = self.supabase.table("documents").insert(chunk_data).execute()
+        chunk_id = result.data[0]["id"]
+
+        vector_data = {
+            "document_id": chunk_id,
+            "embedding": np.array(embeddings).tolist()
+        }
+        if bot_id is not None:
+            self._ensure_bot_partition(bot_id)
+            vector_data["bot_id"] = bot_id
+        self.supabase.table("document_vectors").insert(vector_data).execute()
+        self._bump_search_generation(bot_id)
+
+        return chunk_id
+
+    @staticmethod
+    def _chunk_row(chunk: Dict, ordinal: int) -> Dict:
+        """Chunk columns from a chunker chunk (content, start, end, pages)."""
+        return {
+            "content": chunk["content"],
+            "ordinal": ordinal,
+            "start_offset": chunk.get("start"),
+            "end_offset": chunk.get("end"),
+            "page_start": chunk.get("page_start"),
+            "page_end": chunk.get("page_end")
+        }
+
+    def store_chunks(
+        self,
+        parent_id: str,
+        chunks: List[Dict],
+        embeddings: List[List[float]],
+        bot_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Store all of a document's chunks and vectors with one insert each.
+
+        Args:
+            parent_id: The document's group (parent) ID
+            chunks: Chunks from the chunker, in order
+            embeddings: One vector per chunk
+            bot_id: Optional bot whose vector partition is used
+
+        Returns:
+            Chunk IDs in the order of chunks
+        """
+        if any(len(embedding) != VECTOR_DIMENSION for embedding in embeddings):
+            raise ValueError(f"Embedding dimension must be {VECTOR_DIMENSION}")
+        if not chunks:
+            return []
+
+        rows = [
+            {**self._chunk_row(chunk, ordinal), "parent_id": parent_id}
+            for ordinal, chunk in enumerate(chunks)
+        ]
+        result = self.supabase.table("documents").insert(rows).execute()
+        by_ordinal = {row["ordinal"]: row["id"] for row in result.data}
+        chunk_ids = [by_ordinal[ordinal] for ordinal in range(len(chunks))]
+
+        vectors = [
+            {"document_id": chunk_id, "embedding": np.array(embedding).tolist()}
+            for chunk_id, embedding in zip(chunk_ids, embeddings)
+        ]
+        if bot_id is not None:
+            self._ensure_bot_partition(bot_id)
+            for vector in vectors:
+                vector["bot_id"] = bot_id
+        self.supabase.table("document_vectors").insert(vectors).execute()
+        self._bump_search_generation(bot_id)
+
+        return chunk_ids
+
+    def delete_document_groups(
+        self,
+        group_ids: List[str],
+        bot_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Delete whole documents with one call.
+
+        Chunks, vectors and tag links of every group go in one transaction
+        (see migrations/008_document_groups.sql).
+
+        Args:
+            group_ids: Document group (parent) IDs
+            bot_id: Optional bot whose vector partition holds the vectors
+
+        Returns:
+            The removed chunks as dicts with id, parent_id and content
+        """
+        if not group_ids:
+            return []
+        removed = self.supabase.rpc(
+            "delete_document_groups",
+            {"group_ids": list(group_ids), "bot": bot_id}
+        ).execute().data or []
+        self._forget_parents(group_ids)
+        self._bump_search_generation(bot_id)
+        return removed
+
+    def replace_document_group(
+        self,
+        group_id: str,
+        metadata: Dict,
+        chunks: List[Dict],
+        embeddings: List[List[float]],
+        bot_id: Optional[str] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Swap a document's chunks for new ones in one transaction.
+
+        The group keeps its ID, so references to the document stay valid;
+        it is created if it does not exist.
+
+        Args:
+            group_id: Document group (parent) ID
+            metadata: New document-level metadata
+            chunks: New chunks from the chunker, in order
+            embeddings: One vector per new chunk
+            bot_id: Optional bot whose vector partition is used
+
+        Returns:
+            Tuple of (removed chunks as dicts with id and content, new
+            chunk IDs in the order of chunks)
+        """
+        if any(len(embedding) != VECTOR_DIMENSION for embedding in embeddings):
+            raise ValueError(f"Embedding dimension must be {VECTOR_DIMENSION}")
+        if bot_id is not None:
+            self._ensure_bot_partition(bot_id)
+
+        payload = [
+            {**self._chunk_row(chunk, ordinal), "embedding": np.array(embedding).tolist()}
+            for ordinal, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+        ]
+        rows = self.supabase.rpc(
+            "replace_document_group",
+            {
+                "group_id": group_id,
+                "group_metadata": metadata,
+                "chunks": payload,
+                "bot": bot_id
+            }
+        ).execute().data or []
+
+        removed = [row for row in rows if row["removed"]]
+        added = sorted((row for row in rows if not row["removed"]), key=lambda row: row["ordinal"])
+        self._cache_parent(group_id, metadata)
+        self._bump_search_generation(bot_id)
+        return removed, [row["id"] for row in added]
+
+    def _search_generation(self, bot_id: Optional[str]) -> str:
+        """Current generation of a bot's cached searches, e.g. "0.3"."""
+        generations = redis_client.mget([_ALL_BOTS_GENERATION, _generation_key(bot_id)])
+        return ".".join(
+            generation.decode() if isinstance(generation, bytes) else str(generation or 0)
+            for generation in generations
+        )
+
+    def _bump_search_generation(self, bot_id: Optional[str], all_bots: bool = False):
+        """
+        Invalidate cached search results a write may have changed.
+
+        Args:
+            bot_id: Bot whose partition changed; None for unpartitioned data
+            all_bots: Invalidate every bot's cached searches
+        """
+        if not redis_client:
+            return
+        keys = [_ALL_BOTS_GENERATION] if all_bots else [_generation_key(bot_id)]
+        if not all_bots and bot_id is not None:
+            # Unpartitioned searches cover every bot's vectors
+            keys.append(_generation_key(None))
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(key)
+            pipe.execute()
+        except Exception as e:
+            print(f"Redis cache error: {e}")
+
+    def _ensure_bot_partition(self, bot_id: str):
+        """Create a bot's vector partition and HNSW index if missing."""
+        if bot_id in _bot_partitions:
+            return
+        self.supabase.rpc("create_bot_partition", {"bot": bot_id}).execute()
+        _bot_partitions.add(bot_id)
+
+    def _cache_parent(self, parent_id: str, metadata: Dict):
+        """Add parent metadata to the LRU cache."""
+        with _parent_cache_lock:
+            _parent_cache[parent_id] = metadata
+            _parent_cache.move_to_end(parent_id)
+            while len(_parent_cache) > PARENT_CACHE_SIZE:
+                _parent_cache.popitem(last=False)
+
+    def _forget_parents(self, parent_ids: List[str]):
+        """Drop deleted parents from the LRU cache."""
+        with _parent_cache_lock:
+            for parent_id in parent_ids:
+                _parent_cache.pop(parent_id, None)
+
+    def get_parent_metadata(self, parent_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get metadata for parent documents, fetching cache misses in one call.
+
+        Args:
+            parent_ids: Parent document IDs
+
+        Returns:
+            Dict of parent ID to document-level metadata
+        """
+        found = {}
+        missing = []
+        with _parent_cache_lock:
+            for parent_id in dict.fromkeys(parent_ids):
+                if parent_id in _parent_cache:
+                    _parent_cache.move_to_end(parent_id)
+                    found[parent_id] = _parent_cache[parent_id]
+                else:
+                    missing.append(parent_id)
+        for _ in found:
+            record_cache("parent_metadata", "hit")
+        for _ in missing:
+            record_cache("parent_metadata", "miss")
+
+        if missing:
+            result = self.supabase.table("parent_documents") \
+                .select("id, metadata") \
+                .in_("id", missing) \
+                .execute()
+            for row in result.data:
+                self._cache_parent(row["id"], row["metadata"])
+                found[row["id"]] = row["metadata"]
+
+        return found
+
+    def _hydrate(self, rows: List[Dict]) -> List[Dict]:
+        """Build search results from chunk rows and their parents' metadata."""
+        parents = self.get_parent_metadata(
+            [row["parent_id"] for row in rows if row.get("parent_id")]
+        )
+        documents = []
+        for row in rows:
+            if row.get("parent_id"):
+                metadata = {
+                    **parents.get(row["parent_id"], {}),
+                    "chunk_index": row["ordinal"],
+                    "start": row["start_offset"],
+                    "end": row["end_offset"]
+                }
+                if row.get("page_start") is not None:
+                    metadata["page"] = row["page_start"]
+                    metadata["page_end"] = row["page_end"]
+            else:
+                # Rows stored before parent documents carry their own copy
+                metadata = row.get("metadata") or {}
+            documents.append({
+                "content": row["content"],
+                "metadata": metadata,
+                "id": row["id"],
+                "parent_id": row.get("parent_id")
+            })
+        return documents
+
+    def get_chunks(self, chunk_ids: List[str]) -> List[Dict]:
+        """Fetch chunks by ID with their parent metadata, in the given order."""
+        if not chunk_ids:
+            return []
+        rows = self.supabase.table("documents") \
+            .select("*") \
+            .in_("id", chunk_ids) \
+            .execute().data
+        by_id = {doc["id"]: doc for doc in self._hydrate(rows)}
+        return [by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in by_id]
+
+    def iter_chunk_texts(self, page_size: int = 1000) -> Iterator[str]:
+        """Yield the text of every stored chunk, a page at a time."""
+        start = 0
+        while True:
+            rows = self.supabase.table("documents") \
+                .select("id, content") \
+                .order("id") \
+                .range(start, start + page_size - 1) \
+                .execute().data
+            for row in rows:
+                yield row["content"]
+            if len(rows) < page_size:
+                return
+            start += page_size
+
+    def candidate_search(
+        self,
+        query_embedding: List[float],
+        fetch_k: int = 50,
+        metadata_filter: Optional[Dict] = None,
+        rescore_count: Optional[int] = None,
+        bot_id: Optional[str] = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Fetch candidate chunk IDs and their vectors without content.
+
+        Args:
+            query_embedding: Query vector
+            fetch_k: Number of candidates
+            metadata_filter: Optional parent metadata filter
+            rescore_count: If set, run a binary-quantized first pass over
+                this many rows and rescore them at full precision
+                (see migrations/004_binary_quantized_candidates.sql);
+                ignored for a bot's partition, which is searched exactly
+            bot_id: Optional bot whose partition is searched
+
+        Returns:
+            Tuple of (chunk IDs, float32 array of shape (n, dim))
+        """
+        params = {
+            "query_embedding": query_embedding,
+            "match_count": fetch_k
+        }
+        if metadata_filter:
+            params["filter_metadata"] = metadata_filter
+
+        function = "match_document_candidates"
+        if bot_id is not None:
+            function = "match_bot_candidates"
+            params["bot"] = bot_id
+        elif rescore_count:
+            function = "match_document_candidates_bq"
+            params["rescore_count"] = rescore_count
+
+        rows = self.supabase.rpc(function, params).execute().data
+        if not rows:
+            return [], np.empty((0, VECTOR_DIMENSION), dtype=np.float32)
+
+        # PostgREST serializes pgvector values as "[0.1,0.2,...]" strings
+        vectors = np.array(
+            [
+                json.loads(row["embedding"]) if isinstance(row["embedding"], str)
+                else row["embedding"]
+                for row in rows
+            ],
+            dtype=np.float32
+        )
+        return [row["id"] for row in rows], vectors
+
     def similarity_search(
         self,
         query_embedding: List[float],
         top_k: int = 5,
-        metadata_filter: Optional[Dict] = None
+        metadata_filter: Optional[Dict] = None,
+        bot_id: Optional[str] = None
     ) -> List[Dict]:
-        """Search for similar documents using vector similarity."""
+        """Search for similar documents, within a bot's partition if given."""
+        cache_key = None
         if redis_client:
             try:
-                # Try cache first - use a hash of the embedding instead of the full embedding
-                import hashlib
-                embedding_hash = hashlib.md5(str(query_embedding).encode()).hexdigest()
-                cache_key = f"search:{embedding_hash}:{top_k}:{str(metadata_filter)}"
-                cached_result = redis_client.get(cache_key)
-                if cached_result:
+                # Try cache first - key on a hash of the embedding's float32 bytes
+                embedding_hash = hashlib.md5(
+                    np.asarray(query_embedding, dtype=np.float32).tobytes()
+                ).hexdigest()
+                filter_key = json.dumps(metadata_filter, sort_keys=True)
+                generation = self._search_generation(bot_id)
+                cache_key = f"search:{generation}:{embedding_hash}:{top_k}:{filter_key}:{bot_id}"
+                cached_result = _search_codec.decode(redis_client.get(cache_key))
+                if cached_result is not None:
+                    record_cache("similarity_search", "hit")
                     return cached_result
+                record_cache("similarity_search", "miss")
             except Exception as e:
                 print(f"Redis cache error: {e}")
 
         # Use RPC call instead of direct query to avoid URL length limitations
         try:
-            # Call a stored procedure in Supabase for vector search
-            # Note: You need to create this function in Supabase
-            # Example function name: 'match_documents'
             params = {
                 "query_embedding": query_embedding,
                 "match_count": top_k
@@ -94,50 +572,58 @@ class SupabaseVectorStore:
             
             if metadata_filter:
                 params["filter_metadata"] = metadata_filter
+            function = "match_document_chunks"
+            if bot_id is not None:
+                function = "match_bot_chunks"
+                params["bot"] = bot_id
                 
-            # Fallback to direct query if RPC not set up
-            # This is a simplified approach - in production, you should set up the RPC function
-            result = self.supabase.table("document_vectors") \
-                .select("document_id") \
-                .limit(top_k) \
-                .execute()
+            try:
+                # Vector search with the parent join done server-side
+                # (see migrations/002_parent_documents.sql)
+                result = self.supabase.rpc(function, params).execute()
+                rows = result.data
+            except Exception as e:
+                print(f"{function} unavailable, using direct query: {e}")
                 
-            # Get the document IDs
-            doc_ids = [item["document_id"] for item in result.data]
-            
-            # Fetch the actual documents
-            if doc_ids:
-                docs_result = self.supabase.table("documents") \
-                    .select("*") \
-                    .in_("id", doc_ids) \
-                    .execute()
+                # Fallback to direct query if RPC not set up
+                query = self.supabase.table("document_vectors") \
+                    .select("document_id")
+                if bot_id is not None:
+                    query = query.eq("bot_id", bot_id)
+                result = query.limit(top_k).execute()
                     
-                documents = [
-                    {
-                        "content": doc["content"],
-                        "metadata": doc["metadata"],
-                        "id": doc["id"]
-                    }
-                    for doc in docs_result.data
-                ]
-            else:
-                documents = []
+                # Get the document IDs
+                doc_ids = [item["document_id"] for item in result.data]
+                
+                # Fetch the actual chunks
+                rows = []
+                if doc_ids:
+                    rows = self.supabase.table("documents") \
+                        .select("*") \
+                        .in_("id", doc_ids) \
+                        .execute().data
+                    
+            documents = self._hydrate(rows)
                 
         except Exception as e:
             print(f"Supabase query error: {e}")
             documents = []
 
-        if redis_client and documents:
+        if cache_key and documents:
             try:
                 # Cache the result
-                redis_client.setex(cache_key, 3600, documents)
+                redis_client.setex(cache_key, SEARCH_CACHE_TTL, _search_codec.encode(documents))
             except Exception as e:
                 print(f"Redis cache error: {e}")
 
         return documents
 
     def delete_document(self, doc_id: str):
-        """Delete a document and its vectors."""
+        """
+        Delete a single chunk and its vectors.
+
+        Use delete_document_groups() to delete whole documents.
+        """
         self.supabase.table("document_vectors")\
             .delete()\
             .eq("document_id", doc_id)\
@@ -146,4 +632,6 @@ class SupabaseVectorStore:
         self.supabase.table("documents")\
             .delete()\
             .eq("id", doc_id)\
-            .execute() 
\ No newline at end of file
+            .execute()
+        # The chunk's bot is not known here
+        self._bump_search_generation(None, all_bots=True) 
\ No newline at end of file
@@ -6,6 +6,7 @@ import Tooltip from '../components/common/Tooltip';
 import LoadingSpinner from '../components/common/LoadingSpinner';
 import { useTheme } from '../context/ThemeContext';
 import { storage } from '../services/supabase';
+import { rag } from '../services/api';
 
 // Add these type declarations for speech recognition
 declare global {
@@ -59,6 +60,10 @@ const Chat: React.FC = () => {
   const [loading, setLoading] = useState(false);
   const [bot, setBot] = useState<Bot | null>(null);
   const [tooltip, setTooltip] = useState<string | null>(null);
+  const [coachTooltip, setCoachTooltip] = useState<string | null>(null);
+  // Server coaching by prompt, including the continuations it predicted,
+  // so typing through a predicted word needs no request
+  const coachCache = useRef<Map<string, string | null>>(new Map());
   const [ghostMode, setGhostMode] = useState(false);
   const [uploadedFiles, setUploadedFiles] = useState<File[]>([]);
   const [isVoiceInput, setIsVoiceInput] = useState(false);
@@ -155,6 +160,34 @@ const Chat: React.FC = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages]);
 
+  // Server prompt coaching, debounced and resolved from the look-ahead
+  // cache where possible
+  useEffect(() => {
+    if (!input.trim()) {
+      setCoachTooltip(null);
+      return;
+    }
+    const cache = coachCache.current;
+    if (cache.has(input)) {
+      setCoachTooltip(cache.get(input) ?? null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const result = await rag.getPromptCoachAhead(input);
+      if (cache.size > 500) cache.clear();
+      cache.set(input, result.tooltip ?? null);
+      for (const next of result.ahead ?? []) {
+        cache.set(input + next.text, next.tooltip ?? null);
+      }
+      if (!cancelled) setCoachTooltip(result.tooltip ?? null);
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [input]);
+
   // Enhanced prompt coaching with NLP-like suggestions
   useEffect(() => {
     if (input.length > 0) {
@@ -166,12 +199,12 @@ const Chat: React.FC = () => {
       } else if (input.length > 50 && !input.includes('draft') && !input.includes('summarize') && !input.includes('analyze')) {
         setTooltip('Try structuring your prompt with an action verb like "draft," "summarize," or "analyze"');
       } else {
-        setTooltip(null);
+        setTooltip(coachTooltip);
       }
     } else {
       setTooltip(null);
     }
-  }, [input, bot, uploadedFiles]);
+  }, [input, bot, uploadedFiles, coachTooltip]);
 
   const handleSendMessage = async () => {
     if (input.trim() === '') return;
@@ -74,6 +74,18 @@ export const rag = {
       console.error('Error getting prompt coach:', error);
       return { tooltip: null };
     }
+  },
+  
+  // Tooltip for the prompt plus tooltips for likely next keystrokes
+  // ({ text, tooltip } continuations), so typing needs fewer requests
+  getPromptCoachAhead: async (prompt: string, limit = 8) => {
+    try {
+      const response = await api.post('/prompt-coach/ahead', { prompt, limit });
+      return response.data;
+    } catch (error) {
+      console.error('Error getting prompt coach:', error);
+      return { tooltip: null, ahead: [] };
+    }
   }
 };
 
@@ -0,0 +1,65 @@
+"""
+Benchmark the legal-structure-aware chunker against LangChain's TokenTextSplitter.
+"""
+import argparse
+import time
+
+from langchain.text_splitter import TokenTextSplitter
+
+from src.config.settings import CHUNK_SIZE, CHUNK_OVERLAP
+from src.core.chunker import LegalChunker
+
+SECTION_TEMPLATE = """
+§ 153.{num:03d}. CONSERVATORSHIP PROVISION {num}.
+(a) The court shall consider the best interest of the child in determining the issues of conservatorship and possession of and access to the child, including the child's physical and emotional needs now and in the future.
+(b) In this section:
+(1) "Parent" means a person who is the parent of the child under the laws of this state.
+(2) "Conservator" means a person appointed as a managing or possessory conservator of the child.
+(c) The court may not appoint joint managing conservators if credible evidence is presented of a history or pattern of past or present child neglect, or physical or sexual abuse by one parent directed against the other parent, a spouse, or a child.
+"""
+
+
+def build_corpus(sections: int) -> str:
+    """Build a synthetic statute with the given number of sections."""
+    return "Texas Family Code - Synthetic Excerpt\n" + "".join(
+        SECTION_TEMPLATE.format(num=i) for i in range(sections)
+    )
+
+
+def time_call(func, text: str, repeat: int) -> float:
+    """Return the best wall-clock time in seconds over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes, repeat: int):
+    """Run the benchmark for each corpus size and print the results."""
+    legal = LegalChunker(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    token = TokenTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+    print(f"{'sections':>10} {'chars':>10} {'splitter':>12} {'legal':>12} "
+          f"{'speedup':>8} {'chunks':>14}")
+    for sections in sizes:
+        text = build_corpus(sections)
+        token_time = time_call(token.split_text, text, repeat)
+        legal_time = time_call(legal.split, text, repeat)
+        token_chunks = len(token.split_text(text))
+        legal_chunks = len(legal.split(text))
+        print(f"{sections:>10} {len(text):>10} {token_time * 1000:>10.1f}ms "
+              f"{legal_time * 1000:>10.1f}ms {token_time / legal_time:>7.2f}x "
+              f"{token_chunks:>6} -> {legal_chunks:<6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+        help="Number of statute sections in each synthetic corpus"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.repeat)
@@ -0,0 +1,108 @@
+"""
+Measure cold-start import time of the app entry points.
+
+    python -m src.scripts.benchmark_imports [--runs 3] [--top 10] [--budget 1.0]
+
+Each entry point is imported in a fresh interpreter under
+``python -X importtime``; the best wall time of several runs is reported
+with the slowest imports by cumulative time. Exits non-zero when an entry
+point imports slower than the budget, so heavy imports that creep back
+into module level show up. A failed import (e.g. a missing dependency)
+also fails the run, since its time says nothing about the real start-up.
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# (name, module, working directory) for each way the app is started
+ENTRY_POINTS = [
+    ("streamlit", "src.app", ROOT),
+    ("src-backend", "app", ROOT / "src" / "backend"),
+    ("backend", "app.main", ROOT / "backend")
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Args:
+        stderr: The interpreter's stderr
+
+    Returns:
+        (module, cumulative microseconds) pairs
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|", 2)
+            imports.append((name.strip(), int(cumulative)))
+        except ValueError:
+            continue
+    return imports
+
+
+def measure(module: str, cwd: Path) -> Dict:
+    """
+    Import a module once in a fresh interpreter.
+
+    Returns:
+        Dict with seconds, imports and error (the last line of the
+        traceback when the import failed)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    seconds = time.perf_counter() - start
+
+    error: Optional[str] = None
+    if result.returncode != 0:
+        lines = [l for l in result.stderr.splitlines() if not l.startswith("import time:")]
+        error = lines[-1] if lines else f"exit code {result.returncode}"
+    return {"seconds": seconds, "imports": parse_importtime(result.stderr), "error": error}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Imports per entry point; the best is kept")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds allowed per entry point")
+    parser.add_argument("entry_points", nargs="*", help="Entry point names; defaults to all")
+    args = parser.parse_args()
+
+    failed = False
+    for name, module, cwd in ENTRY_POINTS:
+        if args.entry_points and name not in args.entry_points:
+            continue
+
+        best = min((measure(module, cwd) for _ in range(args.runs)), key=lambda r: r["seconds"])
+        if best["error"]:
+            status = "IMPORT FAILED"
+        elif best["seconds"] > args.budget:
+            status = "OVER BUDGET"
+        else:
+            status = "ok"
+        print(f"{name} (import {module}): {best['seconds']:.3f}s [{status}]")
+        if best["error"]:
+            print(f"  {best['error']}")
+        for imported, micros in sorted(best["imports"], key=lambda i: -i[1])[:args.top]:
+            print(f"  {micros / 1e6:8.3f}s  {imported}")
+
+        failed = failed or status != "ok"
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
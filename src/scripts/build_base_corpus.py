@@ -0,0 +1,172 @@
+"""
+Build the base-layer corpus artifact from a directory of documents.
+
+    python -m src.scripts.build_base_corpus [DIR ...] [--out PATH] [--force]
+
+Documents (defaults to BASE_CORPUS_SOURCE_DIR) are extracted, chunked
+and embedded once into a versioned, memory-mappable artifact under
+BASE_CORPUS_PATH (see src/core/base_corpus.py), which servers open at
+startup and search locally. The version is derived from the source files
+and the chunking and embedding settings, so re-running with nothing
+changed does not embed anything. Embeddings go through the embedding file
+cache under their own namespace, which `embedding_cache gc` leaves alone,
+so a rebuild after a small change only embeds new chunks.
+
+Needs OPENAI_API_KEY but no database; copy the artifact directory to each
+deployment (or build it into the image).
+"""
+import argparse
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain_openai import OpenAIEmbeddings
+
+from src.config.settings import (
+    BASE_CORPUS_PATH,
+    BASE_CORPUS_SOURCE_DIR,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    EMBEDDING_MODEL,
+    EMBEDDING_MODEL_DIMENSION,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_POLICY,
+    FULL_VECTOR_RESCORE,
+    VECTOR_DIMENSION
+)
+from src.core.base_corpus import corpus_version, current_version, write_base_corpus
+from src.core.chunker import LegalChunker
+from src.core.dimensions import embedding_namespace, validate_dimension
+from src.core.embedding_file_cache import get_managed_file_store
+from src.core.extraction import SUPPORTED_EXTENSIONS, extract_document
+from src.scripts.bulk_load import discover, file_digest
+
+# Documents embedded per request
+EMBED_BATCH = 256
+
+# Kept apart from the pipeline's "embeddings_cache" namespace, whose gc
+# drops every text that is not a stored chunk
+BASE_EMBEDDING_NAMESPACE = "base_embeddings_cache"
+
+
+def build(
+    directories: List[Path],
+    out: str = BASE_CORPUS_PATH,
+    doc_type: str = "base_law",
+    force: bool = False
+) -> str:
+    """
+    Build the artifact unless the current version is already up to date.
+
+    Args:
+        directories: Directories of base-layer documents
+        out: Artifact root directory
+        doc_type: Metadata "type" of the documents
+        force: Rebuild even if the version exists
+
+    Returns:
+        The current version
+
+    Raises:
+        ValueError: If no text could be extracted from the documents
+    """
+    # The artifact is searched with the same query embeddings as the
+    # pipeline's local vector index
+    validate_dimension(VECTOR_DIMENSION, EMBEDDING_MODEL_DIMENSION)
+    dimension = EMBEDDING_MODEL_DIMENSION if FULL_VECTOR_RESCORE else VECTOR_DIMENSION
+
+    files = discover(directories, [e.lower() for e in SUPPORTED_EXTENSIONS])
+    digests = {path: file_digest(path) for path in files}
+    settings = {
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "embedding_model": EMBEDDING_MODEL,
+        "dimension": dimension,
+        "doc_type": doc_type
+    }
+    version = corpus_version(list(digests.values()), settings)
+    if not force and current_version(out) == version \
+            and os.path.exists(os.path.join(out, version, "manifest.json")):
+        print(f"Base corpus {version} is up to date ({len(files)} files)")
+        return version
+
+    chunker = LegalChunker(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    documents = []
+    chunks = []
+    for path in files:
+        extracted = extract_document(str(path))
+        if not extracted["text"].strip():
+            print(f"Skipping {path}: no text extracted")
+            continue
+        metadata = {
+            "title": path.stem,
+            "type": doc_type,
+            "filename": path.name,
+            "sha256": digests[path],
+            "layer": "base"
+        }
+        document = len(documents)
+        documents.append({"metadata": metadata})
+        for ordinal, chunk in enumerate(chunker.split(extracted["text"], pages=extracted["pages"])):
+            chunks.append({**chunk, "document": document, "ordinal": ordinal})
+        print(f"Chunked {path.name}")
+    if not chunks:
+        raise ValueError(f"No text extracted from {len(files)} files under {directories}")
+
+    embedding_options = {}
+    if dimension != EMBEDDING_MODEL_DIMENSION:
+        embedding_options["dimensions"] = dimension
+    embeddings = CacheBackedEmbeddings.from_bytes_store(
+        underlying_embeddings=OpenAIEmbeddings(
+            openai_api_key=OPENAI_API_KEY or os.environ.get("OPENAI_API_KEY", ""),
+            openai_api_base=OPENAI_BASE_URL,
+            model=EMBEDDING_MODEL,
+            **embedding_options
+        ),
+        document_embedding_cache=get_managed_file_store(
+            EMBEDDING_CACHE_DIR,
+            max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+            policy=EMBEDDING_CACHE_POLICY
+        ),
+        namespace=embedding_namespace(BASE_EMBEDDING_NAMESPACE, dimension, EMBEDDING_MODEL_DIMENSION)
+    )
+    vectors = np.empty((len(chunks), dimension), dtype=np.float32)
+    for start in range(0, len(chunks), EMBED_BATCH):
+        batch = chunks[start:start + EMBED_BATCH]
+        vectors[start:start + len(batch)] = embeddings.embed_documents(
+            [chunk["content"] for chunk in batch]
+        )
+        print(f"Embedded {start + len(batch)}/{len(chunks)} chunks")
+
+    directory = write_base_corpus(
+        out, version, documents, chunks, vectors,
+        info={"embedding_model": EMBEDDING_MODEL, "settings": settings},
+        dimension=dimension
+    )
+    print(f"Wrote base corpus {version}: {len(documents)} documents, {len(chunks)} chunks in {directory}")
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("directories", nargs="*", type=Path, help="Defaults to BASE_CORPUS_SOURCE_DIR")
+    parser.add_argument("--out", default=BASE_CORPUS_PATH, help="Artifact root directory")
+    parser.add_argument("--type", default="base_law", help="Document type metadata")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    args = parser.parse_args()
+
+    build(
+        args.directories or [BASE_CORPUS_SOURCE_DIR],
+        out=args.out,
+        doc_type=args.type,
+        force=args.force
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Bulk-load a directory of documents into Lexpert Case AI.
+
+    python -m src.scripts.bulk_load DIR [DIR ...] [--bot-id BOT] [--workers N]
+
+Files of every type handled by the extraction layer are found recursively
+and ingested by a bounded pool of workers sharing one pipeline. Progress is
+kept in a manifest (JSON lines, one entry per file with its hash, status and
+document ID), so an interrupted run picks up where it stopped and files that
+have not changed since they were loaded are skipped. A file that changed
+replaces its previous version in one transaction and keeps its document
+ID.
+
+The local lexical, citation and vector indexes are written every
+--checkpoint-every documents and when the run ends (including Ctrl-C and
+SIGTERM) rather than after each document. If the process is killed
+outright, documents loaded since the last checkpoint are in the database
+but missing from the local indexes until they are rebuilt.
+"""
+import argparse
+import hashlib
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import (
+    BULK_LOAD_CHECKPOINT_EVERY,
+    BULK_LOAD_MANIFEST,
+    BULK_LOAD_WORKERS
+)
+from src.core.extraction import SUPPORTED_EXTENSIONS, extract_document
+
+if TYPE_CHECKING:
+    # Imported when a pipeline is built, so file discovery and hashing
+    # (also used by build_base_corpus) don't pull in the RAG stack
+    from src.core.rag_pipeline import RAGPipeline
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discover(directories: Iterable[Path], extensions: List[str]) -> List[Path]:
+    """Files under the directories with a supported extension, sorted."""
+    files = set()
+    for directory in directories:
+        for path in directory.rglob("*"):
+            if path.is_file() and path.suffix.lower() in extensions:
+                files.add(path.resolve())
+    return sorted(files)
+
+
+class Manifest:
+    """
+    Per-file load state, persisted as append-only JSON lines.
+
+    Entries are kept per bot and path, so loading the same files into
+    another bot (case) does not treat them as already loaded. The last
+    line for a bot and path wins. The file is compacted to one line each
+    when it is opened, and a torn last line from a crash is ignored.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[Tuple[Optional[str], str], Dict] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[(entry.get("bot_id"), entry["path"])] = entry
+        self._compact()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _compact(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def get(self, path: Path, bot_id: Optional[str] = None) -> Optional[Dict]:
+        return self.entries.get((bot_id, str(path)))
+
+    def record(self, entry: Dict):
+        """Store an entry and append it to the manifest file."""
+        entry["timestamp"] = time.time()
+        with self._lock:
+            self.entries[(entry.get("bot_id"), entry["path"])] = entry
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Progress:
+    """Thread-safe counters with throughput and ETA reporting."""
+
+    def __init__(self, total: int, total_bytes: int, interval: float):
+        self.total = total
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.time()
+        self._reported = self.started
+        self._lock = threading.Lock()
+
+    def update(self, size: int, ok: bool):
+        with self._lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+            self.bytes += size
+            now = time.time()
+            if now - self._reported >= self.interval:
+                self._reported = now
+                print(self.line())
+
+    def line(self) -> str:
+        elapsed = max(time.time() - self.started, 1e-9)
+        finished = self.done + self.failed
+        rate = finished / elapsed
+        if finished and self.bytes:
+            eta = (self.total_bytes - self.bytes) / (self.bytes / elapsed)
+        else:
+            eta = (self.total - finished) / rate if rate else float("inf")
+        return (
+            f"[{finished}/{self.total}] {rate:.2f} docs/s, "
+            f"{self.bytes / elapsed / 1e6:.2f} MB/s, "
+            f"{self.failed} failed, ETA {eta:.0f}s"
+        )
+
+
+def plan(
+    files: List[Path],
+    manifest: Manifest,
+    retry_failed: bool,
+    bot_id: Optional[str] = None
+) -> List[Dict]:
+    """
+    Decide which files to load into a bot.
+
+    A file is skipped when its manifest entry for the bot is done and either its size
+    and mtime are unchanged or its content hash is. Failed files are only
+    retried with retry_failed.
+
+    Returns:
+        One work item (path, size, mtime_ns, sha256, previous entry) per
+        file to load
+    """
+    work = []
+    for path in files:
+        stat = path.stat()
+        entry = manifest.get(path, bot_id)
+        if entry and entry["status"] == "done" \
+                and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            continue
+        digest = file_digest(path)
+        if entry and entry["sha256"] == digest:
+            if entry["status"] == "done":
+                # Touched but not changed; remember the new mtime
+                manifest.record({**entry, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+                continue
+            if entry["status"] == "failed" and not retry_failed:
+                continue
+        work.append({
+            "path": path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "previous": entry
+        })
+    return work
+
+
+def load_file(
+    pipeline: "RAGPipeline",
+    item: Dict,
+    doc_type: str,
+    bot_id: Optional[str]
+) -> str:
+    """
+    Extract one file and ingest it without saving the local indexes.
+
+    A changed file that was loaded before for the same bot replaces its
+    previous version in place, keeping the document ID.
+    """
+    path = item["path"]
+    extracted = extract_document(str(path))
+    if not extracted["text"].strip():
+        raise ValueError("no text extracted")
+    metadata = {
+        "title": path.stem,
+        "type": doc_type,
+        "filename": path.name,
+        "sha256": item["sha256"]
+    }
+    if extracted["failed_pages"]:
+        metadata["failed_pages"] = extracted["failed_pages"]
+    previous = item["previous"] or {}
+    if previous.get("doc_id") and previous.get("bot_id") == bot_id:
+        return pipeline.replace_document_group(
+            previous["doc_id"],
+            content=extracted["text"],
+            metadata=metadata,
+            pages=extracted["pages"],
+            bot_id=bot_id,
+            save_indexes=False
+        )
+    return pipeline.process_document(
+        content=extracted["text"],
+        metadata=metadata,
+        pages=extracted["pages"],
+        bot_id=bot_id,
+        save_indexes=False
+    )
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt()
+
+
+def bulk_load(
+    directories: List[Path],
+    bot_id: Optional[str] = None,
+    doc_type: str = "document",
+    workers: int = BULK_LOAD_WORKERS,
+    manifest_path: Path = Path(BULK_LOAD_MANIFEST),
+    checkpoint_every: int = BULK_LOAD_CHECKPOINT_EVERY,
+    retry_failed: bool = False,
+    extensions: Optional[List[str]] = None,
+    report_interval: float = 5.0,
+    dry_run: bool = False,
+    pipeline: Optional["RAGPipeline"] = None
+) -> Dict:
+    """
+    Load every supported file under the directories.
+
+    Args:
+        directories: Directories searched recursively
+        bot_id: Optional bot (case) the documents belong to
+        doc_type: Metadata "type" of the documents
+        workers: Files extracted and ingested concurrently
+        manifest_path: Checkpoint manifest
+        checkpoint_every: Documents between index saves
+        retry_failed: Retry files whose last attempt failed
+        extensions: File types to load; defaults to SUPPORTED_EXTENSIONS
+        report_interval: Seconds between progress lines
+        dry_run: Only report what would be loaded
+        pipeline: Pipeline to use; one is created if not given
+
+    Returns:
+        Dict with counts of found, skipped, loaded, replaced (changed
+        since their last load) and failed files
+    """
+    extensions = [e.lower() for e in (extensions or SUPPORTED_EXTENSIONS)]
+    files = discover(directories, extensions)
+    manifest = Manifest(manifest_path)
+    try:
+        work = plan(files, manifest, retry_failed, bot_id)
+        summary = {"found": len(files), "skipped": len(files) - len(work), "loaded": 0, "replaced": 0, "failed": 0}
+        print(f"Found {len(files)} files, {len(work)} to load, {summary['skipped']} unchanged")
+        if dry_run or not work:
+            for item in work:
+                print(f"  {item['path']}")
+            return summary
+
+        if pipeline is None:
+            from src.core.rag_pipeline import RAGPipeline
+            pipeline = RAGPipeline()
+        progress = Progress(len(work), sum(item["size"] for item in work), report_interval)
+        since_checkpoint = 0
+        previous_handler = signal.signal(signal.SIGTERM, _raise_interrupt) \
+            if threading.current_thread() is threading.main_thread() else None
+
+        def finish(item: Dict, future):
+            nonlocal since_checkpoint
+            entry = {
+                "path": str(item["path"]),
+                "size": item["size"],
+                "mtime_ns": item["mtime_ns"],
+                "sha256": item["sha256"],
+                "bot_id": bot_id
+            }
+            previous = item["previous"] or {}
+            error = future.exception()
+            if error is None:
+                entry.update(status="done", doc_id=future.result())
+                summary["loaded"] += 1
+                if previous.get("doc_id") and previous.get("bot_id") == bot_id:
+                    summary["replaced"] += 1
+                since_checkpoint += 1
+            else:
+                entry.update(status="failed", error=str(error) or type(error).__name__)
+                # A failed replace leaves the previous version in place
+                if previous.get("doc_id"):
+                    entry["doc_id"] = previous["doc_id"]
+                summary["failed"] += 1
+                print(f"Failed to load {item['path']}: {error}")
+            manifest.record(entry)
+            progress.update(item["size"], error is None)
+            if since_checkpoint >= checkpoint_every:
+                pipeline.save_indexes(bot_id)
+                since_checkpoint = 0
+
+        # Keep at most 2 * workers files in flight, so memory stays bounded
+        # however many files there are
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-load")
+        pending = {}
+        try:
+            for item in work:
+                pending[pool.submit(load_file, pipeline, item, doc_type, bot_id)] = item
+                if len(pending) >= 2 * workers:
+                    completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        finish(pending.pop(future), future)
+            while pending:
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    finish(pending.pop(future), future)
+        except KeyboardInterrupt:
+            print("Interrupted; finishing documents in progress. Re-run to resume.")
+            # Files already being ingested are completed and recorded, so
+            # a resumed run does not load them twice
+            for future in [f for f in pending if f.cancel()]:
+                pending.pop(future)
+            wait(pending)
+            for future, item in pending.items():
+                finish(item, future)
+        finally:
+            pool.shutdown(wait=True)
+            pipeline.save_indexes(bot_id)
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            print(progress.line())
+    finally:
+        manifest.close()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("directories", nargs="+", type=Path, help="Directories to load")
+    parser.add_argument("--bot-id", help="Bot (case) the documents belong to")
+    parser.add_argument("--type", default="document", help="Document type metadata")
+    parser.add_argument("--workers", type=int, default=BULK_LOAD_WORKERS)
+    parser.add_argument("--manifest", type=Path, default=Path(BULK_LOAD_MANIFEST))
+    parser.add_argument("--checkpoint-every", type=int, default=BULK_LOAD_CHECKPOINT_EVERY)
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files that failed before")
+    parser.add_argument("--extensions", nargs="+", help="File types to load, e.g. .pdf .txt")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--dry-run", action="store_true", help="List files to load and exit")
+    args = parser.parse_args()
+
+    summary = bulk_load(
+        args.directories,
+        bot_id=args.bot_id,
+        doc_type=args.type,
+        workers=args.workers,
+        manifest_path=args.manifest,
+        checkpoint_every=args.checkpoint_every,
+        retry_failed=args.retry_failed,
+        extensions=args.extensions,
+        report_interval=args.report_interval,
+        dry_run=args.dry_run
+    )
+    print(
+        f"Loaded {summary['loaded']}, skipped {summary['skipped']}, "
+        f"failed {summary['failed']} of {summary['found']} files"
+    )
+
+
+if __name__ == "__main__":
+    main()
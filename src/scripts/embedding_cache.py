@@ -0,0 +1,62 @@
+"""
+Inspect and clean up the embedding file cache (EMBEDDING_CACHE_DIR).
+
+    python -m src.scripts.embedding_cache stats
+    python -m src.scripts.embedding_cache gc
+    python -m src.scripts.embedding_cache trim [--max-bytes N]
+
+gc drops entries of the current embedding namespace whose chunk text is no
+longer in the vector store (base corpus embeddings have their own
+namespace and are kept); trim evicts entries down to the size limit.
+"""
+import argparse
+import json
+import re
+
+from src.config.settings import (
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_POLICY
+)
+from src.core.embedding_file_cache import get_managed_file_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("command", choices=["stats", "gc", "trim"])
+    parser.add_argument("--max-bytes", type=int, help="Limit for trim; defaults to EMBEDDING_CACHE_MAX_BYTES")
+    args = parser.parse_args()
+
+    store = get_managed_file_store(
+        EMBEDDING_CACHE_DIR,
+        max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+        policy=EMBEDDING_CACHE_POLICY
+    )
+
+    if args.command == "gc":
+        # Imported here so stats and trim work without OpenAI/Supabase settings
+        from src.core.rag_pipeline import RAGPipeline
+
+        pipeline = RAGPipeline()
+        live = {
+            pipeline.embedding_cache_key(text)
+            for text in pipeline.vector_store.iter_chunk_texts()
+        }
+        namespace = pipeline.embedding_cache_namespace
+        # The full-size namespace is a prefix of the shortened ones
+        # (embedding_namespace); keep their entries
+        shortened = {
+            key for key in store.yield_keys(namespace)
+            if re.match(rf"{re.escape(namespace)}_d\d+", key)
+        }
+        removed = store.gc(live | shortened, prefix=namespace)
+        print(f"Removed {removed} entries for chunks no longer stored ({len(live)} live)")
+    elif args.command == "trim":
+        evicted = store.evict(args.max_bytes)
+        print(f"Evicted {evicted} entries ({store.policy})")
+
+    print(json.dumps(store.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
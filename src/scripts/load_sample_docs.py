@@ -3,7 +3,7 @@ Load sample documents into the Supabase database for Lexpert Case AI.
 """
 import os
 from pathlib import Path
-from src.core.rag_pipeline import RAGPipeline
+from src.scripts.bulk_load import bulk_load
 from src.config.settings import SAMPLE_DOCS_DIR
 
 def load_sample_documents():
@@ -37,27 +37,8 @@ The court shall consider the qualifications of the parties without regard to the
             """)
         print(f"Created sample document at {sample_doc_path}")
     
-    # Initialize RAG pipeline
-    pipeline = RAGPipeline()
-    
-    # Process each document in the sample docs directory
-    for doc_path in SAMPLE_DOCS_DIR.glob("*.txt"):
-        print(f"Processing {doc_path.name}...")
-        
-        with open(doc_path, "r") as f:
-            content = f.read()
-        
-        # Process document
-        doc_id = pipeline.process_document(
-            content=content,
-            metadata={
-                "title": doc_path.stem,
-                "type": "example",
-                "filename": doc_path.name
-            }
-        )
-        
-        print(f"Document processed with ID: {doc_id}")
+    # Load new and changed documents; unchanged ones are skipped
+    bulk_load([SAMPLE_DOCS_DIR], doc_type="example")
     
     print("Sample documents loaded successfully.")
 
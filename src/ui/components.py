@@ -1,6 +1,7 @@
 import streamlit as st
 from typing import Callable, Dict, List, Optional
 import time
+import uuid
 
 from src.config.settings import UI_THEME
 from src.core.prompt_coach import PromptCoach
@@ -80,21 +81,24 @@ def setup_theme():
     """, unsafe_allow_html=True)
 
 def chat_interface(
-    on_submit: Callable[[str], Dict],
+    on_submit: Callable[[str, str], Dict],
     prompt_coach: PromptCoach
 ):
     """
     Render the chat interface with prompt coaching.
     
     Args:
-        on_submit: Callback for handling message submission
+        on_submit: Callback for handling message submission, called with
+            the prompt and the session's conversation ID
         prompt_coach: PromptCoach instance for suggestions
     """
     st.title("Lexpert Case AI")
     
-    # Initialize chat history
+    # Initialize chat history; the server keeps the bounded memory
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "conversation_id" not in st.session_state:
+        st.session_state.conversation_id = uuid.uuid4().hex
     
     # Display chat history
     for message in st.session_state.messages:
@@ -125,7 +129,7 @@ def chat_interface(
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 start_time = time.time()
-                response = on_submit(prompt)
+                response = on_submit(prompt, st.session_state.conversation_id)
                 end_time = time.time()
                 
                 # Add custom styling to ensure text is visible
@@ -150,6 +154,13 @@ def chat_interface(
                     f'Response time: {response_time:.2f}s</div>',
                     unsafe_allow_html=True
                 )
+
+                if response.get("timings"):
+                    with st.expander("Stage timings"):
+                        st.table({
+                            "stage": list(response["timings"]),
+                            "ms": [f"{ms:.1f}" for ms in response["timings"].values()]
+                        })
         
         # Add assistant message
         st.session_state.messages.append({
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src.core.base_corpus import BaseCorpus, corpus_version, current_version, write_base_corpus
+
+DOCUMENTS = [
+    {"metadata": {"title": "Family Code", "type": "base_law"}},
+    {"metadata": {"title": "Opinions", "type": "base_law"}},
+]
+CHUNKS = [
+    {"document": 0, "ordinal": 0, "content": "§153.002 Best interest of the child.",
+     "start": 0, "end": 36, "page_start": 1, "page_end": 1},
+    {"document": 0, "ordinal": 1, "content": "Under §153.002 the court considers",
+     "start": 36, "end": 70},
+    {"document": 1, "ordinal": 0, "content": "Brown v. Board of Education, 347 U.S. 483 (1954) — «separate»",
+     "start": 0, "end": 62, "page_start": 3, "page_end": 4},
+]
+VECTORS = np.array([[1, 0, 0, 0], [0.6, 0.8, 0, 0], [0, 0, 3, 4]], dtype=np.float32)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    version = corpus_version(["b", "a"], {"dimension": 4})
+    write_base_corpus(str(tmp_path), version, DOCUMENTS, CHUNKS, VECTORS, info={"embedding_model": "test"})
+    return BaseCorpus(str(tmp_path))
+
+
+def test_version_ignores_source_order():
+    assert corpus_version(["a", "b"], {"x": 1}) == corpus_version(["b", "a"], {"x": 1})
+    assert corpus_version(["a", "b"], {"x": 1}) != corpus_version(["a", "b"], {"x": 2})
+
+
+def test_round_trip(corpus, tmp_path):
+    assert current_version(str(tmp_path)) == corpus.version
+    assert (len(corpus), corpus.dimension, corpus.embedding_model) == (3, 4, "test")
+
+    first, second, third = corpus.get([0, 1, 2])
+    assert first["content"] == CHUNKS[0]["content"]
+    assert first["metadata"] == {
+        "title": "Family Code", "type": "base_law", "chunk_index": 0,
+        "start": 0, "end": 36, "page": 1, "page_end": 1
+    }
+    assert "page" not in second["metadata"]
+    assert third["content"] == CHUNKS[2]["content"]
+    assert third["id"] == corpus.chunk_id(2) and corpus.owns(third["id"])
+    assert third["parent_id"] == f"base:{corpus.version}:doc1"
+
+
+def test_search_is_exact_and_shortens_queries(corpus):
+    results = corpus.search([1, 0.1, 0, 0, 5], k=2)
+
+    assert [row for row, _ in results] == [0, 1]
+    assert results[0][1] == pytest.approx(0.995, abs=1e-3)
+    with pytest.raises(ValueError):
+        corpus.search([1, 0], k=2)
+
+
+def test_citation_lookup(corpus):
+    assert corpus.lookup_citations("What does §153.002 say?") == [0, 1]
+    assert corpus.lookup_citations("Summarize 347 U. S. 483") == [2]
+    assert corpus.lookup_citations("Brown v. Board of Education") == [2]
+    assert corpus.lookup_citations("nothing cited") == []
+
+
+def test_empty_corpus(tmp_path):
+    write_base_corpus(str(tmp_path), "empty", [], [], np.empty((0,)), info={}, dimension=4)
+    corpus = BaseCorpus(str(tmp_path))
+
+    assert (len(corpus), corpus.dimension) == (0, 4)
+    assert corpus.search([1, 0, 0, 0]) == []
+    assert corpus.lookup_citations("§153.002") == []
+
+
+def test_rebuild_switches_current_version(corpus, tmp_path):
+    write_base_corpus(str(tmp_path), "next", DOCUMENTS[:1], CHUNKS[:1], VECTORS[:1], info={})
+
+    assert current_version(str(tmp_path)) == "next"
+    assert len(BaseCorpus(str(tmp_path))) == 1
+    # The previous version stays readable until it is deleted
+    assert len(BaseCorpus(str(tmp_path), version=corpus.version)) == 3
@@ -0,0 +1,99 @@
+import threading
+from typing import Dict, List
+
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from src.scripts.bulk_load import bulk_load
+
+
+class RecordingPipeline:
+    """Stands in for RAGPipeline, recording what would be ingested."""
+
+    def __init__(self):
+        self.documents: Dict[str, Dict] = {}
+        self.replaced: List[str] = []
+        self.saves = 0
+        self._lock = threading.Lock()
+
+    def process_document(self, content, metadata, pages, bot_id, save_indexes):
+        with self._lock:
+            doc_id = f"doc-{len(self.documents)}"
+            self.documents[doc_id] = {"content": content, "metadata": metadata, "pages": pages}
+        return doc_id
+
+    def replace_document_group(self, group_id, content, metadata, pages, bot_id, save_indexes):
+        with self._lock:
+            self.documents[group_id] = {"content": content, "metadata": metadata, "pages": pages}
+            self.replaced.append(group_id)
+        return group_id
+
+    def save_indexes(self, bot_id=None):
+        self.saves += 1
+
+
+def _load(directory, tmp_path, pipeline, bot_id="case-1"):
+    return bulk_load(
+        [directory],
+        bot_id=bot_id,
+        workers=2,
+        manifest_path=tmp_path / "manifest.jsonl",
+        report_interval=3600,
+        pipeline=pipeline
+    )
+
+
+def test_bulk_load_small_pdf(tmp_path, make_pdf):
+    # Fewer pages than one extraction shard, extracted from the loader's
+    # worker threads
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    make_pdf("docs/brief.pdf", ["Statement of facts", "Argument", "Prayer"])
+    (docs / "notes.txt").write_text("Deposition notes", encoding="utf-8")
+
+    pipeline = RecordingPipeline()
+    summary = _load(docs, tmp_path, pipeline)
+
+    assert summary == {"found": 2, "skipped": 0, "loaded": 2, "replaced": 0, "failed": 0}
+    brief = next(d for d in pipeline.documents.values() if d["metadata"]["filename"] == "brief.pdf")
+    assert [page["page"] for page in brief["pages"]] == [1, 2, 3]
+    assert "Argument" in brief["content"]
+    assert "failed_pages" not in brief["metadata"]
+    assert pipeline.saves >= 1
+
+
+def test_bulk_load_resumes_and_replaces_changed_files(tmp_path, make_pdf):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    pdf = make_pdf("docs/brief.pdf", ["Draft"])
+    _load(docs, tmp_path, RecordingPipeline())
+
+    pipeline = RecordingPipeline()
+    assert _load(docs, tmp_path, pipeline)["skipped"] == 1
+    assert pipeline.documents == {}
+
+    make_pdf("docs/brief.pdf", ["Final", "Exhibit"])
+    summary = _load(docs, tmp_path, pipeline)
+
+    assert summary["replaced"] == 1
+    assert pipeline.replaced == ["doc-0"]
+    assert pdf.exists()
+
+
+def test_bulk_load_tracks_each_bot_separately(tmp_path, make_pdf):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    make_pdf("docs/brief.pdf", ["Draft"])
+    _load(docs, tmp_path, RecordingPipeline())
+
+    pipeline = RecordingPipeline()
+    summary = _load(docs, tmp_path, pipeline, bot_id="case-2")
+
+    assert summary == {"found": 1, "skipped": 0, "loaded": 1, "replaced": 0, "failed": 0}
+    assert list(pipeline.documents) == ["doc-0"]
+    assert pipeline.replaced == []
+
+    # Both bots are now up to date
+    assert _load(docs, tmp_path, pipeline)["skipped"] == 1
+    assert _load(docs, tmp_path, pipeline, bot_id="case-2")["skipped"] == 1
@@ -0,0 +1,50 @@
+import json
+
+from src.core.cache_codec import CacheCodec
+
+VALUE = {"answer": "The best interest of the child. " * 50, "sources": [{"id": 1}]}
+
+
+def test_round_trip_with_header():
+    codec = CacheCodec("search", version=3, compress_threshold=-1)
+
+    payload = codec.encode(VALUE)
+
+    assert payload[:4] == bytes([0xC1, 0x00, 0x00, 0x03])
+    assert json.loads(payload[4:]) == VALUE
+    assert codec.decode(payload) == VALUE
+
+
+def test_large_values_are_compressed():
+    codec = CacheCodec("search", compress_threshold=1024)
+
+    payload = codec.encode(VALUE)
+
+    assert payload[1] & 0x01
+    assert len(payload) < len(json.dumps(VALUE)) // 4
+    assert codec.decode(payload) == VALUE
+
+
+def test_small_or_incompressible_values_are_stored_plain():
+    codec = CacheCodec("search", compress_threshold=0)
+
+    assert CacheCodec("search").encode({"a": 1})[1] == 0
+    assert codec.encode("x")[1] == 0
+
+
+def test_other_versions_and_plain_text_read_as_misses():
+    payload = CacheCodec("search", version=1).encode(VALUE)
+
+    assert CacheCodec("search", version=2).decode(payload) is None
+    assert CacheCodec("search").decode(json.dumps(VALUE).encode()) is None
+    assert CacheCodec("search").decode(None) is None
+    assert CacheCodec("search").decode(b"") is None
+
+
+def test_corrupt_payloads_read_as_misses(capsys):
+    codec = CacheCodec("search")
+    payload = codec.encode(VALUE)
+
+    assert codec.decode(payload[:-10]) is None
+    assert codec.decode(payload[:4] + b"{not json") is None
+    assert "corrupt search cache entry" in capsys.readouterr().out
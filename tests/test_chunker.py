@@ -0,0 +1,75 @@
+import pytest
+import tiktoken
+
+from src.core import chunker
+from src.core.chunker import LegalChunker
+
+
+@pytest.fixture(autouse=True)
+def byte_encoding(monkeypatch):
+    # One token per byte: deterministic, and needs no BPE download
+    encoding = tiktoken.Encoding(
+        "bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={}
+    )
+    monkeypatch.setattr(chunker.tiktoken, "get_encoding", lambda name: encoding)
+    return encoding
+
+
+def _sections(count):
+    sentence = "The court held that the statute applies."
+    return "\n\n".join(f"Section {i}. {sentence} {sentence}" for i in range(count))
+
+
+def test_chunks_end_at_section_breaks_with_offsets():
+    text = _sections(6)
+
+    chunks = LegalChunker(chunk_size=120, chunk_overlap=10).split(text)
+
+    assert [chunk["content"][:10] for chunk in chunks] == [f"Section {i}." for i in range(6)]
+    for chunk in chunks:
+        assert chunk["content"] == text[chunk["start"]:chunk["end"]]
+        assert chunk["tokens"] <= 120
+        assert chunk["page_start"] is None and chunk["page_end"] is None
+
+
+def test_chunks_carry_the_pages_they_span():
+    text = _sections(6)
+    middle = len(text) // 2
+    pages = [
+        {"page": 1, "start": 0, "end": middle},
+        {"page": 2, "start": middle, "end": len(text)},
+    ]
+
+    chunks = LegalChunker(chunk_size=120, chunk_overlap=10).split(text, pages=pages)
+
+    for chunk in chunks:
+        assert chunk["page_start"] == (1 if chunk["start"] < middle else 2)
+        assert chunk["page_end"] == (1 if chunk["end"] - 1 < middle else 2)
+    assert {chunk["page_start"] for chunk in chunks} == {1, 2}
+
+
+def test_unbroken_text_is_cut_at_the_budget_with_overlap():
+    text = "abcdefghij" * 20
+
+    chunks = LegalChunker(chunk_size=50, chunk_overlap=10).split(text)
+
+    assert [(chunk["start"], chunk["end"]) for chunk in chunks] == [
+        (0, 50), (40, 90), (80, 130), (120, 170), (160, 200)
+    ]
+
+
+def test_blank_text_has_no_chunks():
+    splitter = LegalChunker(chunk_size=50)
+
+    assert splitter.split("") == []
+    assert splitter.split("   \n ") == []
+
+
+def test_split_text_returns_contents():
+    text = _sections(3)
+    splitter = LegalChunker(chunk_size=120, chunk_overlap=10)
+
+    assert splitter.split_text(text) == [chunk["content"] for chunk in splitter.split(text)]
@@ -0,0 +1,87 @@
+import pytest
+
+from src.core.citations import CitationIndex, extract_citations
+
+
+def _keys(text):
+    return [citation["keys"] for citation in extract_citations(text)]
+
+
+@pytest.mark.parametrize("text", [
+    "Tex. Fam. Code § 153.002",
+    "Texas Family Code §153.002",
+    "Texas §153.002",
+    "TFC Sec. 153.002",
+])
+def test_texas_family_code_spellings_share_a_key(text):
+    assert extract_citations(text)[0]["citation"] == "TFC §153.002"
+
+
+def test_subsections_add_broader_keys():
+    assert _keys("Tex. Fam. Code § 153.134(a)(1)") == [[
+        "TFC §153.134(a)(1)", "TFC §153.134", "§153.134(a)(1)", "§153.134"
+    ]]
+
+
+def test_federal_and_tmep_citations():
+    citations = extract_citations("See 15 U.S.C. § 1052(d) and TMEP §1207.01.")
+
+    assert [(c["kind"], c["citation"]) for c in citations] == [
+        ("usc", "15 U.S.C. §1052(d)"),
+        ("tmep", "TMEP §1207.01"),
+    ]
+
+
+@pytest.mark.parametrize("text, keys", [
+    ("See Smith v. Jones, 2020", ["smith v. jones (2020)", "smith v. jones"]),
+    ("The Smith Co. v. The State (2019)", ["smith co. v. state (2019)", "smith co. v. state"]),
+    ("Brown v. Board of Education", ["brown v. board of education"]),
+])
+def test_case_names_are_normalized(text, keys):
+    assert _keys(text) == [keys]
+
+
+def test_lookup_prefers_the_section_over_passages_citing_it(tmp_path):
+    index = CitationIndex(str(tmp_path / "citations.json"))
+    index.add("section", "§153.134(a) The court may appoint joint managing conservators.")
+    index.add("passage", "Under Tex. Fam. Code § 153.134 the court considered the factors.")
+    index.add("other", "Nothing cited here.")
+
+    assert index.lookup("What does Texas §153.134(a) require?") == ["section", "passage"]
+    assert index.lookup("Is there a case like Smith v. Jones?") == []
+
+
+def test_lookup_matches_case_names_with_and_without_articles():
+    index = CitationIndex()
+    index.add("opinion", "In The Acme Corp. v. The State (2019), the court held")
+
+    assert index.lookup("What did Acme Corp. v. State decide?") == ["opinion"]
+
+
+def test_remove_and_persist(tmp_path):
+    path = str(tmp_path / "citations.json")
+    index = CitationIndex(path)
+    index.add_many([("a", "§1.01 text"), ("b", "see §1.01")])
+    index.remove(["a"])
+    index.save()
+
+    reloaded = CitationIndex(path)
+    assert reloaded.lookup("§1.01") == ["b"]
+    assert len(reloaded) == 1
+
+
+@pytest.mark.parametrize("text, citation", [
+    ("Brown v. Board of Education, 347 U.S. 483, 495 (1954)", "347 us 483"),
+    ("see 347 U. S. 483", "347 us 483"),
+    ("In re Smith, 123 S.W.3d 45 (Tex. 2003)", "123 sw3d 45"),
+    ("500 F. Supp. 2d 12", "500 fsupp2d 12"),
+    ("87 U.S.P.Q.2d 1001", "87 uspq2d 1001"),
+])
+def test_reporter_citations(text, citation):
+    reporters = [c["citation"] for c in extract_citations(text) if c["kind"] == "reporter"]
+
+    assert reporters == [citation]
+
+
+def test_reporter_citations_do_not_swallow_code_sections():
+    assert [c["kind"] for c in extract_citations("15 U.S.C. § 1052(d)")] == ["usc"]
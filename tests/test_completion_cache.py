@@ -0,0 +1,112 @@
+from src.core.completion_cache import CompletionCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def expire(self, key, ttl):
+        pass
+
+    def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+        return queue
+
+    def execute(self):
+        for name, args in self.calls:
+            getattr(self.redis, name)(*args)
+
+
+SOURCES = [
+    {"chunk_ids": ["c1", "c2"], "content": "Section 153.002 best interest."},
+    {"chunk_ids": ["c3"], "content": "Section 153.131 presumption."},
+]
+
+
+def _key(cache, question="What is the standard?", sources=SOURCES):
+    return cache.make_key("gpt", {"temperature": 0}, question, sources)
+
+
+def test_keys_follow_question_sources_and_content():
+    cache = CompletionCache()
+    edited = [dict(SOURCES[0], content="Amended text."), SOURCES[1]]
+
+    assert _key(cache) == _key(cache, question="  what is the STANDARD? ")
+    assert _key(cache) != _key(cache, sources=SOURCES[::-1])
+    assert _key(cache) != _key(cache, sources=edited)
+
+
+def test_put_get_and_lru_eviction():
+    cache = CompletionCache(max_size=2)
+    cache.put("k1", {"answer": "one"}, ["c1"])
+    cache.put("k2", {"answer": "two"}, ["c2"])
+    cache.get("k1")
+
+    cache.put("k3", {"answer": "three"}, ["c3"])
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") == {"answer": "one"}
+    assert "c2" not in cache._keys_by_chunk
+
+
+def test_expired_entries_miss():
+    cache = CompletionCache(ttl=-1)
+    cache.put("k1", {"answer": "one"}, ["c1"])
+
+    assert cache.get("k1") is None
+    assert cache._keys_by_chunk == {}
+
+
+def test_invalidating_a_chunk_drops_completions_built_on_it():
+    cache = CompletionCache()
+    cache.put("k1", {"answer": "one"}, ["c1", "c2"])
+    cache.put("k2", {"answer": "two"}, ["c2", "c3"])
+    cache.put("k3", {"answer": "three"}, ["c4"])
+
+    assert cache.invalidate_chunks(["c2"]) == 2
+
+    assert cache.get("k1") is None and cache.get("k2") is None
+    assert cache.get("k3") == {"answer": "three"}
+    assert set(cache._keys_by_chunk) == {"c4"}
+
+
+def test_shared_tier_round_trips_and_invalidates():
+    redis = FakeRedis()
+    CompletionCache(redis_client=redis, compress_threshold=0).put(
+        "k1", {"answer": "one " * 100, "sources": []}, ["c1"]
+    )
+    other = CompletionCache(redis_client=redis)
+
+    assert other.get("k1") == {"answer": "one " * 100, "sources": []}
+
+    other.invalidate_chunks(["c1"])
+
+    assert "k1" not in redis.data
+    assert "completion_chunk:c1" not in redis.data
+    assert other.get("k1") is None
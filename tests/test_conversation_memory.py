@@ -0,0 +1,63 @@
+import time
+
+from src.core.conversation_memory import ConversationMemory, format_turns
+
+
+def _settle(memory, bot_id="bot", user_id="user", timeout=5.0):
+    """Wait for background summarization of a conversation to finish."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with memory._lock:
+            if not memory._conversation(bot_id, user_id).summarizing:
+                return memory._conversation(bot_id, user_id)
+        time.sleep(0.01)
+    raise AssertionError("summarization did not finish")
+
+
+def _record(memory, n):
+    memory.record("bot", "user", f"question {n}", f"answer {n}")
+    return _settle(memory)
+
+
+def test_old_turns_are_folded_into_the_summary():
+    def summarize(summary, turns):
+        return " ".join(filter(None, [summary] + [question for question, _ in turns]))
+
+    memory = ConversationMemory(summarize, max_turns=2)
+    for n in range(5):
+        _record(memory, n)
+
+    context = memory.context("bot", "user")
+    assert "Summary of earlier conversation:\nquestion 0 question 1 question 2" in context
+    assert format_turns([("question 3", "answer 3"), ("question 4", "answer 4")]) in context
+
+
+def test_pending_turns_are_capped_when_summarization_fails():
+    def summarize(summary, turns):
+        raise RuntimeError("model unavailable")
+
+    # Each rendered turn is 6 "tokens" with one token per word
+    memory = ConversationMemory(
+        summarize, max_turns=2, max_pending_tokens=18,
+        count_tokens=lambda text: len(text.split())
+    )
+    for n in range(20):
+        conversation = _record(memory, n)
+
+    assert len(conversation.pending) == 3
+    assert conversation.pending[0] == ("question 15", "answer 15")
+    assert list(conversation.turns) == [("question 18", "answer 18"), ("question 19", "answer 19")]
+    assert "question 14" not in memory.context("bot", "user")
+
+
+def test_conversations_are_bounded_and_separate():
+    memory = ConversationMemory(lambda summary, turns: summary, max_conversations=2)
+    memory.record("bot", "a", "qa", "aa")
+    memory.record("bot", "b", "qb", "ab")
+    memory.record("bot", "c", "qc", "ac")
+
+    assert "qb" in memory.context("bot", "b")
+    assert "qc" in memory.context("bot", "c")
+    assert memory.context("bot", "a") == ""
+    memory.clear("bot", "c")
+    assert memory.context("bot", "c") == ""
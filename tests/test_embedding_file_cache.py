@@ -0,0 +1,63 @@
+import hashlib
+
+from src.core.dimensions import embedding_namespace, shorten
+from src.core.embedding_file_cache import ManagedFileStore
+
+
+def _key(namespace: str, text: str) -> str:
+    # CacheBackedEmbeddings keys are the namespace followed by a hash
+    return namespace + hashlib.sha1(text.encode()).hexdigest()
+
+
+def test_embedding_namespace():
+    assert embedding_namespace("embeddings_cache", 1536, 1536) == "embeddings_cache"
+    assert embedding_namespace("embeddings_cache", 256, 1536) == "embeddings_cache_d256"
+
+
+def test_shortened_namespace_round_trips_through_file_store(tmp_path):
+    store = ManagedFileStore(str(tmp_path), max_bytes=0)
+    key = _key(embedding_namespace("embeddings_cache", 256, 1536), "chunk text")
+
+    store.mset([(key, b"[0.1, 0.2]")])
+
+    assert store.mget([key]) == [b"[0.1, 0.2]"]
+    assert list(store.yield_keys("embeddings_cache_d256")) == [key]
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    store = ManagedFileStore(str(tmp_path), max_bytes=0, policy="lru")
+    for n in range(4):
+        store.mset([(f"k{n}", b"x" * 100)])
+    store.mget(["k0"])
+
+    evicted = store.evict(max_bytes=250)
+
+    assert evicted == 2
+    assert set(store.yield_keys()) == {"k0", "k3"}
+    assert store.summary()["bytes"] <= 250
+
+
+def test_gc_drops_entries_not_live(tmp_path):
+    store = ManagedFileStore(str(tmp_path), max_bytes=0)
+    live, dead = _key("ns", "kept"), _key("ns", "deleted")
+    other = _key("other", "deleted")
+    store.mset([(live, b"1"), (dead, b"2"), (other, b"3")])
+
+    assert store.gc([live], prefix="ns") == 1
+    assert store.mget([live, dead, other]) == [b"1", None, b"3"]
+
+
+def test_gc_of_pipeline_namespace_keeps_base_corpus_entries(tmp_path):
+    store = ManagedFileStore(str(tmp_path), max_bytes=0)
+    pipeline = _key(embedding_namespace("embeddings_cache", 256, 1536), "deleted chunk")
+    base = _key(embedding_namespace("base_embeddings_cache", 256, 1536), "statute text")
+    store.mset([(pipeline, b"1"), (base, b"2")])
+
+    assert store.gc([], prefix="embeddings_cache") == 1
+    assert store.mget([pipeline, base]) == [None, b"2"]
+
+
+def test_shorten_renormalizes():
+    vector = shorten([3.0, 4.0, 12.0], 2)
+
+    assert vector.tolist() == [0.6000000238418579, 0.800000011920929]
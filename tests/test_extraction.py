@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from src.core.extraction import extract_document, extract_pdf
+
+
+def _in_thread(fn, *args, **kwargs):
+    result = {}
+
+    def run():
+        try:
+            result["value"] = fn(*args, **kwargs)
+        except BaseException as e:  # re-raised on the test thread
+            result["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join(60)
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+def _page_texts(extracted):
+    return [
+        extracted["text"][page["start"]:page["end"]].strip()
+        for page in extracted["pages"]
+    ]
+
+
+def test_extract_small_pdf_on_main_thread(small_pdf):
+    extracted = extract_document(str(small_pdf))
+
+    assert _page_texts(extracted) == ["First page", "Second page", "Third page"]
+    assert [page["page"] for page in extracted["pages"]] == [1, 2, 3]
+    assert extracted["failed_pages"] == []
+
+
+def test_extract_small_pdf_from_worker_thread(small_pdf):
+    # SIGALRM handlers can only be installed on the main thread
+    extracted = _in_thread(extract_document, str(small_pdf))
+
+    assert _page_texts(extracted) == ["First page", "Second page", "Third page"]
+    assert extracted["failed_pages"] == []
+
+
+def test_extract_inline_from_worker_thread_skips_page_timeout(small_pdf):
+    extracted = _in_thread(extract_pdf, str(small_pdf), workers=1, page_timeout=5)
+
+    assert len(extracted["pages"]) == 3
+    assert extracted["failed_pages"] == []
+
+
+def test_extract_sharded_pdf_keeps_page_order(make_pdf):
+    path = make_pdf("long.pdf", [f"Page {n}" for n in range(1, 8)])
+    extracted = extract_pdf(str(path), workers=2, pages_per_shard=2)
+
+    assert _page_texts(extracted) == [f"Page {n}" for n in range(1, 8)]
@@ -0,0 +1,148 @@
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# The backend runs from its own directory with sibling imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "backend"))
+
+from jobs import JobQueue, parse_concurrency  # noqa: E402
+
+
+class FlakyStage:
+    """Stage handler that fails a given number of times, then succeeds."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, job):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError(f"attempt {self.calls} failed")
+        return {"document_id": "doc-1"}
+
+
+def _queue(tmp_path, tag, index, max_attempts=3):
+    return JobQueue(
+        str(tmp_path / "jobs.sqlite3"),
+        stages=[("tag", tag), ("index", index)],
+        max_attempts=max_attempts
+    )
+
+
+def _enqueue(queue, key="key-1", user_id="user-1"):
+    job, created = queue.enqueue(
+        "bot-1", "/tmp/file.txt", "file.txt", {"title": "File"},
+        idempotency_key=key, user_id=user_id
+    )
+    return job, created
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    queue = _queue(tmp_path, FlakyStage(), FlakyStage())
+
+    job, created = _enqueue(queue)
+    again, created_again = _enqueue(queue)
+
+    assert created and not created_again
+    assert again["id"] == job["id"]
+    assert queue.find("key-1")["id"] == job["id"]
+    assert queue.find("other") is None
+    assert job["user_id"] == "user-1"
+    assert job["status"] == "queued" and job["progress"] == 0
+
+
+def test_claim_takes_each_job_once(tmp_path):
+    queue = _queue(tmp_path, FlakyStage(), FlakyStage())
+    first, _ = _enqueue(queue, "a")
+    second, _ = _enqueue(queue, "b")
+
+    claimed = [queue._claim(), queue._claim()]
+
+    assert [job["id"] for job in claimed] == [first["id"], second["id"]]
+    assert all(job["status"] == "running" and job["attempts"] == 1 for job in claimed)
+    assert queue._claim() is None
+
+
+def test_failed_stage_backs_off_and_resumes_at_that_stage(tmp_path):
+    tag, index = FlakyStage(), FlakyStage(failures=1)
+    queue = _queue(tmp_path, tag, index)
+    job, _ = _enqueue(queue)
+
+    before = time.time()
+    queue._run_job(queue._claim())
+    failed = queue.get(job["id"])
+
+    assert failed["status"] == "queued"
+    assert failed["completed_stages"] == ["tag"]
+    assert failed["error"] == "attempt 1 failed"
+    assert failed["available_at"] >= before + 2
+    # Not claimable until the backoff has passed
+    assert queue._claim() is None
+
+    queue._update(job["id"], available_at=0)
+    queue._run_job(queue._claim())
+    done = queue.get(job["id"])
+
+    assert done["status"] == "completed"
+    assert done["progress"] == 1
+    assert done["outputs"] == {"document_id": "doc-1"}
+    assert (tag.calls, index.calls) == (1, 2)
+
+
+def test_retry_keeps_completed_stages(tmp_path):
+    tag, index = FlakyStage(), FlakyStage(failures=1)
+    queue = _queue(tmp_path, tag, index, max_attempts=1)
+    job, _ = _enqueue(queue)
+
+    queue._run_job(queue._claim())
+    assert queue.get(job["id"])["status"] == "failed"
+
+    retried = queue.retry(job["id"])
+    assert retried["status"] == "queued" and retried["attempts"] == 0
+    assert retried["completed_stages"] == ["tag"]
+
+    queue._run_job(queue._claim())
+    assert queue.get(job["id"])["status"] == "completed"
+    assert tag.calls == 1
+
+
+def test_recover_requeues_running_jobs(tmp_path):
+    queue = _queue(tmp_path, FlakyStage(), FlakyStage())
+    job, _ = _enqueue(queue)
+    queue._claim()
+
+    assert queue.recover() == 1
+    assert queue.get(job["id"])["status"] == "queued"
+
+
+def test_adds_owner_column_to_existing_databases(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, idempotency_key TEXT UNIQUE, "
+        "bot_id TEXT NOT NULL, filename TEXT NOT NULL, file_path TEXT NOT NULL, "
+        "metadata TEXT NOT NULL DEFAULT '{}', status TEXT NOT NULL DEFAULT 'queued', "
+        "stage TEXT, completed_stages TEXT NOT NULL DEFAULT '[]', "
+        "outputs TEXT NOT NULL DEFAULT '{}', attempts INTEGER NOT NULL DEFAULT 0, "
+        "max_attempts INTEGER NOT NULL DEFAULT 3, error TEXT, "
+        "available_at REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.close()
+
+    queue = JobQueue(str(path), stages=[("index", FlakyStage())])
+    job, _ = _enqueue(queue)
+
+    assert queue.get(job["id"])["user_id"] == "user-1"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, {}),
+    ("extract=4, index=2", {"extract": 4, "index": 2}),
+    ("index=1,bogus", {"index": 1}),
+])
+def test_parse_concurrency(value, expected):
+    assert parse_concurrency(value) == expected
@@ -0,0 +1,83 @@
+import pytest
+
+from src.core.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+CHUNKS = [
+    ("a", "Under § 153.131 the court presumes joint managing conservators."),
+    ("b", "A mark is refused under Section 2(d) for likelihood of confusion."),
+    ("c", "The court considered the best interest of the child."),
+]
+
+
+def test_tokenize_keeps_citations_whole():
+    assert tokenize("See § 153.131 and 2(d).") == [
+        "see", "§153.131", "153.131", "and", "2(d)", "2"
+    ]
+
+
+def test_section_sign_is_optional_in_queries():
+    index = LexicalIndex()
+    index.add_many(CHUNKS)
+
+    assert index.search("section 153.131")[0][0] == "a"
+    assert index.search("§153.131")[0][0] == "a"
+    assert index.search("2(d) refusal")[0][0] == "b"
+
+
+def test_postings_are_compact_arrays():
+    index = LexicalIndex()
+    index.add_many(CHUNKS)
+
+    positions, tfs = index.postings["court"]
+    assert positions.typecode == "I" and tfs.typecode == "H"
+    assert list(positions) == [0, 2]
+    assert list(tfs) == [1, 1]
+
+
+def test_readding_a_chunk_replaces_it():
+    index = LexicalIndex()
+    index.add_many(CHUNKS)
+
+    index.add("a", "Nothing about conservators here.")
+
+    assert len(index) == 3
+    assert [chunk_id for chunk_id, _ in index.search("153.131")] == []
+    assert index.search("conservators")[0][0] == "a"
+
+
+def test_removed_chunks_are_not_returned():
+    index = LexicalIndex()
+    index.add_many(CHUNKS)
+
+    index.remove(["c", "missing"])
+
+    assert len(index) == 2
+    assert "c" not in [chunk_id for chunk_id, _ in index.search("court child")]
+
+
+def test_save_compacts_and_load_round_trips(tmp_path):
+    path = str(tmp_path / "lexical" / "index.pkl")
+    index = LexicalIndex(path)
+    index.add_many(CHUNKS)
+    index.remove(["a"])
+    # Until compaction, document frequencies still count tombstones
+    fresh = LexicalIndex()
+    fresh.add_many(CHUNKS[1:])
+    expected = fresh.search("court child confusion")
+
+    index.save()
+    loaded = LexicalIndex(path)
+
+    assert loaded.chunk_ids == ["b", "c"]
+    assert "§153.131" not in loaded.postings
+    results = loaded.search("court child confusion")
+    assert [chunk_id for chunk_id, _ in results] == [chunk_id for chunk_id, _ in expected]
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected])
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]], k=60)
+
+    assert [item_id for item_id, _ in fused] == ["b", "a", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
@@ -0,0 +1,52 @@
+import socket
+import urllib.request
+
+from prometheus_client import REGISTRY
+
+from src.core import metrics
+from src.core.metrics import StageTimer, record_cache, start_metrics_server
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_stage_timer_records_spans():
+    before = _sample("rag_stage_seconds_count", {"operation": "test", "stage": "fetch"})
+    timer = StageTimer("test")
+    with timer.stage("fetch"):
+        pass
+    with timer.stage("fetch"):
+        pass
+    timings = timer.finish()
+
+    assert set(timings) == {"fetch", "total"}
+    assert timings["total"] >= timings["fetch"]
+    assert _sample("rag_stage_seconds_count", {"operation": "test", "stage": "fetch"}) == before + 2
+
+
+def test_record_cache_counts_lookups():
+    labels = {"cache": "test", "result": "hit"}
+    before = _sample("rag_cache_lookups_total", labels)
+    record_cache("test", "hit")
+
+    assert _sample("rag_cache_lookups_total", labels) == before + 1
+
+
+def test_metrics_server_starts_once(monkeypatch):
+    monkeypatch.setattr(metrics, "_server_port", None)
+    assert start_metrics_server(0) is False
+
+    port = _free_port()
+    assert start_metrics_server(port) is True
+    # Streamlit reruns call it again; it must not try to bind twice
+    assert start_metrics_server(port) is True
+
+    body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read()
+    assert b"rag_stage_seconds" in body
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import src.db.supabase as supabase_module
+from src.db.supabase import SupabaseVectorStore
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _ParentsTable:
+    """Answers select(...).in_("id", ids).execute() with stored metadata."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.ids = []
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, ids):
+        self.ids = ids
+        return self
+
+    def execute(self):
+        return _Result([{"id": i, "metadata": self.rows[i]} for i in self.ids if i in self.rows])
+
+
+class _Client:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        assert name == "parent_documents"
+        return _ParentsTable(self.rows)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    rows = {f"p{n}": {"title": f"Doc {n}"} for n in range(50)}
+    store = object.__new__(SupabaseVectorStore)
+    store.supabase = _Client(rows)
+    monkeypatch.setattr(supabase_module, "PARENT_CACHE_SIZE", 16)
+    supabase_module._parent_cache.clear()
+    yield store
+    supabase_module._parent_cache.clear()
+
+
+def test_parent_metadata_is_cached(store):
+    assert store.get_parent_metadata(["p1", "p2", "p1"]) == {
+        "p1": {"title": "Doc 1"}, "p2": {"title": "Doc 2"}
+    }
+    store._forget_parents(["p1"])
+
+    assert list(supabase_module._parent_cache) == ["p2"]
+
+
+def test_parent_cache_under_concurrent_use(store):
+    errors = []
+
+    def work(offset):
+        try:
+            for n in range(500):
+                ids = [f"p{(offset + n + k) % 50}" for k in range(4)]
+                found = store.get_parent_metadata(ids)
+                assert set(found) == set(ids)
+                if n % 7 == 0:
+                    store._forget_parents(ids[:1])
+                if n % 5 == 0:
+                    store._cache_parent(ids[-1], {"title": "updated"})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(supabase_module._parent_cache) <= 16
@@ -0,0 +1,66 @@
+import os
+import re
+
+from src.core.lexical_index import LexicalIndex
+from src.core.partitions import PartitionedIndexes, partition_key, partition_path
+
+
+def test_partition_key_is_safe_and_unique():
+    keys = [partition_key(bot_id) for bot_id in ("case/1", "case 1", "case_1", "x" * 100)]
+
+    assert all(re.fullmatch(r"[A-Za-z0-9_-]+", key) for key in keys)
+    assert len(set(keys)) == len(keys)
+    assert keys[0].startswith("case_1-")
+    assert len(keys[3]) == 40 + 1 + 8
+    assert partition_key("case/1") == keys[0]
+
+
+def test_partition_path():
+    assert partition_path("./index/lexical_index.pkl", None) == "./index/lexical_index.pkl"
+    assert partition_path(None, "case-1") is None
+    assert partition_path("./index/vectors/", "case-1") == os.path.join(
+        "index", "bots", partition_key("case-1"), "vectors"
+    )
+
+
+def test_bots_are_isolated(tmp_path):
+    indexes = PartitionedIndexes(LexicalIndex, str(tmp_path / "lexical.pkl"))
+    indexes.get("case-1").add("a", "custody under § 153.131")
+    indexes.get("case-2").add("b", "trademark refusal under 2(d)")
+    indexes.get().add("c", "general § 153.131 commentary")
+
+    assert [chunk_id for chunk_id, _ in indexes.get("case-1").search("153.131")] == ["a"]
+    assert indexes.get("case-2").search("153.131") == []
+    assert [chunk_id for chunk_id, _ in indexes.get().search("153.131")] == ["c"]
+    assert indexes.get("case-1") is indexes.get("case-1")
+
+    indexes.get("case-1").save()
+    assert (tmp_path / "bots" / partition_key("case-1") / "lexical.pkl").exists()
+    assert not (tmp_path / "lexical.pkl").exists()
+
+
+def test_least_recently_used_bot_is_saved_and_closed(tmp_path):
+    indexes = PartitionedIndexes(LexicalIndex, str(tmp_path / "lexical.pkl"), max_open=2)
+    indexes.get().add("shared", "shared text")
+    indexes.get("case-1").add("a", "custody")
+    indexes.get("case-2").add("b", "trademark")
+    first = indexes.get("case-1")
+
+    indexes.get("case-3")
+
+    assert len(indexes) == 2
+    assert (tmp_path / "bots" / partition_key("case-2") / "lexical.pkl").exists()
+    assert indexes.get("case-1") is first
+    reopened = indexes.get("case-2")
+    assert [chunk_id for chunk_id, _ in reopened.search("trademark")] == ["b"]
+    # The shared index does not count against the limit
+    assert len(indexes.get()) == 1
+
+
+def test_indexes_without_a_path_stay_open():
+    indexes = PartitionedIndexes(LexicalIndex, None, max_open=1)
+    indexes.get("case-1").add("a", "custody")
+    indexes.get("case-2").add("b", "trademark")
+
+    assert len(indexes) == 2
+    assert [chunk_id for chunk_id, _ in indexes.get("case-1").search("custody")] == ["a"]
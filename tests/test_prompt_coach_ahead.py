@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+# The backend runs from its own directory with sibling imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "backend"))
+
+from rag.pipeline import get_prompt_coach, get_prompt_coach_ahead  # noqa: E402
+
+
+def test_continuations_complete_the_last_word():
+    result = get_prompt_coach_ahead("please draf")
+
+    assert result["tooltip"] is None
+    assert result["ahead"] == [
+        {"text": "t ", "tooltip": get_prompt_coach("please draft ")}
+    ]
+
+
+def test_only_continuations_that_change_the_tooltip_are_returned():
+    prefix = "please draft a motion "
+
+    result = get_prompt_coach_ahead(prefix)
+
+    assert result["tooltip"] == get_prompt_coach(prefix)
+    assert {item["text"] for item in result["ahead"]} == {"cite ", "using "}
+    for item in result["ahead"]:
+        assert item["tooltip"] == get_prompt_coach(prefix + item["text"])
+        assert item["tooltip"] != result["tooltip"]
+
+
+def test_limit_caps_continuations():
+    assert len(get_prompt_coach_ahead("please draft a motion ", limit=1)["ahead"]) == 1
+    assert get_prompt_coach_ahead("please draft a motion ", limit=0)["ahead"] == []
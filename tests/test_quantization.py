@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.core.quantization import QuantizedVectorIndex, quantize_binary, quantize_int8
+
+DIMENSION = 64
+
+
+def _vectors(count, dimension=DIMENSION, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+
+def _items(vectors, prefix="c"):
+    return [(f"{prefix}{i}", f"p{i // 4}", vector) for i, vector in enumerate(vectors)]
+
+
+def test_int8_codes_reconstruct_vectors():
+    vectors = _vectors(10)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8 and scales.shape == (10,)
+    error = np.abs(codes * scales[:, None] - vectors).max(axis=1)
+    assert (error <= scales / 2 + 1e-6).all()
+
+
+def test_binary_codes_pack_sign_bits():
+    codes = quantize_binary(np.array([[1.0, -1.0] * 8]))
+
+    assert codes.shape == (1, 2)
+    assert codes.tolist() == [[0b10101010, 0b10101010]]
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_search_finds_the_query_vector(mode):
+    vectors = _vectors(200)
+    index = QuantizedVectorIndex(mode=mode, dimension=DIMENSION)
+    index.add_many(_items(vectors))
+
+    hits, full = index.search(vectors[17], k=3)
+
+    assert hits[0][:2] == ("c17", "p4")
+    assert hits[0][2] == pytest.approx(1.0, abs=1e-5)
+    assert full.shape == (3, DIMENSION)
+    assert [score for _, _, score in hits] == sorted((score for _, _, score in hits), reverse=True)
+
+
+def test_first_pass_codes_can_use_shortened_vectors():
+    vectors = _vectors(100, dimension=128)
+    index = QuantizedVectorIndex(dimension=32, rescore_dimension=128)
+    index.add_many(_items(vectors))
+
+    hits, full = index.search(vectors[5], k=1)
+
+    assert hits[0][0] == "c5"
+    assert full.shape == (1, 128)
+    assert index.memory_bytes() == {"codes": 100 * (32 + 4), "full_precision": 100 * 128 * 4}
+
+
+def test_removed_and_replaced_chunks():
+    vectors = _vectors(20)
+    index = QuantizedVectorIndex(dimension=DIMENSION)
+    index.add_many(_items(vectors))
+
+    index.remove(["c3"])
+    index.add_many([("c4", "p9", vectors[3])])
+
+    assert len(index) == 19
+    hits, _ = index.search(vectors[3], k=20)
+    assert hits[0][:2] == ("c4", "p9")
+    assert "c3" not in [chunk_id for chunk_id, _, _ in hits]
+
+
+def test_save_appends_and_load_round_trips(tmp_path):
+    path = str(tmp_path / "index")
+    vectors = _vectors(40)
+    index = QuantizedVectorIndex(path, dimension=DIMENSION)
+    index.add_many(_items(vectors[:30]))
+    index.save()
+    index.add_many((f"c{i}", None, vectors[i]) for i in range(30, 40))
+    index.save()
+
+    loaded = QuantizedVectorIndex(path, dimension=DIMENSION)
+
+    assert len(loaded) == 40
+    assert os.path.getsize(os.path.join(path, "vectors.f32")) == 40 * DIMENSION * 4
+    for row in (0, 35):
+        assert loaded.search(vectors[row], k=1)[0] == index.search(vectors[row], k=1)[0]
+
+
+def test_save_compacts_mostly_tombstoned_index(tmp_path):
+    path = str(tmp_path / "index")
+    vectors = _vectors(40)
+    index = QuantizedVectorIndex(path, dimension=DIMENSION)
+    index.add_many(_items(vectors))
+    index.save()
+
+    index.remove([f"c{i}" for i in range(30)])
+    index.save()
+    loaded = QuantizedVectorIndex(path, dimension=DIMENSION)
+
+    assert loaded.chunk_ids == [f"c{i}" for i in range(30, 40)]
+    assert os.path.getsize(os.path.join(path, "codes.bin")) == 10 * DIMENSION
+    assert os.path.getsize(os.path.join(path, "vectors.f32")) == 10 * DIMENSION * 4
+    hits, _ = loaded.search(vectors[33], k=1)
+    assert hits[0][0] == "c33"
+
+
+def test_rows_written_after_the_metadata_are_dropped(tmp_path):
+    path = str(tmp_path / "index")
+    vectors = _vectors(10)
+    index = QuantizedVectorIndex(path, dimension=DIMENSION)
+    index.add_many(_items(vectors))
+    index.save()
+    # A crash between appending rows and writing the metadata
+    with open(os.path.join(path, "codes.bin"), "ab") as f:
+        f.write(b"\x01" * DIMENSION)
+
+    loaded = QuantizedVectorIndex(path, dimension=DIMENSION)
+
+    assert len(loaded) == 10
+    assert os.path.getsize(os.path.join(path, "codes.bin")) == 10 * DIMENSION
+
+
+def test_loading_with_other_settings_fails(tmp_path):
+    path = str(tmp_path / "index")
+    index = QuantizedVectorIndex(path, dimension=DIMENSION)
+    index.add_many(_items(_vectors(4)))
+    index.save()
+
+    with pytest.raises(ValueError, match="rebuild"):
+        QuantizedVectorIndex(path, mode="binary", dimension=DIMENSION)
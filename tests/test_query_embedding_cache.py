@@ -0,0 +1,71 @@
+import pytest
+
+from src.core.embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class Embedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, query):
+        self.calls.append(query)
+        return [float(len(query)), 0.5]
+
+
+def test_normalize_query_folds_case_width_and_whitespace():
+    assert normalize_query("  What  is\t§153.131？ ") == "what is §153.131?"
+
+
+def test_equivalent_queries_embed_once():
+    cache = QueryEmbeddingCache("model")
+    embed = Embedder()
+
+    first = cache.get_or_embed("Best interest of the child", embed)
+    second = cache.get_or_embed("best  interest of the CHILD", embed)
+
+    assert first == second
+    assert len(embed.calls) == 1
+    assert cache.stats == {"memory_hits": 1, "shared_hits": 0, "misses": 1}
+    assert cache.hit_rate() == 0.5
+
+
+def test_keys_include_the_model():
+    cache = QueryEmbeddingCache("small")
+    cache.put("query", [1.0])
+
+    assert QueryEmbeddingCache("large").get("query") is None
+    assert cache.get("query") == [1.0]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryEmbeddingCache("model", max_size=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")
+
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+
+
+def test_shared_tier_fills_other_processes():
+    redis = FakeRedis()
+    QueryEmbeddingCache("model", redis_client=redis).put("query", [0.25, -1.0])
+    cache = QueryEmbeddingCache("model", redis_client=redis)
+
+    assert cache.get("query") == pytest.approx([0.25, -1.0])
+    assert cache.get("query") == pytest.approx([0.25, -1.0])
+    assert cache.stats == {"memory_hits": 1, "shared_hits": 1, "misses": 0}
@@ -0,0 +1,107 @@
+import pytest
+
+pytest.importorskip("supabase")
+
+import src.db.supabase as supabase_module
+from src.db.supabase import SupabaseVectorStore
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+
+class _Call:
+    def __init__(self, data):
+        self.data = data
+
+    def __getattr__(self, name):
+        # update/eq/... chain until execute()
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return self
+
+
+class FakeClient:
+    def __init__(self):
+        self.searches = 0
+        self.rows = [{"id": "c1", "content": "first", "metadata": {"title": "A"}}]
+
+    def rpc(self, name, params):
+        if name in ("match_bot_chunks", "match_document_chunks"):
+            self.searches += 1
+            return _Call(list(self.rows))
+        return _Call([])
+
+    def table(self, name):
+        return _Call([])
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(supabase_module, "redis_client", FakeRedis())
+    monkeypatch.setattr(supabase_module, "_bot_partitions", {"bot-1", "bot-2"})
+    store = object.__new__(SupabaseVectorStore)
+    store.supabase = FakeClient()
+    return store
+
+
+def _search(store, bot_id="bot-1"):
+    return store.similarity_search([0.1, 0.2], top_k=3, bot_id=bot_id)
+
+
+def test_repeated_searches_are_served_from_the_cache(store):
+    assert _search(store) == _search(store)
+    assert store.supabase.searches == 1
+
+
+def test_deleting_a_group_invalidates_the_bots_searches(store):
+    _search(store)
+    _search(store, bot_id="bot-2")
+    _search(store, bot_id=None)
+
+    store.delete_document_groups(["g1"], bot_id="bot-1")
+    store.supabase.rows = [{"id": "c2", "content": "second", "metadata": {}}]
+
+    assert [d["id"] for d in _search(store)] == ["c2"]
+    # Other bots' cached results stay valid; unpartitioned ones do not
+    assert [d["id"] for d in _search(store, bot_id="bot-2")] == ["c1"]
+    assert [d["id"] for d in _search(store, bot_id=None)] == ["c2"]
+
+
+def test_replacing_a_group_invalidates_the_bots_searches(store):
+    _search(store)
+    store.replace_document_group("g1", {"title": "B"}, [], [], bot_id="bot-1")
+    _search(store)
+
+    assert store.supabase.searches == 2
+
+
+def test_metadata_update_without_a_bot_invalidates_every_bot(store):
+    _search(store)
+    _search(store, bot_id="bot-2")
+    store.update_parent_metadata("g1", {"title": "Renamed"})
+    _search(store)
+    _search(store, bot_id="bot-2")
+
+    assert store.supabase.searches == 4
@@ -0,0 +1,96 @@
+from src.core.template_context import DOCUMENT_COLUMNS, TemplateContextService, compile_prefix
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = {}
+
+    def select(self, columns):
+        self.client.selects.append((self.table, columns))
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = [value]
+        return self
+
+    def in_(self, column, values):
+        self.filters[column] = list(values)
+        return self
+
+    def execute(self):
+        rows = self.client.tables[self.table]
+        for column, values in self.filters.items():
+            rows = [row for row in rows if row[column] in values]
+        return _Result([dict(row) for row in rows])
+
+
+class FakeClient:
+    def __init__(self):
+        self.selects = []
+        self.tables = {
+            "templates": [{
+                "id": "t1", "name": "Smith custody", "description": "Custody matter",
+                "prompt": "Answer briefly.\r\n", "case_history": "Filed 2024.  ",
+                "participants": "Jane Smith", "objective": "Primary custody",
+                "updated_at": "v1"
+            }],
+            "template_documents": [
+                {"template_id": "t1", "document_id": "d2"},
+                {"template_id": "t1", "document_id": "d1"},
+            ],
+            "documents": [
+                {"id": "d1", "content": "x" * 10000, "metadata": {"name": "Petition", "type": "petition"}},
+                {"id": "d2", "content": "y" * 10000, "metadata": {"title": "Affidavit"}},
+            ],
+        }
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def test_compiled_prefix_is_stable_and_ordered():
+    client = FakeClient()
+    context = TemplateContextService(client).get("t1")
+
+    assert context["prefix"] == (
+        "You are the case assistant for: Smith custody\n\n"
+        "Custody matter\n\n"
+        "## Objective\nPrimary custody\n\n"
+        "## Participants\nJane Smith\n\n"
+        "## Case history\nFiled 2024.\n\n"
+        "## Instructions\nAnswer briefly.\n\n"
+        "## Case documents\n- Petition [petition]\n- Affidavit\n"
+    )
+    documents = list(reversed(client.tables["documents"]))
+    assert compile_prefix(client.tables["templates"][0], documents) == context["prefix"]
+
+
+def test_linked_documents_are_fetched_without_their_content():
+    client = FakeClient()
+    TemplateContextService(client).get("t1")
+
+    assert ("documents", DOCUMENT_COLUMNS) in client.selects
+    assert "content" not in DOCUMENT_COLUMNS and "*" not in DOCUMENT_COLUMNS
+
+
+def test_recompiles_only_when_the_template_changes():
+    client = FakeClient()
+    service = TemplateContextService(client, revalidate_seconds=0)
+    first = service.get("t1")
+
+    assert service.get("t1") is first
+    assert client.selects[-1] == ("templates", "updated_at")
+
+    client.tables["templates"][0].update(objective="Joint custody", updated_at="v2")
+    second = service.get("t1")
+
+    assert second["version"] != first["version"]
+    assert "Joint custody" in second["prefix"]
+    assert service.get("missing") is None